@@ -0,0 +1,56 @@
+""" This module contains *Capabilities* class, that describes
+features available on server Client is connected to.
+
+Capabilities are negotiated once per Client (on first access to
+``Client.capabilities``) and refreshed on ``Client.reconnect`` or
+``Client.clean_caches``, thus code, that depends on server version,
+could check them without additional RPC calls:
+
+.. code:: python
+
+    >>> if cl.capabilities.has_search_read:
+    ...     data = cl.execute('res.partner', 'search_read', [])
+"""
+import six
+from extend_me import Extensible
+from pkg_resources import parse_version
+
+__all__ = ('Capabilities',)
+
+
+@six.python_2_unicode_compatible
+class Capabilities(Extensible):
+    """ Features available on server
+
+        :param server_version: server base version
+                               (parsed with ``pkg_resources.parse_version``)
+
+        Has following attributes:
+
+        - *server_version* - server base version
+        - *has_search_read* - server supports *search_read* method
+        - *has_search_count* - server supports *search_count* method
+        - *has_multi_create* - *create* method accepts list of values
+        - *read_group_lazy* - *read_group* method supports *lazy* argument
+
+        Could be extended to provide additional flags::
+
+            class MyCapabilities(Capabilities):
+                def __init__(self, server_version):
+                    super(MyCapabilities, self).__init__(server_version)
+                    self.has_web_search_read = (
+                        server_version >= parse_version('14.0'))
+    """
+
+    def __init__(self, server_version):
+        self.server_version = server_version
+        self.has_search_read = server_version >= parse_version('8.0')
+        self.has_search_count = server_version >= parse_version('8.0')
+        self.has_multi_create = server_version >= parse_version('12.0')
+        self.read_group_lazy = server_version >= parse_version('8.0')
+
+    def __str__(self):
+        return u"Capabilities of server %s" % self.server_version
+
+    def __repr__(self):
+        return u"<%s>" % str(self)
@@ -58,14 +58,20 @@ Ability to use Record class as analog to browse_record:
 
 import six
 import re
+import weakref
+import threading
 from extend_me import Extensible
+from multiprocessing.pool import ThreadPool
 from pkg_resources import parse_version
 
 # project imports
 from .connection import get_connector
-from .exceptions import LoginException
+from .exceptions import (LoginException,
+                         ClientException)
 from .service import ServiceManager
 from .plugin import PluginManager
+from .capabilities import Capabilities
+from .orm.batch import WriteBatch
 
 # Enable ORM features
 from . import orm  # noqa
@@ -80,6 +86,38 @@ RE_CLIENT_URL = re.compile(
     r"(?P<dbname>[\w\-.]+)?$")
 
 
+# Clients created in current process (url -> client).
+# Used to reattach unpickled clients, records and record lists
+# to existing clients (look at *Client.__reduce__*).
+# If there are multiple clients with same URL, last created one
+# is registered (while it is alive), and pickled records of all of them
+# are restored with it
+_clients = weakref.WeakValueDictionary()
+
+
+def _restore_client(init_args, pwd=None):
+    """ Restore pickled client. For internal use only.
+
+        If there is client with same URL in current process (and same
+        password, if password was pickled), it is reused.
+        Otherwise new client is created, if password was pickled.
+
+        :raises ClientException: if there is no client with same URL
+                                 in current process, and password
+                                 was not pickled
+    """
+    url = Client.to_url(init_args)
+    client = _clients.get(url, None)
+    if client is not None and (pwd is None or client._pwd == pwd):
+        return client
+    if pwd is None:
+        raise ClientException(
+            "Cannot unpickle client %s: there is no client with this URL "
+            "in current process, and password was not pickled "
+            "(look at Client.pickle_password)" % url)
+    return Client(pwd=pwd, **init_args)
+
+
 @six.python_2_unicode_compatible
 class Client(Extensible):
     """
@@ -107,8 +145,107 @@ class Client(Extensible):
 
            >>> db['sale.order']
                Object ('sale.order')
+
+       Persistent schema cache could be enabled by setting *schema_cache*
+       attribute (on instance or on class)::
+
+           >>> from odoo_rpc_client.orm.schema import SchemaCache
+           >>> db.schema_cache = SchemaCache('/tmp/odoo_schema.db')
+
+       Schema could be shared between clients in same process,
+       by setting *schema_registry* attribute::
+
+           >>> from odoo_rpc_client.orm.schema import SchemaRegistry
+           >>> Client.schema_registry = SchemaRegistry()
+
+       Concurrent identical calls of idempotent methods (made from
+       different threads) could be merged into single RPC call,
+       by setting *singleflight* attribute::
+
+           >>> from odoo_rpc_client.service.singleflight import SingleFlight
+           >>> db.singleflight = SingleFlight()
+
+       Concurrent reads of same model could be merged into single *read*
+       of union of requested IDs and fields, by setting *read_coalescer*
+       attribute::
+
+           >>> from odoo_rpc_client.orm.coalesce import ReadCoalescer
+           >>> db.read_coalescer = ReadCoalescer(window=0.005)
+
+       Results of rarely changing methods (*fields_get*, *default_get*,
+       *context_get*, ...) could be cached for limited time, by setting
+       *result_cache* attribute::
+
+           >>> from odoo_rpc_client.orm.result_cache import ResultCache
+           >>> db.result_cache = ResultCache(ttl=300)
+
+       Results of *search* and *search_count* calls could be cached too,
+       by setting *query_cache* attribute::
+
+           >>> from odoo_rpc_client.orm.query_cache import QueryCache
+           >>> db.query_cache = QueryCache(ttl=30, revalidate=True)
+
+       Fields accessed on records could be learned per model, and read
+       together by single RPC call, by setting *auto_prefetch* attribute::
+
+           >>> from odoo_rpc_client.orm.prefetch import PrefetchProfiles
+           >>> db.auto_prefetch = PrefetchProfiles(path='/tmp/profiles.json')
     """
 
+    #: Persistent schema cache
+    #: (instance of ``odoo_rpc_client.orm.schema.SchemaCache``) or None
+    schema_cache = None
+
+    #: In-memory schema registry shared between clients
+    #: (instance of ``odoo_rpc_client.orm.schema.SchemaRegistry``) or None
+    schema_registry = None
+
+    #: How names of objects (models) are validated on first access:
+    #: 'full' (read list of all models), 'single' (check only requested
+    #: model) or 'none' (do not validate).
+    #: Look at ``odoo_rpc_client.service.object.ObjectService.check_object``
+    model_validation = 'full'
+
+    #: If set to True, then record caches created by default
+    #: could be shared between threads
+    #: (look at ``odoo_rpc_client.orm.cache.empty_cache``)
+    thread_safe_caches = False
+
+    #: Deduplication of concurrent identical calls of idempotent methods
+    #: (instance of ``odoo_rpc_client.service.singleflight.SingleFlight``)
+    #: or None
+    singleflight = None
+
+    #: Merging of concurrent reads of same model into single RPC call
+    #: (instance of ``odoo_rpc_client.orm.coalesce.ReadCoalescer``) or None
+    read_coalescer = None
+
+    #: Cache of results of rarely changing methods
+    #: (instance of ``odoo_rpc_client.orm.result_cache.ResultCache``)
+    #: or None
+    result_cache = None
+
+    #: Cache of results of *search* and *search_count* calls
+    #: (instance of ``odoo_rpc_client.orm.query_cache.QueryCache``) or None
+    query_cache = None
+
+    #: If set to True, then password is included into pickled client
+    #: (and records), so it could be unpickled in process, where there is
+    #: no client with same URL (look at *Client.__reduce__*)
+    pickle_password = False
+
+    #: Learned profiles of accessed fields, used to prefetch them together
+    #: (instance of ``odoo_rpc_client.orm.prefetch.PrefetchProfiles``)
+    #: or None
+    auto_prefetch = None
+
+    # Names of attributes, that are copied to clients created
+    # by *connect* and *login* methods, if they were set on instance
+    _inherited_attrs = ('schema_cache', 'schema_registry',
+                        'model_validation', 'thread_safe_caches',
+                        'singleflight', 'read_coalescer', 'result_cache',
+                        'query_cache', 'auto_prefetch', 'pickle_password')
+
     def __init__(self, host, dbname=None, user=None, pwd=None, port=8069,
                  protocol='xml-rpc', **extra_args):
         self._dbname = dbname
@@ -123,6 +260,16 @@ class Client(Extensible):
         self._user = None
         self._user_context = None
         self._database_version_full = None
+        self._schema_fingerprint = None
+        self._capabilities = None
+
+        # thread-local state (for example active write batches)
+        self._local = threading.local()
+
+        # protects lazy initialization of login and capabilities
+        self._lock = threading.RLock()
+
+        _clients[self.get_url()] = self
 
     @property
     def dbname(self):
@@ -212,7 +359,9 @@ class Client(Extensible):
             :rtype: int
         """
         if self._uid is None:
-            self._uid = self.connect()
+            with self._lock:
+                if self._uid is None:
+                    self._uid = self.connect()
         return self._uid
 
     @property
@@ -235,13 +384,29 @@ class Client(Extensible):
             self._user_context = self.get_obj('res.users').context_get()
         return self._user_context
 
+    @property
+    def capabilities(self):
+        """ Features available on server.
+
+            Negotiated once, and refreshed on *reconnect*
+            or *clean_caches*
+
+            :rtype: odoo_rpc_client.capabilities.Capabilities
+        """
+        if self._capabilities is None:
+            with self._lock:
+                if self._capabilities is None:
+                    self._capabilities = Capabilities(
+                        self.services.db.server_base_version())
+        return self._capabilities
+
     @property
     def server_version(self):
         """ Server base version  ('8.0', '9.0', etc)
 
             (Already parsed with ``pkg_resources.parse_version``)
         """
-        return self.services.db.server_base_version()
+        return self.capabilities.server_version
 
     @property
     def database_version_full(self):
@@ -266,6 +431,36 @@ class Client(Extensible):
             '.'.join(
                 self.database_version_full.base_version.split('.', 2)[:2]))
 
+    @property
+    def schema_fingerprint(self):
+        """ String, that identifies current state of database schema.
+
+            Computed from server version, number of fields and max
+            *write_date* of ``ir.model.fields`` records, thus it is changed
+            when modules are installed, updated or removed.
+            Used to validate persistent schema cache.
+            Computed once (reset by *clean_caches*)
+
+            :rtype: str
+        """
+        if self._schema_fingerprint is None:
+            # Note, use *execute* directly, to avoid loading schema
+            # of *ir.model.fields* model
+            if self.capabilities.has_search_read:
+                last = self.execute('ir.model.fields', 'search_read',
+                                    domain=[], fields=['write_date'],
+                                    order='write_date desc', limit=1)
+            else:
+                last = self.execute('ir.model.fields', 'read',
+                                    self.execute('ir.model.fields', 'search',
+                                                 [], 0, 1, 'write_date desc'),
+                                    ['write_date'])
+            count = self.execute('ir.model.fields', 'search_count', [])
+            self._schema_fingerprint = "%s:%s:%s" % (
+                self.server_version, count,
+                last[0]['write_date'] if last else '')
+        return self._schema_fingerprint
+
     @property
     def registered_objects(self):
         """ List of registered in Odoo database objects
@@ -308,7 +503,11 @@ class Client(Extensible):
             init_kwargs = self.get_init_args()
             init_kwargs.update(kwargs)
 
-            return Client(**init_kwargs)
+            client = Client(**init_kwargs)
+            for attr in self._inherited_attrs:
+                if attr in self.__dict__:
+                    setattr(client, attr, self.__dict__[attr])
+            return client
 
         # Get the uid
         if not self._pwd or not self.username or not self.dbname:
@@ -331,9 +530,11 @@ class Client(Extensible):
             :rtype: int
             :raises ClientException: if wrong login or password
         """
-        self.services.clean_cache()
-        self._uid = None
-        self._uid = self.connect()
+        with self._lock:
+            self.services.clean_cache()
+            self._capabilities = None
+            self._uid = None
+            self._uid = self.connect()
         return self._uid
 
     def execute(self, obj, method, *args, **kwargs):
@@ -367,6 +568,57 @@ class Client(Extensible):
                                                          object_id)
         return result_wkf
 
+    @property
+    def active_batch(self):
+        """ Write batch active in current thread or None.
+            (look at *batch* method)
+
+            :rtype: odoo_rpc_client.orm.batch.WriteBatch
+        """
+        batches = getattr(self._local, 'batches', None)
+        if batches and not batches[-1].flushing:
+            return batches[-1]
+        return None
+
+    def _push_batch(self, batch):
+        """ Make *batch* active in current thread. For internal use
+        """
+        if getattr(self._local, 'batches', None) is None:
+            self._local.batches = []
+        self._local.batches.append(batch)
+
+    def _pop_batch(self, batch):
+        """ Deactivate *batch* in current thread. For internal use
+        """
+        self._local.batches.remove(batch)
+
+    def batch(self, flush_size=10000, chunk_size=1000):
+        """ Start unit of work for write operations.
+
+            Returns context manager. Inside *with* block, all calls of
+            *write* methods of objects, records and record lists
+            (in current thread) are buffered,
+            and sent to server on exit from *with* block.
+            Records that have to be written with same values are merged
+            in single *write* call.
+
+            :param int flush_size: number of buffered record writes, that
+                                   causes automatic flush. default: 10000
+            :param int chunk_size: max number of records to write by single
+                                   RPC call. default: 1000
+            :return: write batch instance
+            :rtype: odoo_rpc_client.orm.batch.WriteBatch
+            :raises odoo_rpc_client.exceptions.WriteBatchError: on exit from
+                *with* block, if some writes failed
+
+            Example::
+
+                >>> with db.batch():
+                ...     for order in db['sale.order'].search_records([]):
+                ...         order.write({'note': 'Checked'})
+        """
+        return WriteBatch(self, flush_size=flush_size, chunk_size=chunk_size)
+
     def get_obj(self, object_name):
         """ Returns wraper around Odoo object 'object_name'
             which is instance of orm.object.Object class
@@ -377,6 +629,48 @@ class Client(Extensible):
         """
         return self.services['object'].get_obj(object_name)
 
+    def preload_schema(self, models='all', workers=4):
+        """ Load information about fields (*columns_info*)
+            for many models at once.
+
+            *fields_get* calls for different models are sent
+            in parallel threads, so loading schema for wide scripts
+            takes about time of few RPC calls.
+            If persistent schema cache is enabled (*schema_cache*),
+            then schema is loaded from it (if it is up to date)
+
+            :param list models: list of names of models to load schema for,
+                                or 'all' to load schema for all
+                                registered models. Default: 'all'
+            :param int workers: max number of parallel requests. Default: 4
+            :return: list of objects with loaded schema
+            :rtype: list of odoo_rpc_client.orm.object.Object
+
+            Example::
+
+                >>> db.preload_schema(['sale.order', 'sale.order.line',
+                ...                    'res.partner', 'product.product'])
+        """
+        if models == 'all':
+            models = self.registered_objects
+
+        # Objects are created in current thread, and only schemas
+        # are loaded in parallel
+        objects = [self.get_obj(m) for m in models]
+
+        if len(objects) < 2 or workers < 2:
+            for obj in objects:
+                obj.columns_info
+            return objects
+
+        pool = ThreadPool(min(workers, len(objects)))
+        try:
+            pool.map(lambda o: o.columns_info, objects)
+        finally:
+            pool.close()
+            pool.join()
+        return objects
+
     def ref(self, xmlid):
         """ Return record for specified xmlid
 
@@ -411,6 +705,21 @@ class Client(Extensible):
 
         return res
 
+    def __reduce__(self):
+        """ Client is pickled by its init args. Password is pickled only
+            if *pickle_password* is set to True.
+            No connection or cached data is pickled.
+
+            On unpickling, client with same URL existing in current process
+            (for example, inherited by worker process created by *fork*)
+            is reused, so records and record lists sent to worker processes
+            are attached to single client per process. If there is no such
+            client, then new one is created if password was pickled,
+            otherwise *ClientException* is raised.
+        """
+        pwd = self._pwd if self.pickle_password else None
+        return (_restore_client, (self.get_init_args(), pwd))
+
     def get_init_args(self):
         """ Returns dictionary with init arguments which can be safely passed
             to class constructor
@@ -475,6 +784,30 @@ class Client(Extensible):
         self._user_context = None
         self._user = None
         self._database_version_full = None
+        self._schema_fingerprint = None
+        self._capabilities = None
+        for cache in (self.result_cache, self.query_cache):
+            if cache is not None:
+                cache.invalidate(client=self)
+
+    def cache_stats(self):
+        """ Statistics of caches and call optimizers enabled on this client
+
+            :return: dictionary, that maps name of attribute
+                     (*schema_registry*, *singleflight*, *read_coalescer*,
+                     *result_cache*, *query_cache*, *auto_prefetch*)
+                     to its statistics.
+                     Disabled ones are not included
+            :rtype: dict
+        """
+        res = {}
+        for attr in ('schema_registry', 'singleflight',
+                     'read_coalescer', 'result_cache', 'query_cache',
+                     'auto_prefetch'):
+            value = getattr(self, attr)
+            if value is not None:
+                res[attr] = value.stats()
+        return res
 
     def __str__(self):
         return u"Client: %s" % self.get_url()
@@ -1,4 +1,6 @@
+import os
 import six
+import threading
 from extend_me import ExtensibleByHashType
 
 __all__ = ('get_connector', 'get_connector_names', 'ConnectorBase')
@@ -31,7 +33,9 @@ class ConnectorBase(six.with_metaclass(ConnectorType)):
         self._port = port
         self._extra_args = {} if extra_args is None else extra_args
 
-        self.__services = {}
+        # service proxies are cached per thread (look at *get_service*)
+        self.__local = threading.local()
+        self.__pid = os.getpid()
 
     @property
     def host(self):
@@ -55,7 +59,8 @@ class ConnectorBase(six.with_metaclass(ConnectorType)):
         """ Update extra args and clean service cache
         """
         self.extra_args.update(kwargs)
-        self.__services = {}
+        self.__local = threading.local()
+        self.__pid = os.getpid()
 
     def _get_service(self, name):  # pragma: no cover
         raise NotImplementedError
@@ -63,12 +68,28 @@ class ConnectorBase(six.with_metaclass(ConnectorType)):
     def get_service(self, name):
         """ Returns service for specified *name*
 
+            Note, that service proxies are cached per thread,
+            because of underlying http connections (for example ones
+            used by xmlrpclib) cannot be safely shared between threads.
+            Also, if process was forked, proxies created in parent process
+            are not used by child process.
+
             :param name: name of service
             :return: specified service instance
         """
-        service = self.__services.get(name, None)
+        if self.__pid != os.getpid():
+            # Process was forked, so do not reuse connections opened by
+            # parent process
+            self.__local = threading.local()
+            self.__pid = os.getpid()
+
+        services = getattr(self.__local, 'services', None)
+        if services is None:
+            services = self.__local.services = {}
+
+        service = services.get(name, None)
         if service is None:
             service = self._get_service(name)
-            self.__services[name] = service
+            services[name] = service
 
         return service
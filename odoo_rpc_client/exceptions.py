@@ -30,3 +30,25 @@ class LoginException(ClientException):
 class ObjectException(ClientException):
     """ Base class for exceptions related to Objects """
     pass
+
+
+class WriteBatchError(ObjectException):
+    """ Raised when some of writes buffered by
+        ``odoo_rpc_client.orm.batch.WriteBatch`` failed on flush
+
+        :param list errors: list of
+                            ``odoo_rpc_client.orm.batch.WriteError`` instances
+    """
+    def __init__(self, errors):
+        self.errors = errors
+        msg = u"%d write(s) failed:\n%s" % (
+            len(errors), u"\n".join(u"%s" % (e,) for e in errors))
+        super(WriteBatchError, self).__init__(msg)
+
+
+class ClientPoolError(ClientException):
+    """ Raised by ``odoo_rpc_client.pool.ClientPool``, when there is no free
+        client in pool, or on attempt to return client that is not managed
+        by pool
+    """
+    pass
@@ -0,0 +1,239 @@
+""" This module contains unit-of-work logic for write operations.
+
+Usualy it is used via ``Client.batch`` method:
+
+.. code:: python
+
+    with client.batch():
+        for partner in client['res.partner'].search_records([]):
+            partner.write({'comment': 'checked'})
+
+    # all writes above are sent to server when *with* block exits.
+    # writes with same values merged into single
+    # ``write(ids, {'comment': 'checked'})`` call (splitted by *chunk_size*)
+"""
+import six
+import collections
+
+from ..utils import freeze
+from ..exceptions import WriteBatchError
+
+__all__ = ('WriteBatch', 'WriteError')
+
+
+@six.python_2_unicode_compatible
+class WriteError(collections.namedtuple('WriteError',
+                                        ('model', 'ids', 'vals',
+                                         'exception'))):
+    """ Information about failed write
+
+        - *model* - name of model write was called for
+        - *ids* - list of IDs of records that were not written
+        - *vals* - values that had to be written
+        - *exception* - exception raised by server
+    """
+    __slots__ = ()
+
+    def __str__(self):
+        return u"%s%s: %s" % (self.model, self.ids, self.exception)
+
+
+class WriteGroup(object):
+    """ Group of buffered writes, that have same model, values and context.
+
+        For internal use only
+    """
+    __slots__ = ('obj', 'vals', 'context', 'ids', '_id_set')
+
+    def __init__(self, obj, vals, context):
+        self.obj = obj
+        self.vals = vals
+        self.context = context
+        self.ids = []
+        self._id_set = set()
+
+    def add(self, rid):
+        if rid not in self._id_set:
+            self._id_set.add(rid)
+            self.ids.append(rid)
+
+
+class WriteBatch(object):
+    """ Buffer for write operations (unit of work)
+
+        While batch is active (inside *with* block), all calls to
+        ``Object.write`` (thus ``Record.write`` and ``RecordList.write``
+        too) are buffered instead of being sent to server.
+        On flush, records with identical values (and context) are
+        merged into single ``write(ids, vals)`` call, splitted by
+        *chunk_size* records.
+
+        Order of writes is preserved for each record: if record was written
+        with other values after write to group, it will not be merged into
+        that group again.
+
+        If server fails to write some chunk, then records of this chunk are
+        written one by one, to find out which records caused error.
+        Errors are collected and raised as
+        ``odoo_rpc_client.exceptions.WriteBatchError`` after flush.
+
+        Changes staged on records by attribute assignment
+        (``record.name = 'x'``) while batch is active, are flushed
+        together with buffered writes.
+
+        If exception raised inside *with* block, then buffered writes are
+        discarded (but changes staged on records are kept).
+
+        :param Client client: client to buffer writes for
+        :param int flush_size: flush buffer automatically, when number
+                               of buffered record writes reaches this value.
+                               Pass None to disable. Default: 10000
+        :param int chunk_size: max number of ids in single write call.
+                               Default: 1000
+
+        Usualy should be created via ``Client.batch`` method.
+    """
+
+    def __init__(self, client, flush_size=10000, chunk_size=1000):
+        self._client = client
+        self._flush_size = flush_size
+        self._chunk_size = chunk_size
+
+        self._groups = []          # list of WriteGroup instances
+        self._group_index = {}     # key -> index of last group with key
+        self._record_index = {}    # (model, id) -> index of last group
+        self._size = 0
+        self._flushing = False
+        self._tracked = []         # object caches with staged changes
+
+    @property
+    def client(self):
+        """ Client instance this batch is bound to
+        """
+        return self._client
+
+    @property
+    def size(self):
+        """ Number of buffered record writes
+        """
+        return self._size
+
+    @property
+    def flushing(self):
+        """ True while batch is sending buffered writes to server
+        """
+        return self._flushing
+
+    def write(self, obj, ids, vals, context=None):
+        """ Buffer write of *vals* to records of *obj* with *ids*
+
+            :param Object obj: object (model) to write records for
+            :param int|list ids: ID or list of IDs of records to write
+            :param dict vals: values to write
+            :param dict context: context to write with
+            :return: True
+        """
+        if isinstance(ids, six.integer_types):
+            ids = [ids]
+
+        key = (obj.name, freeze(vals), freeze(context))
+        for rid in ids:
+            gindex = self._group_index.get(key, None)
+            rindex = self._record_index.get((obj.name, rid), -1)
+            if gindex is None or rindex > gindex:
+                # record was written by later group, so to keep order
+                # of writes, new group have to be started
+                gindex = len(self._groups)
+                self._groups.append(WriteGroup(obj, dict(vals), context))
+                self._group_index[key] = gindex
+
+            self._groups[gindex].add(rid)
+            self._record_index[(obj.name, rid)] = gindex
+            self._size += 1
+
+        if self._flush_size and self._size >= self._flush_size:
+            self.flush()
+        return True
+
+    def track(self, lcache):
+        """ Flush changes staged in *lcache* together with this batch.
+            (look at ``ObjectCache.stage_field``)
+
+            :param ObjectCache lcache: object cache with staged changes
+        """
+        if not any(c is lcache for c in self._tracked):
+            self._tracked.append(lcache)
+
+    def _write_group(self, group):
+        """ Send writes of single group to server
+
+            :return: list of WriteError instances
+        """
+        errors = []
+        ids = group.ids
+        for i in range(0, len(ids), self._chunk_size):
+            chunk = ids[i:i + self._chunk_size]
+            try:
+                group.obj.write(chunk, group.vals, context=group.context)
+            except Exception as exc:
+                if len(chunk) == 1:
+                    errors.append(WriteError(group.obj.name, chunk,
+                                             group.vals, exc))
+                    continue
+
+                # Find records that caused error
+                for rid in chunk:
+                    try:
+                        group.obj.write([rid], group.vals,
+                                        context=group.context)
+                    except Exception as exc:
+                        errors.append(WriteError(group.obj.name, [rid],
+                                                 group.vals, exc))
+        return errors
+
+    def flush(self):
+        """ Send all buffered writes to server
+
+            :raises WriteBatchError: if some of writes failed
+        """
+        # staged changes are written via this batch,
+        # so they will be merged with other writes
+        tracked, self._tracked = self._tracked, []
+        for lcache in tracked:
+            lcache.flush()
+
+        groups = self._groups
+        self.clear()
+
+        errors = []
+        self._flushing = True
+        try:
+            for group in groups:
+                errors.extend(self._write_group(group))
+        finally:
+            self._flushing = False
+
+        if errors:
+            raise WriteBatchError(errors)
+
+    def clear(self):
+        """ Discard all buffered writes
+        """
+        self._groups = []
+        self._group_index = {}
+        self._record_index = {}
+        self._size = 0
+
+    def __enter__(self):
+        self._client._push_batch(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        try:
+            if exc_type is None:
+                self.flush()
+            else:
+                self.clear()
+                self._tracked = []
+        finally:
+            self._client._pop_batch(self)
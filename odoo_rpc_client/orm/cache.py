@@ -1,7 +1,58 @@
+import os
 import six
+import weakref
+import threading
 import collections
+from six.moves import queue
+from multiprocessing.pool import ThreadPool
 
-__all__ = ('empty_cache', 'Cache', 'ObjectCache')
+from ..utils import freeze
+
+__all__ = ('empty_cache', 'Cache', 'ObjectCache', 'context_key',
+           'reset_caches_after_fork')
+
+
+# Context keys, that affect data returned by server.
+# Caches are partitioned by values of these keys.
+DATA_CONTEXT_KEYS = (
+    'lang',
+    'tz',
+    'active_test',
+    'company_id',
+    'force_company',
+    'allowed_company_ids',
+)
+
+
+class _NullLock(object):
+    """ Lock, that does nothing. Used by caches in non thread-safe mode
+    """
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+NULL_LOCK = _NullLock()
+
+
+def context_key(context):
+    """ Return normalized hashable key of data-affecting part of context
+        (see *DATA_CONTEXT_KEYS*)
+
+        :param dict context: context to compute key for
+        :return: tuple of ``(key, value)`` pairs.
+                 Empty tuple if context has no data-affecting keys
+        :rtype: tuple
+    """
+    if not context:
+        return ()
+    return tuple((k, freeze(context[k]))
+                 for k in DATA_CONTEXT_KEYS
+                 if context.get(k, None) is not None)
 
 
 class ObjectCache(dict):
@@ -9,13 +60,18 @@ class ObjectCache(dict):
 
         Automatically generates empty data dicts for records requested.
         Also contains object context
+
+        If root cache is thread-safe, then operations, that iterate over
+        cache or make multiple changes to it, are protected by lock.
     """
-    __slots__ = ('_root_cache', '_object', '_context')
+    __slots__ = ('_root_cache', '_object', '_context', '_dirty', '_lock')
 
     def __init__(self, root, obj, *args, **kwargs):
         self._root_cache = root
         self._object = obj
         self._context = kwargs.pop('context', None)
+        self._dirty = {}
+        self._lock = threading.RLock() if root.thread_safe else NULL_LOCK
         super(ObjectCache, self).__init__(*args, **kwargs)
 
     @property
@@ -25,8 +81,9 @@ class ObjectCache(dict):
         return self._context
 
     def __missing__(self, key):
-        self[key] = {'id': key}
-        return self[key]
+        # setdefault is atomic, so no data will be lost if other thread
+        # adds same key at same time
+        return self.setdefault(key, {'id': key})
 
     def update_keys(self, keys):
         """ Add new IDs to cache.
@@ -35,15 +92,30 @@ class ObjectCache(dict):
             :return: self
             :rtype: ObjectCache
         """
-        if not self:
-            # for large amounts of data, this may be faster (no need for set
-            # and difference calls)
-            self.update({cid: {'id': cid} for cid in keys})
-        else:
-            self.update({cid: {'id': cid}
-                         for cid in set(keys).difference(six.viewkeys(self))})
+        with self._lock:
+            if not self:
+                # for large amounts of data, this may be faster (no need for
+                # set and difference calls)
+                self.update({cid: {'id': cid} for cid in keys})
+            else:
+                self.update({cid: {'id': cid}
+                             for cid in set(keys).difference(
+                                 six.viewkeys(self))})
         return self
 
+    def reset(self):
+        """ Remove cached values of fields and staged changes,
+            keeping IDs of records (so prefetching for record lists
+            still works)
+        """
+        if self._root_cache.thread_safe:
+            # lock could be held by thread of parent process
+            self._lock = threading.RLock()
+        with self._lock:
+            for rid in list(self):
+                self[rid] = {'id': rid}
+            self._dirty.clear()
+
     def update_context(self, new_context):
         """ Updates or sets new context for thes ObjectCache instance
 
@@ -70,8 +142,9 @@ class ObjectCache(dict):
             and find those that have no at least one field in cache.
             This is highly useful in prefetching
         """
-        return [key for key, val in six.viewitems(self)
-                if any(((field not in val) for field in fields))]
+        with self._lock:
+            return [key for key, val in six.viewitems(self)
+                    if any(((field not in val) for field in fields))]
 
     def cache_field(self, rid, ftype, field_name, value):
         """ This method impelment additional caching functionality,
@@ -84,8 +157,9 @@ class ObjectCache(dict):
         """
         self[rid][field_name] = value
         if value and ftype == 'many2one':
-            rcache = self._root_cache[self._object.
-                                      columns_info[field_name]['relation']]
+            rcache = self._root_cache.get_partition(
+                self._object.schema[field_name].relation,
+                self._context)
 
             if isinstance(value, six.integer_types):  # pragma: no cover
                 # internal dict {'id': key} will be created by default
@@ -98,10 +172,112 @@ class ObjectCache(dict):
                 # so we cache this name for futher usage too
                 rcache[value[0]]['__name_get_result'] = value[1]
         elif value and ftype in ('many2many', 'one2many'):
-            rcache = self._root_cache[self._object.
-                                      columns_info[field_name]['relation']]
+            rcache = self._root_cache.get_partition(
+                self._object.schema[field_name].relation,
+                self._context)
             rcache.update_keys(value)
 
+    @property
+    def dirty(self):
+        """ Dictionary with values staged to be written, but not flushed yet
+
+            Has form ``{record_id: {'field': value}}``
+        """
+        return self._dirty
+
+    def stage_field(self, rid, ftype, field_name, value):
+        """ Stage value to be written to field of record on next flush.
+            Staged value is immediately visible in cache.
+
+            :param int rid: Record ID
+            :param str ftype: field type
+            :param str field_name: name of field
+            :param value: value to write (in format of *write* method)
+        """
+        if ftype in ('many2many', 'one2many'):
+            if not value:
+                value = [(6, 0, [])]
+            elif all(isinstance(v, six.integer_types) for v in value):
+                value = [(6, 0, list(value))]
+
+        with self._lock:
+            self._dirty.setdefault(rid, {})[field_name] = value
+
+        if ftype in ('many2many', 'one2many'):
+            if len(value) == 1 and value[0][0] == 6:
+                self.cache_field(rid, ftype, field_name, list(value[0][2]))
+            else:
+                # other commands could not be applied to cache,
+                # so value will be reread, when requested
+                self[rid].pop(field_name, None)
+        else:
+            self.cache_field(rid, ftype, field_name, value)
+
+        batch = self._object.client.active_batch
+        if batch is not None:
+            batch.track(self)
+
+    def flush(self, ids=None):
+        """ Write values staged by *stage_field* to database.
+
+            Records with identical changes are written by single
+            *write* call.
+
+            :param list ids: list of IDs of records to flush.
+                             if not passed, all staged changes will be
+                             flushed.
+        """
+        groups = collections.OrderedDict()
+        with self._lock:
+            if ids is None:
+                ids = list(self._dirty)
+
+            for rid in ids:
+                vals = self._dirty.pop(rid, None)
+                if vals:
+                    groups.setdefault(freeze(vals),
+                                      (vals, []))[1].append(rid)
+
+        for vals, rids in groups.values():
+            self._object.write(rids, vals, context=self.context)
+
+    def get_ids_without_name(self, ids=None):
+        """ Return list of IDs, that have no display name
+            (result of *name_get*) in cache
+
+            :param list ids: list of IDs to check.
+                             if not passed, all IDs in cache will be checked
+            :rtype: list
+        """
+        if ids is None:
+            with self._lock:
+                return [key for key, val in six.viewitems(self)
+                        if val.get('__name_get_result', None) is None]
+        return [i for i in ids
+                if self[i].get('__name_get_result', None) is None]
+
+    def resolve_names(self, ids=None, chunk_size=1000):
+        """ Read display names (result of *name_get*) for records in cache,
+            that have no names cached yet. Names are read by chunks
+            of *chunk_size* records.
+
+            Note, that names returned by server as part of many2one values
+            (``(id, name)``) are already cached (see *cache_field*),
+            so they will not be read again.
+
+            :param list ids: list of IDs to resolve names for.
+                             if not passed, names will be resolved for
+                             all records in this cache.
+            :param int chunk_size: max number of records
+                                   in single *name_get* call
+        """
+        to_read = self.get_ids_without_name(ids)
+        for i in range(0, len(to_read), chunk_size):
+            chunk = to_read[i:i + chunk_size]
+            for rid, name in self._object.name_get(chunk,
+                                                   context=self.context):
+                self[rid]['__name_get_result'] = name
+
     def parse_prefetch_fields(self, fields):
         """ Parse fields to be prefetched, sparating, cache's object fields
             and related fields.
@@ -118,20 +294,37 @@ class ObjectCache(dict):
         """  # noqa
         rel_fields = collections.defaultdict(list)
         prefetch_fields = set()
+        schema = self._object.schema
         for field in fields:
             field_path = field.split('.', 1)
             xfield = field_path.pop(0)
-            xfield_info = self._object.columns_info.get(xfield, None)
+            xfield_info = schema.get(xfield, None)
             if xfield_info is not None:
                 prefetch_fields.add(xfield)
-                relation = xfield_info.get('relation', False)
+                relation = xfield_info.relation
                 if field_path and relation:
                     # only one item left
                     rel_fields[relation].append(field_path[0])
 
         return list(prefetch_fields), rel_fields
 
-    def prefetch_fields(self, fields):
+    def cache_read_result(self, result):
+        """ Put result of *read* method into this cache
+
+            :param list result: list of dictionaries returned by *read*
+        """
+        schema = self._object.schema
+        cache_field = self.cache_field
+        for data in result:
+            for field, value in data.items():
+
+                # Fill related cache
+                fschema = schema.get(field, None)
+                cache_field(data['id'],
+                            fschema.type if fschema is not None else None,
+                            field, value)
+
+    def prefetch_fields(self, fields, ids=None):
         """ Prefetch specified fields for this cache.
             Also, dot (".") may be used in field name
             to prefetch related fields::
@@ -140,23 +333,107 @@ class ObjectCache(dict):
                     ['myfield1', 'myfields2_ids.relatedfield'])
 
             :param list fields: list of fields to prefetch
+            :param list ids: list of IDs to prefetch fields for.
+                             if not passed, then fields will be
+                             prefetched for all records in this cache,
+                             that have no them read yet.
 
         """
         to_prefetch, related = self.parse_prefetch_fields(fields)
 
-        col_info = self._object.columns_info
-        for data in self._object.read(self.get_ids_to_read(*to_prefetch),
-                                      to_prefetch):
-            for field, value in data.items():
+        if ids is None:
+            ids = self.get_ids_to_read(*to_prefetch)
+        else:
+            ids = [i for i in ids
+                   if any((f not in self[i] for f in to_prefetch))]
 
-                # Fill related cache
-                ftype = col_info.get(field, {}).get('type', None)
-                self.cache_field(data['id'], ftype, field, value)
+        if ids:
+            self.cache_read_result(
+                self._object.read(ids, to_prefetch, context=self.context))
+
+        self._prefetch_related(related)
+
+    def _prefetch_related(self, related):
+        """ Prefetch related fields in related caches
 
+            :param dict related: dictionary
+                                 ``{'related.object': ['field1', ...]}``
+                                 (as returned by *parse_prefetch_fields*)
+        """
         if related:
             # TODO: think how to avoid infinite recursion and double reads
             for obj_name, rfields in related.items():
-                self._root_cache[obj_name].prefetch_fields(rfields)
+                self._root_cache.get_partition(
+                    obj_name, self._context).prefetch_fields(rfields)
+
+    def prefetch_fields_ahead(self, chunks, fields, depth=1):
+        """ Prefetch fields for chunks of IDs, reading next chunks in
+            background thread, while current one is processed.
+
+            This is generator, that yields chunks (in same order as passed)
+            right after data for chunk had been placed in cache.
+            At most *depth* chunks will be read ahead of consumer.
+            Note, that results of background reads are written to cache
+            only by thread that iterates over this generator.
+
+            :param list chunks: list of lists of IDs
+            :param list fields: list of fields to prefetch
+                                (same as for *prefetch_fields*)
+            :param int depth: number of chunks to read ahead. default: 1
+            :return: generator of chunks
+
+            For example::
+
+                chunks = [ids[i:i + 100] for i in range(0, len(ids), 100)]
+                for chunk in cache.prefetch_fields_ahead(chunks, ['name']):
+                    for rid in chunk:
+                        process(cache[rid]['name'])
+        """
+        to_prefetch, related = self.parse_prefetch_fields(fields)
+
+        # Compute ids to be read before starting background thread,
+        # so background thread does not touch cache at all
+        to_read = [[i for i in chunk
+                    if any((f not in self[i] for f in to_prefetch))]
+                   for chunk in chunks]
+
+        results = queue.Queue(maxsize=max(depth, 1))
+        stop = threading.Event()
+
+        def reader():
+            for ids in to_read:
+                try:
+                    res = (self._object.read(ids, to_prefetch,
+                                             context=self.context)
+                           if ids else [], None)
+                except Exception as exc:
+                    res = (None, exc)
+
+                # Do not block forever if consumer stopped iteration
+                while not stop.is_set():
+                    try:
+                        results.put(res, timeout=0.1)
+                    except queue.Full:
+                        continue
+                    break
+
+                if stop.is_set() or res[1] is not None:
+                    return
+
+        thread = threading.Thread(target=reader,
+                                  name='prefetch:%s' % self._object.name)
+        thread.daemon = True
+        thread.start()
+        try:
+            for chunk in chunks:
+                data, exc = results.get()
+                if exc is not None:
+                    raise exc
+                self.cache_read_result(data)
+                self._prefetch_related(related)
+                yield chunk
+        finally:
+            stop.set()
 
 
 class Cache(dict):
@@ -165,12 +442,69 @@ class Cache(dict):
         This is root cache, which manages model local cache
 
         cache['res.partner'] -> ObjectCache('res.partner')
+
+        Also cache is partitioned by data-affecting part of context
+        (language, timezone, company, active_test; see *DATA_CONTEXT_KEYS*),
+        thus same records read with different contexts
+        (for example with different languages) are stored separately::
+
+            cache.get_partition('res.partner', {'lang': 'fr_FR'})
+
+        ``cache['res.partner']`` is default partition
+        (without data-affecting context)
+
+        :param Client client: client this cache belongs to
+        :param bool thread_safe: if set to True, then cache could be
+                                 safely shared between threads
+                                 (operations that change structure of cache
+                                 are protected by locks)
+        :param snapshot: data saved by *save* method, to be restored
+                         to caches of models on first access
+        :type snapshot: odoo_rpc_client.orm.snapshot.CacheSnapshot
     """
-    __slots__ = ('_client',)
+    __slots__ = ('_client', '_partitions', '_lock', '_thread_safe',
+                 '_fork_policy', '_snapshot', '__weakref__')
 
     def __init__(self, client, *args, **kwargs):
         self._client = client
+        self._partitions = {}
+        self._thread_safe = kwargs.pop('thread_safe', False)
+        self._fork_policy = kwargs.pop('fork_policy', 'reset')
+        self._snapshot = kwargs.pop('snapshot', None)
+        self._lock = threading.RLock() if self._thread_safe else NULL_LOCK
         super(Cache, self).__init__(*args, **kwargs)
+        _caches[id(self)] = self
+
+    @property
+    def thread_safe(self):
+        """ True if this cache could be safely shared between threads
+        """
+        return self._thread_safe
+
+    @property
+    def fork_policy(self):
+        """ What to do with this cache in child process after fork:
+
+            - 'reset' (default): cached data and staged changes of records
+              are removed (IDs of records are kept). Schema of objects
+              is not stored in record cache, so it stays warm
+            - 'keep': data is kept as is (copy of parent's data)
+        """
+        return self._fork_policy
+
+    def after_fork(self):
+        """ Apply *fork_policy* to this cache.
+            Called automatically in child process after fork
+            (if ``os.register_at_fork`` is available), or by
+            *reset_caches_after_fork* function
+        """
+        if self._thread_safe:
+            # lock could be held by thread of parent process
+            self._lock = threading.RLock()
+
+        if self._fork_policy == 'reset':
+            for lcache in self.get_object_caches():
+                lcache.reset()
 
     @property
     def client(self):
@@ -184,17 +518,164 @@ class Cache(dict):
         except ValueError:
             raise KeyError("There is no object with such name: %s" % key)
 
-        # TODO: FIX: Object caches generated without context
-        self[key] = ObjectCache(self, obj)
-        return self[key]
+        # This is default partition. Caches for data-affecting contexts
+        # are created by *get_partition* method
+        new_lcache = ObjectCache(self, obj)
+        with self._lock:
+            lcache = self.setdefault(key, new_lcache)
+        if lcache is new_lcache and self._snapshot is not None:
+            self._snapshot.restore(lcache)
+        return lcache
+
+    def get_partition(self, name, context=None):
+        """ Return object cache for model *name* and *context*
+
+            Records read with same data-affecting context
+            (see *context_key*) share same object cache.
+            If there are no data-affecting keys in context,
+            then default partition (``cache[name]``) returned.
+
+            :param str name: name of model
+            :param dict context: context to get cache for
+            :rtype: ObjectCache
+        """
+        ckey = context_key(context)
+        if not ckey:
+            return self[name]
+
+        lcache = self._partitions.get((name, ckey), None)
+        if lcache is None:
+            created = False
+            with self._lock:
+                lcache = self._partitions.get((name, ckey), None)
+                if lcache is None:
+                    lcache = ObjectCache(self, self[name]._object,
+                                         context=dict(context))
+                    self._partitions[(name, ckey)] = lcache
+                    created = True
+            if created and self._snapshot is not None:
+                self._snapshot.restore(lcache, ckey)
+        return lcache
+
+    def get_object_caches(self, models=None):
+        """ Return list of all object caches (including context partitions)
+
+            :param list models: list of names of models to return caches for.
+                                If not passed, caches for all models
+                                will be returned.
+            :rtype: list of ObjectCache
+        """
+        with self._lock:
+            res = [lcache for name, lcache in six.iteritems(self)
+                   if models is None or name in models]
+            res.extend(lcache for (name, __), lcache in
+                       six.iteritems(self._partitions)
+                       if models is None or name in models)
+        return res
+
+    def evict(self, name=None, context=None):
+        """ Remove cached data.
+
+            - if *name* and *context* passed, then only partition for this
+              model and context is removed.
+            - if only *name* passed, then all partitions for this model
+              are removed
+            - if nothing passed, then all data in cache removed
+
+            :param str name: name of model
+            :param dict context: context of partition to remove
+        """
+        with self._lock:
+            if name is None:
+                self.clear()
+                self._partitions.clear()
+            elif context is not None and context_key(context):
+                self._partitions.pop((name, context_key(context)), None)
+            else:
+                self.pop(name, None)
+                if context is None:
+                    for key in [k for k in self._partitions if k[0] == name]:
+                        del self._partitions[key]
+
+    def save(self, path, models=None):
+        """ Save cached data to file, to restore it later with
+            ``empty_cache(client, snapshot=path)``.
+            (look at ``odoo_rpc_client.orm.snapshot`` module for details)
+
+            :param str path: path to file to save data to
+            :param list models: names of models to save.
+                                If not passed, all models are saved
+            :return: number of saved records
+            :rtype: int
+        """
+        from .snapshot import save_cache
+        return save_cache(self, path, models=models)
+
+    def resolve_names(self, models=None, chunk_size=1000, workers=4):
+        """ Read display names (result of *name_get*) for all records
+            in this cache, that have no names cached yet.
+            Names for different models are read in parallel threads.
+
+            :param list models: list of names of models to resolve names for.
+                                if not passed, names will be resolved for
+                                all models in this cache
+            :param int chunk_size: max number of records
+                                   in single *name_get* call
+            :param int workers: max number of models processed in parallel
+        """
+        lcaches = [c for c in self.get_object_caches(models)
+                   if c.get_ids_without_name()]
+
+        if len(lcaches) < 2 or workers < 2:
+            for lcache in lcaches:
+                lcache.resolve_names(chunk_size=chunk_size)
+            return
+
+        # each thread writes only to cache of its own model
+        pool = ThreadPool(min(workers, len(lcaches)))
+        try:
+            pool.map(lambda c: c.resolve_names(chunk_size=chunk_size),
+                     lcaches)
+        finally:
+            pool.close()
+            pool.join()
+
+
+# All alive caches (id -> cache), to apply fork policy in child processes
+_caches = weakref.WeakValueDictionary()
+
+
+def reset_caches_after_fork():
+    """ Apply fork policy (look at ``Cache.fork_policy``) to all caches.
+
+        Called automatically in child process after fork on Python 3.7+.
+        On older versions, it should be called in child process manually
+        (for example in *initializer* of ``multiprocessing.Pool``)
+    """
+    for cache in list(_caches.values()):
+        cache.after_fork()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=reset_caches_after_fork)
 
 
-def empty_cache(client):
+def empty_cache(client, thread_safe=None, snapshot=None, check_stale=True):
     """ Create instance of empty cache for Record
 
         :param Client client: instance of Client to create cache for
+        :param bool thread_safe: create cache, that could be shared between
+                                 threads. If not passed, then value of
+                                 ``client.thread_safe_caches`` is used
+        :param str snapshot: path to file saved by *Cache.save*.
+                             Data from this file is restored to caches of
+                             models on first access
+        :param bool check_stale: check *write_date* of snapshot records
+                                 on server, and skip records changed since
+                                 snapshot was made. Default: True
         :return: instance of Cache class
         :rtype: Cache
+        :raises ValueError: if snapshot was made for other database or user
 
         Cache is dictionary-like object with structure like::
 
@@ -209,4 +690,9 @@ def empty_cache(client):
             }
 
     """
-    return Cache(client)
+    if thread_safe is None:
+        thread_safe = client.thread_safe_caches
+    if snapshot is not None:
+        from .snapshot import CacheSnapshot
+        snapshot = CacheSnapshot(snapshot, client, check_stale=check_stale)
+    return Cache(client, thread_safe=thread_safe, snapshot=snapshot)
@@ -0,0 +1,231 @@
+""" This module contains *ChangeFeed* class, that allows to poll model
+for created and updated records incrementally, by *write_date*:
+
+.. code:: python
+
+    feed = cl['res.partner'].changes(since=cursor, fields=['name'])
+    for data in feed:
+        upsert(data)          # data is dict, as returned by *search_read*
+    cursor = feed.cursor      # save it for next poll
+
+Records are read by pages in stable (*write_date*, *id*) order.
+Server stores *write_date* with sub-second precision, but returns it
+truncated to seconds, thus records modified in same second could not be
+told apart by returned *write_date* value. So, records of second, where
+page ended, are read again by pages ordered by *id* (records already
+returned in same run are skipped). Cursor always points to start of
+second, so record could be returned more than once in different runs,
+thus consumers should update data by *id* (upsert).
+
+Note, that changes made by transactions, that were committed after
+poll, but started before it, could be missed, if their *write_date*
+is earlier than cursor.
+
+Deleted records could not be found by *write_date*, so if *known_ids*
+(IDs of records consumer already has) are passed, then existence of
+these records is checked on server by chunks, and IDs of missing ones
+are available as *deleted* attribute of feed after iteration.
+"""
+import datetime
+
+import six
+
+__all__ = ('ChangeFeed',)
+
+
+# Format of datetime values returned by server
+DATETIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# Max number of IDs in domain of deleted records check
+DELETE_CHUNK_SIZE = 1000
+
+
+def _second(value):
+    """ Truncate datetime string (as returned by server) to seconds
+    """
+    return value[:19]
+
+
+def _next_second(value):
+    """ Return datetime string one second later than *value*
+    """
+    dt = datetime.datetime.strptime(_second(value), DATETIME_FORMAT)
+    return (dt + datetime.timedelta(seconds=1)).strftime(DATETIME_FORMAT)
+
+
+class ChangeFeed(object):
+    """ Iterator over records of model created or updated since cursor.
+
+        Not intended to be instantiated directly,
+        use ``Object.changes`` method instead.
+
+        Cursor is tuple ``(write_date, id)``: all records modified before
+        *write_date* are already consumed, as well as records modified
+        in same second with ID less or equal to *id*.
+        Cursor is updated after each yielded record, thus iteration
+        could be stopped at any moment and resumed from *cursor* later.
+        Cursor could be saved as JSON (it will be loaded as list,
+        which is also accepted).
+
+        :param Object obj: object (model) to read changes of
+        :param tuple since: cursor returned by previous feed.
+                            If not passed, all records are returned
+                            (including ones without *write_date*)
+        :param list fields: names of fields to read
+                            (*write_date* is always read)
+        :param int batch_size: max number of records read by single RPC call
+        :param list known_ids: IDs of records to check for deletion
+        :param dict context: context to read records with.
+                             Archived records are included by default
+    """
+
+    def __init__(self, obj, since=None, fields=None, batch_size=500,
+                 known_ids=None, context=None):
+        if fields is not None and 'write_date' not in fields:
+            fields = list(fields) + ['write_date']
+        self._object = obj
+        self._fields = fields
+        self._batch_size = batch_size
+        self._known_ids = None if known_ids is None else list(known_ids)
+        self._context = dict({'active_test': False}, **(context or {}))
+
+        self.cursor = None if since is None else (since[0], since[1])
+        self.deleted = None
+        self.count = 0
+        self.pages = 0
+        self._iterator = None
+
+    @property
+    def object(self):
+        """ Object (model) changes are read from
+        """
+        return self._object
+
+    def _read(self, domain, order):
+        """ Read page of records, bypassing client-side caches
+        """
+        obj = self._object
+        execute = obj.service.execute
+        self.pages += 1
+        if obj.client.capabilities.has_search_read:
+            return execute(obj.name, 'search_read', domain=domain,
+                           fields=self._fields, limit=self._batch_size,
+                           order=order, context=self._context)
+        ids = execute(obj.name, 'search', domain, 0, self._batch_size,
+                      order, context=self._context)
+        if not ids:
+            return []
+        data = dict((r['id'], r) for r in execute(
+            obj.name, 'read', ids, self._fields, context=self._context))
+        return [data[rid] for rid in ids if rid in data]
+
+    def _by_id(self, domain, last_id, seen=None):
+        """ Read records matching domain by pages ordered by *id*,
+            starting after *last_id*
+
+            :param dict seen: {id: write_date} of records, that have to be
+                              skipped, if they were not changed
+        """
+        while True:
+            page = domain + [('id', '>', last_id)] if last_id else domain
+            rows = self._read(page, 'id')
+            for row in rows:
+                last_id = row['id']
+                if seen and seen.get(last_id, None) == row['write_date']:
+                    continue   # already returned, not changed since
+                yield row, last_id
+            if len(rows) < self._batch_size:
+                return
+
+    def _iter_changes(self):
+        """ Yield records changed since cursor, updating cursor
+        """
+        if self.cursor is None:
+            # records without write_date (created by SQL, etc)
+            for row, __ in self._by_id([('write_date', '=', False)], 0):
+                yield row
+            stamp, last_id = None, 0
+        else:
+            stamp, last_id = self.cursor
+
+        seen = {}
+        while True:
+            if stamp is not None:
+                # drain second of cursor, ordered by id
+                domain = [('write_date', '>=', stamp),
+                          ('write_date', '<', _next_second(stamp))]
+                for row, last_id in self._by_id(domain, last_id, seen):
+                    self.cursor = (stamp, last_id)
+                    yield row
+                self.cursor = (stamp, 0)
+                domain = [('write_date', '>=', _next_second(stamp))]
+            else:
+                domain = [('write_date', '!=', False)]
+
+            rows = self._read(domain, 'write_date, id')
+            if not rows:
+                return
+            stamp, last_id = _second(rows[-1]['write_date']), 0
+            seen = dict((r['id'], r['write_date']) for r in rows
+                        if _second(r['write_date']) == stamp)
+            for row in rows:
+                self.cursor = (_second(row['write_date']), 0)
+                yield row
+            if len(rows) < self._batch_size:
+                return
+
+    def find_deleted(self, ids, chunk_size=DELETE_CHUNK_SIZE):
+        """ Find records, that do not exist on server anymore
+
+            :param list ids: IDs of records to check
+            :param int chunk_size: max number of IDs checked by single
+                                   RPC call
+            :return: list of IDs of deleted records
+            :rtype: list
+        """
+        obj = self._object
+        ids = list(ids)
+        res = []
+        for i in range(0, len(ids), chunk_size):
+            chunk = ids[i:i + chunk_size]
+            existing = set(obj.service.execute(
+                obj.name, 'search', [('id', 'in', chunk)],
+                context={'active_test': False}))
+            res.extend(rid for rid in chunk if rid not in existing)
+        return res
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self._iterator is None:
+            self._iterator = self._iter_changes()
+        try:
+            row = next(self._iterator)
+        except StopIteration:
+            if self.deleted is None and self._known_ids is not None:
+                self.deleted = self.find_deleted(self._known_ids)
+            raise
+        self.count += 1
+        return row
+
+    next = __next__   # python 2 compatibility
+
+    def iter_pages(self):
+        """ Iterate over changes by pages (lists of at most *batch_size*
+            records). Cursor is consistent with last yielded page
+
+            :rtype: generator
+        """
+        page = []
+        for row in self:
+            page.append(row)
+            if len(page) >= self._batch_size:
+                yield page
+                page = []
+        if page:
+            yield page
+
+    def __repr__(self):
+        return "<ChangeFeed: %s since %s>" % (self._object.name,
+                                              six.text_type(self.cursor))
@@ -0,0 +1,168 @@
+""" This module contains *ReadCoalescer* class, that merges concurrent
+reads of same model into single *read* RPC call (DataLoader-style batching).
+
+When enabled, call of ``Object.read`` waits for short time window,
+and all reads of same model with same context, made in this window
+(from other threads), are sent to server as single *read* of union
+of requested IDs and fields. Each caller receives only rows and fields
+it requested:
+
+.. code:: python
+
+    from odoo_rpc_client.orm.coalesce import ReadCoalescer
+
+    cl.read_coalescer = ReadCoalescer(window=0.005, max_ids=500)
+"""
+import threading
+
+from ..utils import (freeze,
+                     preprocess_args)
+
+__all__ = ('ReadCoalescer',)
+
+
+class PendingRead(object):
+    """ Batch of reads waiting to be sent to server. For internal use only
+    """
+    __slots__ = ('ids', 'id_set', 'fields', 'callers',
+                 'full', 'done', 'result', 'error')
+
+    def __init__(self):
+        self.ids = []
+        self.id_set = set()
+        self.fields = set()     # None means all fields
+        self.callers = 0
+        self.full = threading.Event()
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+    def add(self, ids, fields):
+        """ Add ids and fields of one caller to batch
+        """
+        self.callers += 1
+        for rid in ids:
+            if rid not in self.id_set:
+                self.id_set.add(rid)
+                self.ids.append(rid)
+        if fields is None or self.fields is None:
+            self.fields = None
+        else:
+            self.fields.update(fields)
+
+
+class ReadCoalescer(object):
+    """ Merges concurrent reads of same model and context
+
+        :param float window: time (in seconds) first read of batch waits
+                             for other reads to join. Default: 0.005
+        :param int max_ids: batch is sent immediately when it contains
+                            this number of IDs. None means no limit.
+                            Default: 500
+    """
+
+    def __init__(self, window=0.005, max_ids=500):
+        self.window = window
+        self.max_ids = max_ids
+        self._lock = threading.Lock()
+        self._pending = {}   # key -> PendingRead
+        self._reads = 0
+        self._calls = 0
+        self._fallbacks = 0
+
+    def _send(self, obj, ids, fields, context):
+        """ Send read RPC call to server
+        """
+        args, kwargs = preprocess_args(
+            ids, None if fields is None else sorted(fields), context=context)
+        return obj.service.execute(obj.name, 'read', *args, **kwargs)
+
+    def read(self, obj, ids, fields=None, context=None):
+        """ Read *fields* of records with *ids*, merging this call with
+            concurrent reads of same model and context.
+
+            If merged read fails (for example, because one of callers
+            requested deleted record), each caller of batch repeats
+            own read separately, so errors are raised only for callers,
+            that caused them.
+
+            :param Object obj: object (model) to read records of
+            :param list ids: list of IDs of records to read
+            :param list fields: list of field names to read.
+                                if not passed, all fields will be read
+            :param dict context: context to read with
+            :return: list of dictionaries with data had been read,
+                     in order of *ids*
+            :rtype: list
+        """
+        key = (obj.client.get_url(), obj.name, freeze(context))
+        with self._lock:
+            self._reads += 1
+            batch = self._pending.get(key, None)
+            leader = batch is None
+            if leader:
+                batch = self._pending[key] = PendingRead()
+            batch.add(ids, fields)
+            if self.max_ids is not None and len(batch.ids) >= self.max_ids:
+                # batch is full: no more reads could join it
+                del self._pending[key]
+                batch.full.set()
+
+        if leader:
+            batch.full.wait(self.window)
+            with self._lock:
+                if self._pending.get(key, None) is batch:
+                    del self._pending[key]
+                self._calls += 1
+            try:
+                batch.result = self._send(obj, batch.ids, batch.fields,
+                                          context)
+            except Exception as exc:
+                batch.error = exc
+            finally:
+                batch.done.set()
+        else:
+            batch.done.wait()
+
+        if batch.error is not None:
+            if batch.callers == 1:
+                raise batch.error
+            with self._lock:
+                self._fallbacks += 1
+                self._calls += 1
+            return self._send(obj, ids, fields, context)
+
+        rows = {row['id']: row for row in batch.result}
+        if fields is not None:
+            fields = set(fields)
+            fields.add('id')
+        res = []
+        for rid in ids:
+            row = rows.get(rid, None)
+            if row is None:
+                continue
+            if fields is None:
+                res.append(dict(row))
+            else:
+                res.append({f: v for f, v in row.items() if f in fields})
+        return res
+
+    def stats(self):
+        """ Statistics of coalescing
+
+            :return: dictionary with keys: 'reads' (number of reads
+                     requested), 'calls' (number of *read* RPC calls sent),
+                     'fallbacks' (number of reads repeated separately,
+                     because merged read failed)
+            :rtype: dict
+        """
+        with self._lock:
+            return {
+                'reads': self._reads,
+                'calls': self._calls,
+                'fallbacks': self._fallbacks,
+            }
+
+    def __repr__(self):
+        return "<ReadCoalescer: %(reads)s reads, %(calls)s calls>" % (
+            self.stats())
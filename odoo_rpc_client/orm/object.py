@@ -1,16 +1,29 @@
 import six
 from extend_me import ExtensibleByHashType
-from pkg_resources import parse_version
 
 from ..utils import (AttrDict,
                      DirMixIn,
                      preprocess_args,
                      stdcall)
+from .schema import ObjectSchema
+from .changes import ChangeFeed
 
 
 __all__ = ('Object', 'get_object')
 
 
+#: Methods, that do not change data. Calls of other methods via
+#: method wrappers invalidate cached results of object
+#: (look at *Object._invalidate_results*)
+READ_METHODS = frozenset((
+    'read', 'search', 'search_count', 'search_read', 'read_group',
+    'name_get', 'name_search', 'fields_get', 'fields_view_get',
+    'get_views', 'load_views', 'default_get', 'context_get', 'get_param',
+    'exists', 'check_access_rights', 'check_access_rule', 'onchange',
+    'get_metadata', 'export_data',
+))
+
+
 ObjectType = ExtensibleByHashType._('Object', hashattr='name')
 
 
@@ -48,13 +61,14 @@ class Object(six.with_metaclass(ObjectType, DirMixIn)):
 
     """
 
-    __slots__ = ('_service', '_obj_name', '_columns_info')
+    __slots__ = ('_service', '_obj_name', '_columns_info', '_schema')
 
     def __init__(self, service, object_name):
         self._service = service
         self._obj_name = object_name
 
         self._columns_info = None
+        self._schema = None
 
     @property
     def name(self):
@@ -87,10 +101,24 @@ class Object(six.with_metaclass(ObjectType, DirMixIn)):
             """
             @stdcall
             def wrapper(*args, **kwargs):
-                return self.service.execute(object_name,
-                                            method_name,
-                                            *args,
-                                            **kwargs)
+                result_cache = self.client.result_cache
+                if (result_cache is not None and
+                        result_cache.is_cacheable(object_name, method_name)):
+                    return result_cache.call(
+                        self.client, object_name, method_name, args, kwargs,
+                        lambda: self.service.execute(object_name,
+                                                     method_name,
+                                                     *args,
+                                                     **kwargs))
+                try:
+                    return self.service.execute(object_name,
+                                                method_name,
+                                                *args,
+                                                **kwargs)
+                finally:
+                    if method_name not in READ_METHODS:
+                        # method could change data (copy, actions, etc)
+                        self._invalidate_results()
             name = str('%s:%s' % (object_name, method_name))
             wrapper.__name__ = name
             return wrapper
@@ -114,9 +142,28 @@ class Object(six.with_metaclass(ObjectType, DirMixIn)):
             "Comparable only with instances of Object class"
         return self.name == other.name and self.client == other.client
 
+    def _invalidate_results(self):
+        """ Called after data of this object is changed by this client
+            (*write*, *create*, *unlink* or other method, that is not in
+            *READ_METHODS*), to invalidate cached results of calls
+            of this object
+        """
+        for cache in (self.client.result_cache, self.client.query_cache):
+            if cache is not None:
+                cache.invalidate(self.name)
+
     def _get_columns_info(self):
         """ Calculates columns info
+
+            If client has persistent schema cache enabled
+            (``Client.schema_cache``), then *fields_get* result
+            is taken from it.
         """
+        schema_cache = self.client.schema_cache
+        if schema_cache is not None:
+            return AttrDict(schema_cache.fetch(self.client,
+                                               'fields:%s' % self.name,
+                                               self.fields_get))
         return AttrDict(self.fields_get())
 
     @property
@@ -130,10 +177,41 @@ class Object(six.with_metaclass(ObjectType, DirMixIn)):
             :rtype: odoo_rpc_client.utils.AttrDict
         """
         if self._columns_info is None:
-            self._columns_info = self._get_columns_info()
+            registry = self.client.schema_registry
+            if registry is not None:
+                self._columns_info = registry.fetch(
+                    self.client, ('fields', self.name),
+                    self._get_columns_info)
+            else:
+                self._columns_info = self._get_columns_info()
 
         return self._columns_info
 
+    def _get_schema(self):
+        """ Compiles schema of this object
+        """
+        return ObjectSchema(self.name, self.columns_info)
+
+    @property
+    def schema(self):
+        """ Compiled schema of this object (built from *columns_info*)
+
+            Provides fast access to type and relation of fields::
+
+                >>> partner_obj.schema['country_id'].relation
+                'res.country'
+
+            :rtype: odoo_rpc_client.orm.schema.ObjectSchema
+        """
+        if self._schema is None:
+            registry = self.client.schema_registry
+            if registry is not None:
+                self._schema = registry.fetch(
+                    self.client, ('schema', self.name), self._get_schema)
+            else:
+                self._schema = self._get_schema()
+        return self._schema
+
     def resolve_field_path(self, field):
         """ Resolves dot-separated field path
             to list of tuples (model, field_name, related_model)
@@ -156,15 +234,15 @@ class Object(six.with_metaclass(ObjectType, DirMixIn)):
         res = []
 
         model = self.name
-        cinfo = self.client[model].columns_info
+        schema = self.schema
         f = field_path.pop(0)
-        res.append((model, f, cinfo[f].get('relation', False)))
+        res.append((model, f, schema[f].relation))
 
         while field_path:
-            model = cinfo[f]['relation']
-            cinfo = self.client[model].columns_info
+            model = schema[f].relation
+            schema = self.client[model].schema
             f = field_path.pop(0)
-            res.append((model, f, cinfo[f].get('relation', False)))
+            res.append((model, f, schema[f].relation))
         return res
 
     @property
@@ -194,9 +272,19 @@ class Object(six.with_metaclass(ObjectType, DirMixIn)):
             :param dict context: dictionary with extra context
             :return: list of dictionaries with data had been read
             :rtype: list
+
+            Note, that if client has read coalescer
+            (``Client.read_coalescer``), then concurrent reads of this
+            object with same context are merged into single RPC call
         """
-        args, kwargs = preprocess_args(ids, fields, context=context)
-        res = self.service.execute(self.name, 'read', *args, **kwargs)
+        coalescer = self.client.read_coalescer
+        if coalescer is not None and ids:
+            res = coalescer.read(
+                self, [ids] if isinstance(ids, six.integer_types) else ids,
+                fields, context=context)
+        else:
+            args, kwargs = preprocess_args(ids, fields, context=context)
+            res = self.service.execute(self.name, 'read', *args, **kwargs)
 
         # Odoo 10 compatability fix.
         # In Odoo 10, ``model.read(<id>)`` will return list, NOT dict as in
@@ -217,9 +305,19 @@ class Object(six.with_metaclass(ObjectType, DirMixIn)):
             :param dict vals: dictinary with values to be written to database
                               for records specified by ids
             :param dict context: context dictionary
+
+            Note, that if there is active write batch (``Client.batch``),
+            then write will be buffered instead of sending it to server
         """  # noqa
+        batch = self.client.active_batch
+        if batch is not None:
+            return batch.write(self, ids, vals, context=context)
+
         args, kwargs = preprocess_args(ids, vals, context=context)
-        return self.service.execute(self.name, 'write', *args, **kwargs)
+        try:
+            return self.service.execute(self.name, 'write', *args, **kwargs)
+        finally:
+            self._invalidate_results()
 
     def create(self, vals, context=None):
         """ Create new record with *vals*
@@ -234,7 +332,40 @@ class Object(six.with_metaclass(ObjectType, DirMixIn)):
             :rtype: int
         """  # noqa
         args, kwargs = preprocess_args(vals, context=context)
-        return self.service.execute(self.name, 'create', *args, **kwargs)
+        try:
+            return self.service.execute(self.name, 'create', *args, **kwargs)
+        finally:
+            self._invalidate_results()
+
+    def create_multi(self, vals_list, chunk_size=100, context=None):
+        """ Create multiple records.
+
+            On Odoo 12.0+ records are created by chunks of *chunk_size*
+            records per RPC call (*create* method accepts list of values
+            there). On older versions, records are created one by one.
+
+            :param list vals_list: list of dictionaries with values
+                                   for new records
+            :param int chunk_size: max number of records to be created
+                                   by single RPC call. default: 100
+            :param dict context: context dictionary
+            :return: list of IDs of created records
+                     (in same order as *vals_list*)
+            :rtype: list
+        """
+        if not self.client.capabilities.has_multi_create:
+            return [self.create(vals, context=context) for vals in vals_list]
+
+        res = []
+        try:
+            for i in range(0, len(vals_list), chunk_size):
+                args, kwargs = preprocess_args(
+                    list(vals_list[i:i + chunk_size]), context=context)
+                res.extend(
+                    self.service.execute(self.name, 'create', *args, **kwargs))
+        finally:
+            self._invalidate_results()
+        return res
 
     @stdcall
     def unlink(self, ids, context=None):
@@ -246,7 +377,10 @@ class Object(six.with_metaclass(ObjectType, DirMixIn)):
             :param list ids: list of IDs of records to be deleted
         """  # noqa
         args, kwargs = preprocess_args(ids, context=context)
-        return self.service.execute(self.name, 'unlink', *args, **kwargs)
+        try:
+            return self.service.execute(self.name, 'unlink', *args, **kwargs)
+        finally:
+            self._invalidate_results()
 
     def search(self, *args, **kwargs):
         """search(args[, offset=0][, limit=None][, order=None][, count=False][, context=None])
@@ -257,6 +391,14 @@ class Object(six.with_metaclass(ObjectType, DirMixIn)):
             for this method
         """  # noqa
         _, kwargs = preprocess_args(**kwargs)  # preprocess kwargs
+
+        query_cache = self.client.query_cache
+        if (query_cache is not None and
+                query_cache.is_cacheable(self.name, 'search')):
+            return query_cache.call_query(
+                self, 'search', args, kwargs,
+                lambda: self.service.execute(self.name, 'search',
+                                             *args, **kwargs))
         return self.service.execute(self.name, 'search', *args, **kwargs)
 
     def search_read(self, domain=None, fields=None, offset=0, limit=None,
@@ -270,7 +412,7 @@ class Object(six.with_metaclass(ObjectType, DirMixIn)):
             :return: list of dictionaries with data had been read
             :rtype: list
         """  # noqa
-        if self.client.server_version >= parse_version('8.0'):
+        if self.client.capabilities.has_search_read:
             args, kwargs = preprocess_args(domain=domain,
                                            fields=fields,
                                            offset=offset,
@@ -299,8 +441,43 @@ class Object(six.with_metaclass(ObjectType, DirMixIn)):
         if domain is None:
             domain = []
 
-        if self.client.server_version >= parse_version('8.0'):
-            return self.service.execute(
-                self.name, 'search_count', domain, context=context)
-        else:
+        if not self.client.capabilities.has_search_count:
             return self.search(domain, count=True, context=context)
+
+        query_cache = self.client.query_cache
+        if (query_cache is not None and
+                query_cache.is_cacheable(self.name, 'search_count')):
+            return query_cache.call_query(
+                self, 'search_count', (domain,), {'context': context},
+                lambda: self.service.execute(
+                    self.name, 'search_count', domain, context=context))
+        return self.service.execute(
+            self.name, 'search_count', domain, context=context)
+
+    def changes(self, since=None, fields=None, batch_size=500,
+                known_ids=None, context=None):
+        """ Iterate over records created or updated since *since* cursor,
+            in stable (*write_date*, *id*) order
+
+            .. code:: python
+
+                feed = partner_obj.changes(since=cursor, fields=['name'])
+                for data in feed:
+                    upsert(data)
+                cursor = feed.cursor
+
+            :param tuple since: cursor (``feed.cursor``) of previous poll.
+                                If not passed, all records are returned
+            :param list fields: names of fields to read
+            :param int batch_size: max number of records read by single
+                                   RPC call. Default: 500
+            :param list known_ids: IDs of records to check for deletion.
+                                   IDs of deleted ones are available as
+                                   ``feed.deleted`` after iteration
+            :param dict context: context to read records with
+            :return: iterator over dictionaries with data of records
+            :rtype: odoo_rpc_client.orm.changes.ChangeFeed
+        """
+        return ChangeFeed(self, since=since, fields=fields,
+                          batch_size=batch_size, known_ids=known_ids,
+                          context=context)
@@ -0,0 +1,179 @@
+""" This module contains logic to process record lists by chunks
+in parallel threads or processes.
+
+Usually it is used via ``RecordList.parallel_call`` and
+``RecordList.parallel_map`` methods:
+
+.. code:: python
+
+    orders = cl['sale.order'].search_records([('state', '=', 'draft')])
+    res = orders.parallel_call('action_confirm', chunk_size=100, workers=8)
+    print(res.throughput)   # records per second
+    for chunk in res.errors:
+        print(chunk.ids, chunk.error)
+"""
+import time
+import pickle
+import collections
+import multiprocessing
+from multiprocessing.pool import ThreadPool
+
+__all__ = ('ChunkResult', 'ParallelResult')
+
+
+class ChunkResult(collections.namedtuple('ChunkResult',
+                                         ('ids', 'result', 'error',
+                                          'duration'))):
+    """ Result of processing of single chunk
+
+        - *ids* - list of IDs of records in chunk
+        - *result* - value returned for chunk (None if failed)
+        - *error* - exception raised while processing chunk or None
+        - *duration* - time (in seconds) spent to process chunk
+    """
+    __slots__ = ()
+
+
+class ParallelResult(object):
+    """ Result of parallel processing of record list
+
+        :param list chunks: list of *ChunkResult* instances
+                            (in same order as chunks of record list)
+        :param float duration: total time (in seconds) of processing
+    """
+
+    def __init__(self, chunks, duration):
+        self.chunks = chunks
+        self.duration = duration
+
+    @property
+    def results(self):
+        """ List of results of successfully processed chunks
+        """
+        return [c.result for c in self.chunks if c.error is None]
+
+    @property
+    def errors(self):
+        """ List of *ChunkResult* instances for failed chunks
+        """
+        return [c for c in self.chunks if c.error is not None]
+
+    @property
+    def failed_ids(self):
+        """ IDs of records in failed chunks
+        """
+        return [rid for c in self.errors for rid in c.ids]
+
+    @property
+    def count(self):
+        """ Number of processed records (including failed ones)
+        """
+        return sum(len(c.ids) for c in self.chunks)
+
+    @property
+    def throughput(self):
+        """ Number of records processed per second
+        """
+        if not self.duration:
+            return float(self.count)
+        return self.count / self.duration
+
+    def __repr__(self):
+        return "<ParallelResult: %s records, %s chunks, %s errors, %.2fs>" % (
+            self.count, len(self.chunks), len(self.errors), self.duration)
+
+
+def _safe_error(exc):
+    """ Make sure exception could be sent back from worker process
+    """
+    try:
+        pickle.dumps(exc)
+    except Exception:
+        return Exception(repr(exc))
+    return exc
+
+
+def _process_chunk(args):
+    """ Process single chunk. Executed in worker thread or process.
+
+        :param tuple args: (func, chunk, safe), where *func* is function
+                           to call with chunk (RecordList),
+                           and *safe* is True if error have to be picklable
+    """
+    func, chunk, safe = args
+    start = time.time()
+    try:
+        result, error = func(chunk), None
+    except Exception as exc:
+        result, error = None, _safe_error(exc) if safe else exc
+    return ChunkResult(chunk.ids, result, error, time.time() - start)
+
+
+# Client created in worker process by *_init_worker*
+_worker_client = None
+
+
+def _init_worker(init_args, pwd):
+    """ Initializer of worker process. Creates client, that records
+        of chunks are attached to on unpickling (look at
+        *Client.__reduce__*), thus worker process does not depend on
+        client inherited from parent process (which is not available
+        with *spawn* and *forkserver* start methods), and uses its own
+        connection to server. For internal use only
+    """
+    global _worker_client
+    from ..client import Client
+    _worker_client = Client(pwd=pwd, **init_args)
+
+
+class MethodCaller(object):
+    """ Picklable callable, that calls RPC method on record list.
+        For internal use only
+    """
+
+    def __init__(self, method, args, kwargs):
+        self.method = method
+        self.args = args
+        self.kwargs = kwargs
+
+    def __call__(self, records):
+        return getattr(records, self.method)(*self.args, **self.kwargs)
+
+
+def run_parallel(chunks, func, workers=4, executor='thread'):
+    """ Call *func* for each chunk in parallel
+
+        :param list chunks: list of record lists (of same client)
+        :param callable func: function to call for each chunk.
+                              Must be picklable for 'process' executor
+        :param int workers: number of parallel workers
+        :param str executor: 'thread' or 'process'
+        :return: result of processing
+        :rtype: ParallelResult
+        :raises ValueError: on unsupported executor
+    """
+    if executor == 'thread':
+        pool_cls = ThreadPool
+    elif executor == 'process':
+        pool_cls = multiprocessing.Pool
+    else:
+        raise ValueError("Unsupported executor: %r" % executor)
+
+    start = time.time()
+    tasks = [(func, chunk, executor == 'process') for chunk in chunks]
+    if not tasks:
+        return ParallelResult([], 0.0)
+
+    pool_args = ()
+    if executor == 'process':
+        # password is passed to workers (not pickled with records)
+        client = chunks[0].object.client
+        pool_args = (_init_worker, (client.get_init_args(), client._pwd))
+
+    pool = pool_cls(max(1, min(workers, len(tasks))), *pool_args)
+    try:
+        res = pool.map(_process_chunk, tasks)
+    finally:
+        pool.close()
+        pool.join()
+    return ParallelResult(res, time.time() - start)
@@ -0,0 +1,190 @@
+""" This module contains *PrefetchProfiles* class, that learns which fields
+of each model are accessed by code, and makes records read all learned
+fields by single RPC call, when first of them is accessed:
+
+.. code:: python
+
+    from odoo_rpc_client.orm.prefetch import PrefetchProfiles
+
+    cl.auto_prefetch = PrefetchProfiles(path='~/.cache/myscript.prefetch')
+    for order in cl['sale.order'].search_records([]):
+        # first run: each field is read by separate RPC call
+        # (for all records of list); next lists and next runs:
+        # all three fields are read by single call on access to
+        # *name* field
+        print(order.name, order.partner_id.name, order.amount_total)
+    cl.auto_prefetch.save()
+
+Fields are learned, when value of field requested from record is not
+in cache yet (look at *Record._get_field*). Binary fields are never
+prefetched.
+"""
+import os
+import json
+import threading
+
+import six
+
+__all__ = ('PrefetchProfiles',)
+
+
+class PrefetchProfiles(object):
+    """ Learned sets of accessed fields per model
+
+        :param str path: path to JSON file to load profiles from
+                         (if it exists) and to save profiles to.
+                         If not passed, profiles are kept in memory only
+        :param int max_fields: max number of fields prefetched for model
+                               (most frequently accessed ones).
+                               Default: 20
+        :param int min_count: number of accesses to field (that caused
+                              read) required to prefetch it. Default: 1
+    """
+
+    def __init__(self, path=None, max_fields=20, min_count=1):
+        self.path = (None if path is None else
+                     os.path.abspath(os.path.expanduser(path)))
+        self.max_fields = max_fields
+        self.min_count = min_count
+
+        self._lock = threading.Lock()
+        self._profiles = {}   # model -> {field: count}
+        self._fields = {}     # model -> tuple of fields to prefetch
+        self._learned = 0
+        self._reads = 0
+        self._prefetched = 0
+
+        if self.path is not None and os.path.exists(self.path):
+            self.load(self.path)
+
+    def _update_fields(self, model):
+        """ Recompute fields to prefetch for model.
+            Have to be called with lock acquired
+        """
+        counts = self._profiles.get(model, {})
+        fields = sorted((f for f, c in six.iteritems(counts)
+                         if c >= self.min_count),
+                        key=lambda f: (-counts[f], f))
+        self._fields[model] = tuple(fields[:self.max_fields])
+
+    def learn(self, model, field):
+        """ Register access to field, which value was not in cache
+
+            :param str model: name of model
+            :param str field: name of field
+        """
+        with self._lock:
+            counts = self._profiles.setdefault(model, {})
+            counts[field] = counts.get(field, 0) + 1
+            self._learned += 1
+            self._update_fields(model)
+
+    def get_fields(self, model):
+        """ Return fields, that have to be prefetched for model
+
+            :param str model: name of model
+            :rtype: tuple
+        """
+        return self._fields.get(model, ())
+
+    def fields_to_read(self, obj, field, data):
+        """ Learn access to *field* of object (model), and return list
+            of fields, that have to be read together with it
+
+            :param Object obj: object (model) field belongs to
+            :param str field: name of field accessed
+            :param dict data: cached data of record field is accessed on
+            :return: list of fields, starting with *field*
+            :rtype: list
+        """
+        self.learn(obj.name, field)
+        schema = obj.schema
+        res = [field]
+        for fname in self.get_fields(obj.name):
+            if fname == field or fname in data:
+                continue
+            fschema = schema.get(fname, None)
+            if fschema is not None and not fschema.heavy:
+                res.append(fname)
+
+        with self._lock:
+            self._reads += 1
+            if len(res) > 1:
+                self._prefetched += 1
+        return res
+
+    def forget(self, model=None):
+        """ Remove learned profiles
+
+            :param str model: name of model to forget profile of.
+                              If not passed, all profiles are removed
+        """
+        with self._lock:
+            if model is None:
+                self._profiles.clear()
+                self._fields.clear()
+            else:
+                self._profiles.pop(model, None)
+                self._fields.pop(model, None)
+
+    def load(self, path=None):
+        """ Load profiles from JSON file, merging them with learned ones
+
+            :param str path: path to file. Default: *path* passed
+                             to constructor
+        """
+        path = self.path if path is None else path
+        with open(path, 'r') as f:
+            data = json.load(f)
+        with self._lock:
+            for model, counts in six.iteritems(data):
+                profile = self._profiles.setdefault(model, {})
+                for field, count in six.iteritems(counts):
+                    profile[field] = profile.get(field, 0) + count
+                self._update_fields(model)
+
+    def save(self, path=None):
+        """ Save learned profiles to JSON file
+
+            :param str path: path to file. Default: *path* passed
+                             to constructor
+            :raises ValueError: if path is not specified
+        """
+        path = self.path if path is None else path
+        if path is None:
+            raise ValueError("Path to save prefetch profiles is not set")
+
+        dir_name = os.path.dirname(path)
+        if dir_name and not os.path.exists(dir_name):
+            os.makedirs(dir_name)
+
+        with self._lock:
+            data = json.dumps(self._profiles, sort_keys=True, indent=1)
+
+        # write to temporary file first, to not break profiles
+        # on concurrent save
+        tmp_path = '%s.%s.tmp' % (path, os.getpid())
+        with open(tmp_path, 'w') as f:
+            f.write(data)
+        os.rename(tmp_path, path)
+
+    def stats(self):
+        """ Statistics of usage
+
+            :return: dictionary with keys: 'models' (number of models
+                     with learned profiles), 'learned' (number of
+                     registered field accesses), 'reads' (number of reads
+                     caused by field access), 'prefetched' (reads, that
+                     included learned fields)
+            :rtype: dict
+        """
+        with self._lock:
+            return {
+                'models': len(self._profiles),
+                'learned': self._learned,
+                'reads': self._reads,
+                'prefetched': self._prefetched,
+            }
+
+    def __repr__(self):
+        return "<PrefetchProfiles: %(models)s models>" % self.stats()
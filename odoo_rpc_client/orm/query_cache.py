@@ -0,0 +1,235 @@
+""" This module contains *QueryCache* class, that caches results of
+*search* and *search_count* calls (and thus IDs found by *search_records*)
+
+.. code:: python
+
+    from odoo_rpc_client.orm.query_cache import QueryCache
+
+    cl.query_cache = QueryCache(ttl=30, models=['product.product'])
+    products = cl['product.product']
+    products.search([('active', '=', True)])   # RPC call
+    products.search([('active', '=', True)])   # cached result
+
+Cached results of model are invalidated, when this client calls *write*,
+*create*, *unlink* or any other method, that could change data (*copy*,
+actions, workflow methods, ...) on this model via ``Object``.
+Changes made by other clients, changes of model made by methods of other
+models, and changes made by raw ``client.execute`` calls are not tracked,
+thus they become visible after *ttl* seconds, or, if *revalidate* is
+enabled, when max *write_date* of model changes.
+
+Note, that only changes of model itself are tracked, while domain
+could refer to fields of related models
+(for example ``[('partner_id.name', '=', 'Me')]``).
+"""
+import six
+import time
+
+from .result_cache import ResultCache
+from ..utils import freeze
+
+__all__ = ('QueryCache',)
+
+
+# Names of positional arguments of *search* method
+SEARCH_ARGS = ('domain', 'offset', 'limit', 'order', 'count')
+
+# Default values of *search* arguments, that could be omitted from key
+SEARCH_DEFAULTS = {
+    'offset': 0,
+    'limit': None,
+    'order': None,
+    'count': False,
+    'context': None,
+}
+
+
+def normalize_search_args(args, kwargs):
+    """ Convert arguments of *search* or *search_count* call
+        to dictionary of non-default values
+
+        :param tuple args: positional arguments of call
+        :param dict kwargs: keyword arguments of call
+        :return: dictionary of arguments
+        :rtype: dict
+    """
+    params = dict(six.moves.zip(SEARCH_ARGS, args))
+    params.update(kwargs)
+    if 'args' in params:
+        params['domain'] = params.pop('args')
+    params['domain'] = params.get('domain', None) or []
+    if params.get('limit', None) is False:
+        params['limit'] = None
+    return {k: v for k, v in params.items()
+            if k not in SEARCH_DEFAULTS or v != SEARCH_DEFAULTS[k]}
+
+
+class QueryCache(ResultCache):
+    """ Cache of results of *search* and *search_count* calls
+
+        Results are keyed by client URL, model, method and normalized
+        arguments: domain, offset, limit, order and context.
+
+        Results of model are invalidated by calls of this model's methods
+        (except read-only ones) made via ``Object``. Other changes
+        are detected only by *ttl* or *revalidate* (look at module
+        documentation).
+
+        :param float ttl: time (in seconds) cached result is valid.
+                          Default: 30
+        :param int max_size: max number of cached results. When reached,
+                             least recently used results are removed.
+                             None means no limit. Default: 256
+        :param list models: names of models to cache queries of.
+                            None means all models
+        :param bool revalidate: if set to True, then before returning
+                                cached result, max *write_date* of model
+                                is checked (one cheap RPC call), and if it
+                                was changed since result was cached, then
+                                query is repeated. Deleted records are not
+                                detected by this check. Models without
+                                *write_date* field rely on *ttl* only
+        :param float probe_interval: max age (in seconds) of result of
+                                     *write_date* check, that could be
+                                     reused for other cached queries of same
+                                     model. Default: 1
+    """
+
+    def __init__(self, ttl=30, max_size=256, models=None, revalidate=False,
+                 probe_interval=1):
+        super(QueryCache, self).__init__(
+            ttl=ttl, max_size=max_size, methods=['search', 'search_count'])
+        self.models = None if models is None else frozenset(models)
+        self.revalidate = revalidate
+        self.probe_interval = probe_interval
+        self._stamps = {}    # (url, model) -> (check time, max write_date)
+        self._probes = 0
+        self._stale = 0
+
+    def is_cacheable(self, model, method='search'):
+        """ Check if results of *method* of *model* have to be cached
+
+            :rtype: bool
+        """
+        return (method in self.methods and
+                (self.models is None or model in self.models))
+
+    def get_key(self, client, model, method, args, kwargs):
+        """ Compute key of call
+
+            :return: hashable key of call, or None if arguments
+                     are not hashable
+        """
+        params = normalize_search_args(args, kwargs)
+        key = (client.get_url(), model, method, freeze(params))
+        try:
+            hash(key)
+        except TypeError:
+            return None
+        return key
+
+    def _probe(self, obj):
+        """ Read max *write_date* of records of object (model)
+        """
+        # Call service directly, to avoid caching of this query
+        execute = obj.service.execute
+        context = {'active_test': False}
+        try:
+            if obj.client.capabilities.has_search_read:
+                res = execute(obj.name, 'search_read', domain=[],
+                              fields=['write_date'], order='write_date desc',
+                              limit=1, context=context)
+            else:
+                ids = execute(obj.name, 'search', [], 0, 1,
+                              'write_date desc', context=context)
+                res = execute(obj.name, 'read', ids, ['write_date'],
+                              context=context) if ids else []
+        except Exception:
+            # model without write_date, or no access to it
+            return None
+        return res[0]['write_date'] if res else None
+
+    def get_stamp(self, obj):
+        """ Get max *write_date* of records of object (model),
+            reusing results of recent checks
+
+            :param Object obj: object to check
+            :return: max write date (as returned by server)
+        """
+        skey = (obj.client.get_url(), obj.name)
+        now = time.time()
+        with self._lock:
+            checked = self._stamps.get(skey, None)
+            if checked is not None and now - checked[0] < self.probe_interval:
+                return checked[1]
+            self._probes += 1
+
+        stamp = self._probe(obj)
+        with self._lock:
+            self._stamps[skey] = (now, stamp)
+        return stamp
+
+    def call_query(self, obj, method, args, kwargs, func):
+        """ Return cached result of query, or call *func* and cache result
+
+            :param Object obj: object (model) query is made on
+            :param str method: 'search' or 'search_count'
+            :param tuple args: positional arguments of call
+            :param dict kwargs: keyword arguments of call
+            :param callable func: function without arguments, that
+                                  makes RPC call
+            :return: result of query (copy of cached value)
+        """
+        key = self.get_key(obj.client, obj.name, method, args, kwargs)
+        if key is None:
+            return func()
+
+        stamp = self.get_stamp(obj) if self.revalidate else None
+        found, cached = self._get(key, count=False)
+        with self._lock:
+            if found and cached[0] == stamp:
+                self._hits += 1
+                return cached[1]
+            if found:
+                self._stale += 1
+            self._misses += 1
+
+        result = func()
+        self._set(key, (stamp, result), self.ttl)
+        return result
+
+    def invalidate(self, model=None, method=None, client=None):
+        """ Remove cached results. Also look at *ResultCache.invalidate*
+        """
+        with self._lock:
+            for skey in list(self._stamps):
+                if model is None or skey[1] == model:
+                    del self._stamps[skey]
+        return super(QueryCache, self).invalidate(model=model, method=method,
+                                                  client=client)
+
+    def clear(self):
+        """ Remove all cached results
+        """
+        with self._lock:
+            self._stamps.clear()
+        super(QueryCache, self).clear()
+
+    def stats(self):
+        """ Statistics of cache usage
+
+            :return: dictionary with keys: 'entries', 'hits', 'misses',
+                     'evictions', 'invalidations' (same as for
+                     *ResultCache*), 'probes' (number of *write_date*
+                     checks), 'stale' (cached results rejected because
+                     of changed *write_date*)
+            :rtype: dict
+        """
+        res = super(QueryCache, self).stats()
+        with self._lock:
+            res.update(probes=self._probes, stale=self._stale)
+        return res
+
+    def __repr__(self):
+        return "<QueryCache: %(entries)s entries, %(hits)s hits>" % (
+            self.stats())
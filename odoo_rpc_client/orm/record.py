@@ -9,10 +9,13 @@ from ..utils import (wpartial,
 from .object import Object
 from .cache import (empty_cache,
                     Cache)
+from .parallel import (run_parallel,
+                       MethodCaller)
 
 
 import six
 import abc
+import array
 import numbers
 import functools
 import collections
@@ -32,6 +35,22 @@ __all__ = (
 RecordMeta = ExtensibleByHashType._('Record', hashattr='object_name')
 
 
+def _restore_record(client, object_name, rid, context):
+    """ Restore pickled record. For internal use only.
+
+        (look at *Record.__reduce__*)
+    """
+    return get_record(client[object_name], rid, context=context)
+
+
+def _restore_record_list(client, object_name, ids, context):
+    """ Restore pickled record list. For internal use only.
+
+        (look at *RecordList.__reduce__*)
+    """
+    return get_record_list(client[object_name], list(ids), context=context)
+
+
 def get_record(obj, rid, cache=None, context=None):
     """ Creates new Record instance
 
@@ -102,6 +121,13 @@ class Record(six.with_metaclass(RecordMeta, DirMixIn)):
                 for pso in product.sale_orders:
                     print("\t%s" % pso.name)
 
+        Assignment to public attribute, which name is name of writable
+        field of model (``record.name = 'x'``), stages change of this field
+        (see *flush*), instead of setting instance attribute.
+        Assignment to readonly field attribute raises *AttributeError*,
+        while item assignment (``record['state'] = 'done'``) stages change
+        of any field.
+
 
         :param Object obj: instance of object this record is related to
         :param int rid: ID of database record to fetch data from
@@ -116,6 +142,10 @@ class Record(six.with_metaclass(RecordMeta, DirMixIn)):
 
     __slots__ = ['_object', '_cache', '_lcache', '_id', '_related_objects']
 
+    # If set to False, then *str* / *repr* will never call *name_get*
+    # (display name shown only if it is already in cache)
+    _repr_rpc = True
+
     def __init__(self, obj, rid, cache=None, context=None):
         assert isinstance(obj, Object), "obj should be Object"
         assert isinstance(rid, numbers.Integral), "rid must be int"
@@ -123,7 +153,7 @@ class Record(six.with_metaclass(RecordMeta, DirMixIn)):
         self._id = rid
         self._object = obj
         self._cache = empty_cache(obj.client) if cache is None else cache
-        self._lcache = self._cache[obj.name]
+        self._lcache = self._cache.get_partition(obj.name, context)
         self._related_objects = {}
 
         self._lcache[self._id]  # ensure that ID of this record is in cache.
@@ -194,13 +224,14 @@ class Record(six.with_metaclass(RecordMeta, DirMixIn)):
             :rtype: str
         """
         if self._data.get('__name_get_result', None) is None:
-            lcache = self._lcache
-            data = self._object.name_get(list(lcache), context=self.context)
-            for _id, name in data:
-                lcache[_id]['__name_get_result'] = name
+            # read names for all records in cache, that have no name yet
+            self._lcache.resolve_names()
         return self._data.get('__name_get_result', u'ERROR')
 
     def __str__(self):
+        if not self._repr_rpc and '__name_get_result' not in self._data:
+            return u"R(%s, %s)" % (self._object.name, self.id)
+
         return u"R(%s, %s)[%s]" % (self._object.name,
                                    self.id,
                                    ustr(self._name))
@@ -211,6 +242,14 @@ class Record(six.with_metaclass(RecordMeta, DirMixIn)):
     def __int__(self):
         return self._id
 
+    def __reduce__(self):
+        # Pickle only client, model name, ID and context.
+        # Cached data is not pickled. Client is pickled by
+        # its init args (look at *Client.__reduce__*)
+        return (_restore_record,
+                (self._object.client, self._object.name,
+                 self._id, self.context))
+
     def __hash__(self):
         return hash((self._object.name, self._id))
 
@@ -238,7 +277,7 @@ class Record(six.with_metaclass(RecordMeta, DirMixIn)):
                           else rel_data)
 
                 rel_obj = self._service.get_obj(
-                    self._columns_info[name]['relation'])
+                    self._object.schema[name].relation)
                 self._related_objects[name] = get_record(rel_obj,
                                                          rel_id,
                                                          cache=self._cache,
@@ -253,13 +292,34 @@ class Record(six.with_metaclass(RecordMeta, DirMixIn)):
         """
         if name not in self._related_objects or not cached:
             rel_obj = self._service.get_obj(
-                self._columns_info[name]['relation'])
+                self._object.schema[name].relation)
             self._related_objects[name] = get_record_list(rel_obj,
                                                           rel_ids,
                                                           cache=self._cache,
                                                           context=self.context)
         return self._related_objects[name]
 
+    def _prefetch_learned(self, profiles, ftype, name):
+        """ Read field 'name' together with fields learned by
+            prefetch profiles (``Client.auto_prefetch``) for all records
+            in cache, that have not read requested field.
+
+            Values of learned fields, that are already in cache,
+            are not overwritten
+        """
+        fields = profiles.fields_to_read(self._object, name, self._data)
+        lcache = self._lcache
+        schema = self._object.schema
+        for data in self._object.read(lcache.get_ids_to_read(name), fields,
+                                      context=self.context):
+            rid = data['id']
+            lcache.cache_field(rid, ftype, name, data[name])
+            cached = lcache[rid]
+            for fname in fields[1:]:
+                if fname not in cached:
+                    lcache.cache_field(rid, schema[fname].type,
+                                       fname, data[fname])
+
     def _get_field(self, ftype, name):
         """ Returns value for field 'name' of type 'type'
 
@@ -270,15 +330,19 @@ class Record(six.with_metaclass(RecordMeta, DirMixIn)):
             for diferent field values
         """
         if name not in self._data:
-            # save 'cache_field' function before for loop
-            cache_field = self._lcache.cache_field
+            auto_prefetch = self._client.auto_prefetch
+            if auto_prefetch is not None:
+                self._prefetch_learned(auto_prefetch, ftype, name)
+            else:
+                # save 'cache_field' function before for loop
+                cache_field = self._lcache.cache_field
 
-            # get list of ids in cache, that have not read requested field
-            for data in self._object.read(self._lcache.get_ids_to_read(name),
-                                          [name],
-                                          context=self.context):
-                # write each row of data to cache
-                cache_field(data['id'], ftype, name, data[name])
+                # get list of ids in cache, that have not read requested field
+                for data in self._object.read(
+                        self._lcache.get_ids_to_read(name), [name],
+                        context=self.context):
+                    # write each row of data to cache
+                    cache_field(data['id'], ftype, name, data[name])
 
         # relational fields
         if ftype == 'many2one':
@@ -293,16 +357,37 @@ class Record(six.with_metaclass(RecordMeta, DirMixIn)):
         if name == 'id':
             return self.id
 
-        field = self._columns_info.get(name, None)
+        field = self._object.schema.get(name, None)
 
         if field is None:
             raise KeyError("No such field %s in object %s, %s"
                            "" % (name, self._object.name, self.id))
 
-        ftype = field and field['type']
-
         # TODO: refactore to be able to pass field instead of only field type
-        return self._get_field(ftype, name)
+        return self._get_field(field.type, name)
+
+    # Allow to stage changes in fields in dictionary style
+    def __setitem__(self, name, value):
+        field = self._object.schema.get(name, None)
+
+        if field is None:
+            raise KeyError("No such field %s in object %s, %s"
+                           "" % (name, self._object.name, self.id))
+
+        ftype = field.type
+        if isinstance(value, Record):
+            value = value.id
+        elif isinstance(value, RecordList):
+            value = value.ids
+        elif ftype in ('many2many', 'one2many'):
+            # False / None / [] clear field
+            value = [v.id if isinstance(v, Record) else v
+                     for v in (value or [])]
+        elif value is None:
+            value = False
+
+        self._lcache.stage_field(self._id, ftype, name, value)
+        self._related_objects.pop(name, None)
 
     # Allow to access data as attributes and call object's methods
     # directly from record object
@@ -315,12 +400,55 @@ class Record(six.with_metaclass(RecordMeta, DirMixIn)):
             setattr(self, name, res)
         return res
 
+    # Allow to stage changes in fields via attribute assignment.
+    # Only writable fields could be assigned this way, use item assignment
+    # (``record['field'] = value``) to stage value of readonly field
+    def __setattr__(self, name, value):
+        field = None
+        if not name.startswith('_'):
+            field = self._object.schema.get(name, None)
+
+        if field is None:
+            super(Record, self).__setattr__(name, value)
+        elif field.info.get('readonly', False):
+            raise AttributeError(
+                "Field %s of object %s is readonly. Use record[%r] = value "
+                "to stage change anyway" % (name, self._object.name, name))
+        else:
+            self[name] = value
+
+    @property
+    def _dirty(self):
+        """ Dictionary with changes staged for this record, but not
+            written to database yet
+
+            :rtype: dict
+        """
+        return self._lcache.dirty.get(self._id, {})
+
+    def flush(self):
+        """ Write changes staged for this record to database
+
+            Changes could be staged via assignment to record fields::
+
+                >>> partner.name = 'John'
+                >>> partner['email'] = 'john@example.com'
+                >>> partner.flush()  # single write call
+
+            :returns: self
+            :rtype: Record
+        """
+        self._lcache.flush([self._id])
+        return self
+
     def refresh(self):
-        """Reread data and clean-up the caches
+        """Reread data and clean-up the caches.
+           Changes staged for this record and not flushed yet are discarded
 
            :returns: self
            :rtype: Record
         """
+        self._lcache.dirty.pop(self._id, None)
         self._data.clear()
         self._data['id'] = self._id
 
@@ -473,7 +601,7 @@ class RecordList(six.with_metaclass(RecordListMeta,
         """
         self._object = obj
         self._cache = empty_cache(obj.client) if cache is None else cache
-        self._lcache = self._cache[obj.name]
+        self._lcache = self._cache.get_partition(obj.name, context)
 
         if context is not None:
             self._lcache.update_context(context)
@@ -488,7 +616,8 @@ class RecordList(six.with_metaclass(RecordListMeta,
         self._lcache.update_keys(ids)
 
         _cache = self._cache  # before loop, save cache in separate variable
-        self._records = [get_record(obj, id_, cache=_cache)
+        # records have to use same cache partition as this list
+        self._records = [get_record(obj, id_, cache=_cache, context=context)
                          for id_ in ids]
 
         # if there some fields prefetching was requested, do it
@@ -551,10 +680,10 @@ class RecordList(six.with_metaclass(RecordListMeta,
     # Container related methods
     def __getitem__(self, index):
         if isinstance(index, slice):
-            # Note no context passed, because it is stored in cache
             return get_record_list(self.object,
                                    ids=[r.id for r in self._records[index]],
-                                   cache=self._cache)
+                                   cache=self._cache,
+                                   context=self.context)
         return self._records[index]
 
     def __setitem__(self, index, value):
@@ -584,12 +713,14 @@ class RecordList(six.with_metaclass(RecordListMeta,
         if isinstance(other, Record) and self._object == other._object:
             return get_record_list(self._object,
                                    self.ids + [other.id],
-                                   cache=self._cache)
+                                   cache=self._cache,
+                                   context=self.context)
 
         if isinstance(other, RecordList) and self._object == other._object:
             return get_record_list(self._object,
                                    self.ids + other.ids,
-                                   cache=self._cache)
+                                   cache=self._cache,
+                                   context=self.context)
         return NotImplemented
 
     def __iadd__(self, other):
@@ -614,7 +745,7 @@ class RecordList(six.with_metaclass(RecordListMeta,
             self._records.insert(index, item)
         else:
             self._records.insert(index, self._object.read_records(
-                item, cache=self._cache))
+                item, cache=self._cache, context=self.context))
         return self
 
     # Overridden to make ability to call methods of object on list of IDs
@@ -628,6 +759,14 @@ class RecordList(six.with_metaclass(RecordListMeta,
     def __str__(self):
         return u"RecordList(%s): length=%s" % (self.object.name, self.length)
 
+    def __reduce__(self):
+        # Pickle only client, model name, array of IDs and context.
+        # Cached data is not pickled. Client is pickled by
+        # its init args (look at *Client.__reduce__*)
+        return (_restore_record_list,
+                (self._object.client, self._object.name,
+                 array.array('l', self.ids), self.context))
+
     def __repr__(self):
         return str(self)
 
@@ -641,6 +780,23 @@ class RecordList(six.with_metaclass(RecordListMeta,
             record.refresh()
         return self
 
+    def flush(self):
+        """ Write changes staged for records of this list to database.
+            Records with identical changes are written by single
+            *write* call.
+
+            For example::
+
+                >>> for order in orders:
+                ...     order.note = 'Checked'
+                >>> orders.flush()  # single write call for all orders
+
+           :returns: self
+           :rtype: instance of RecordList
+        """
+        self._lcache.flush(self.ids)
+        return self
+
     def sort(self, key=None, reverse=False):
         """ sort(key=None, reverse=False) -- inplace sort
 
@@ -702,7 +858,8 @@ class RecordList(six.with_metaclass(RecordListMeta,
         cls_init = functools.partial(get_record_list,
                                      self.object,
                                      ids=[],
-                                     cache=self._cache)
+                                     cache=self._cache,
+                                     context=self.context)
         res = collections.defaultdict(cls_init)
         for record in self.records:
             if isinstance(grouper, six.string_types):
@@ -725,7 +882,8 @@ class RecordList(six.with_metaclass(RecordListMeta,
         func = normalizeSField(func)
         return get_record_list(self.object,
                                ids=[r.id for r in self.records if func(r)],
-                               cache=self._cache)
+                               cache=self._cache,
+                               context=self.context)
 
     def mapped(self, field):
         """ **Experimental**, Provides similar functionality
@@ -814,7 +972,7 @@ class RecordList(six.with_metaclass(RecordListMeta,
         return get_record_list(self.object,
                                ids=self.ids,
                                cache=cache,
-                               context=context)
+                               context=self._new_context(context))
 
     def existing(self, uniqify=True):
         """ Filters this list with only existing items
@@ -834,7 +992,8 @@ class RecordList(six.with_metaclass(RecordListMeta,
             new_ids.append(id_)
         return get_record_list(self.object,
                                ids=new_ids,
-                               cache=self._cache)
+                               cache=self._cache,
+                               context=self.context)
 
     def prefetch(self, *fields):
         """ Prefetches specified fields into cache
@@ -854,6 +1013,127 @@ class RecordList(six.with_metaclass(RecordListMeta,
 
         return self
 
+    def iter_prefetch(self, fields=None, chunk_size=100, depth=1):
+        """ Iterate over records of this list, prefetching *fields*
+            by chunks of *chunk_size* records.
+
+            Data for next chunks is read in background thread
+            (at most *depth* chunks ahead), while records of current chunk
+            are processed, thus RPC latency is hidden behind processing.
+
+            :param list fields: list of fields to prefetch.
+                                if not passed, then all 'simple_fields'
+                                will be prefetched.
+                                (dot-separated related fields supported,
+                                same as for *prefetch* method)
+            :param int chunk_size: number of records to read by one RPC call
+            :param int depth: number of chunks to be read ahead. default: 1
+            :return: generator of records
+
+            For example:
+
+            .. code:: python
+
+                >>> partners = db['res.partner'].search_records([])
+                >>> for partner in partners.iter_prefetch(['name', 'email']):
+                ...     print(partner.name, partner.email)
+        """
+        fields = fields if fields else self.object.simple_fields
+        records = self._records
+
+        chunks = [records[i:i + chunk_size]
+                  for i in range(0, len(records), chunk_size)]
+        chunk_ids = [[r.id for r in chunk] for chunk in chunks]
+
+        prefetched = self._lcache.prefetch_fields_ahead(chunk_ids,
+                                                        fields,
+                                                        depth=depth)
+        try:
+            for chunk, __ in six.moves.zip(chunks, prefetched):
+                for record in chunk:
+                    yield record
+        finally:
+            prefetched.close()
+
+    def _split(self, chunk_size):
+        """ Split this list into lists of *chunk_size* records.
+            Each chunk has its own cache, thus chunks could be
+            safely processed in separate threads or processes
+        """
+        ids = self.ids
+        client = self.object.client
+        return [get_record_list(self.object,
+                                ids=ids[i:i + chunk_size],
+                                cache=empty_cache(client),
+                                context=self.context)
+                for i in range(0, len(ids), chunk_size)]
+
+    def parallel_map(self, func, chunk_size=100, workers=4,
+                     executor='thread'):
+        """ Split this list into chunks of *chunk_size* records and
+            call *func* for each chunk (RecordList) in parallel.
+
+            With 'thread' executor each worker thread uses its own
+            connection to server. With 'process' executor chunks
+            are pickled and sent to worker processes, thus *func*
+            have to be picklable (module-level function).
+            Each worker process creates its own client (with init args
+            and password of this list's client, passed to worker on
+            start), so it works with any multiprocessing start method.
+            Client settings (caches, plugins, etc) are not passed
+            to worker clients.
+
+            Errors raised by *func* do not stop processing of other chunks,
+            and are reported in result.
+
+            :param callable func: function, that receives RecordList
+                                  of single chunk
+            :param int chunk_size: number of records in chunk. Default: 100
+            :param int workers: number of parallel workers. Default: 4
+            :param str executor: 'thread' or 'process'. Default: 'thread'
+            :return: per-chunk results, errors and throughput
+            :rtype: odoo_rpc_client.orm.parallel.ParallelResult
+            :raises ValueError: on unsupported executor
+
+            For example:
+
+            .. code:: python
+
+                >>> res = partners.parallel_map(lambda p: p.mapped('name'))
+                >>> names = sum(res.results, [])
+        """
+        return run_parallel(self._split(chunk_size), func,
+                            workers=workers, executor=executor)
+
+    def parallel_call(self, method, chunk_size=100, workers=4,
+                      executor='thread', args=None, kwargs=None):
+        """ Call server method *method* on records of this list
+            by chunks of *chunk_size* records in parallel.
+            (see *parallel_map* for details, including limitations
+            of 'process' executor)
+
+            :param str method: name of model method to call
+            :param int chunk_size: number of records in chunk. Default: 100
+            :param int workers: number of parallel workers. Default: 4
+            :param str executor: 'thread' or 'process'. Default: 'thread'
+            :param tuple args: extra positional arguments for method
+            :param dict kwargs: extra keyword arguments for method
+            :return: per-chunk results, errors and throughput
+            :rtype: odoo_rpc_client.orm.parallel.ParallelResult
+
+            For example:
+
+            .. code:: python
+
+                >>> res = orders.parallel_call('action_confirm',
+                ...                            chunk_size=50, workers=8)
+                >>> res.throughput   # records per second
+                >>> res.failed_ids   # ids of orders in failed chunks
+        """
+        caller = MethodCaller(method, tuple(args or ()), dict(kwargs or {}))
+        return self.parallel_map(caller, chunk_size=chunk_size,
+                                 workers=workers, executor=executor)
+
     # remote method overrides
     def search(self, domain, *args, **kwargs):
         """ Performs normal search, but adds ``('id', 'in', self.ids)``
@@ -938,8 +1218,7 @@ class ObjectRecords(Object):
 
             :type: list of strings
         """
-        return [f for f, d in six.iteritems(self.columns_info)
-                if d['type'] != 'binary' and not d.get('function', False)]
+        return list(self.schema.simple_fields)
 
     def search_records(self, *args, **kwargs):
         """ Return instance or list of instances of Record class,
@@ -1056,6 +1335,39 @@ class ObjectRecords(Object):
         record_id = self.create(vals, context=context)
         return self.read_records(record_id, context=context, cache=cache)
 
+    def create_records(self, vals_list, chunk_size=100, context=None,
+                       cache=None):
+        """ Create multiple records in database and return RecordList
+            of created records. All records share single cache.
+            Same as *create_multi* method, but returns RecordList
+            instead of list of IDs.
+
+            :param list vals_list: list of dictionaries with values
+                                   for new records
+            :param int chunk_size: max number of records to be created
+                                   by single RPC call. default: 100
+            :param dict context: extra context to pass to *create* method
+            :param Cache cache: cache to add created records to.
+                                if None is passed, then new cache
+                                will be created.
+            :return: RecordList of created records
+            :rtype: odoo_rpc_client.orm.record.RecordList
+
+            For example:
+
+            .. code:: python
+
+                >>> partner_obj = db['res.partner']
+                >>> partners = partner_obj.create_records(
+                ...     [{'name': 'John'}, {'name': 'Jane'}])
+                >>> partners.mapped('name')
+                ['John', 'Jane']
+        """
+        record_ids = self.create_multi(vals_list,
+                                       chunk_size=chunk_size,
+                                       context=context)
+        return get_record_list(self, record_ids, cache=cache, context=context)
+
     def browse(self, *args, **kwargs):
         """ Aliase to *read_records* method.
             In most cases same as serverside *browse*
@@ -0,0 +1,215 @@
+""" This module contains *ResultCache* class, that caches results of
+calls of rarely changing server methods (``fields_get``, ``default_get``,
+``name_search``, ``context_get``, ...) for limited time.
+
+Cache is used for methods called via ``Object`` method wrappers
+(for example ``cl['res.partner'].default_get(['name'])``),
+when it is set as *Client.result_cache*:
+
+.. code:: python
+
+    from odoo_rpc_client.orm.result_cache import ResultCache
+
+    cl.result_cache = ResultCache(ttl=300, max_size=1000)
+    cl['res.users'].context_get()     # RPC call
+    cl['res.users'].context_get()     # cached result
+    cl.result_cache.stats()
+    cl.result_cache.invalidate('res.users')
+
+Cached results of model are invalidated automatically, when this client
+calls *write*, *create* or *unlink* on this model.
+"""
+import copy
+import time
+import threading
+import collections
+
+from ..utils import freeze
+
+__all__ = ('ResultCache',)
+
+
+#: Methods, which results are cached by default.
+#: Maps method name to list of models it is cached for
+#: (None means all models)
+DEFAULT_METHODS = {
+    'fields_get': None,
+    'default_get': None,
+    'name_search': None,
+    'context_get': ['res.users'],
+    'get_param': ['ir.config_parameter'],
+}
+
+
+class ResultCache(object):
+    """ Cache of results of server method calls with time to live
+
+        :param float ttl: time (in seconds) cached result is valid.
+                          Default: 60
+        :param int max_size: max number of cached results. When reached,
+                             least recently used results are removed.
+                             None means no limit. Default: 1024
+        :param dict methods: allow-list of methods to be cached.
+                             Maps method name to list of models
+                             it is cached for (None means all models).
+                             List of method names is also accepted.
+                             Default: *DEFAULT_METHODS*
+        :param dict method_ttl: time to live for specific methods,
+                                overrides *ttl*.
+                                For example ``{'get_param': 10}``
+    """
+
+    def __init__(self, ttl=60, max_size=1024, methods=None, method_ttl=None):
+        if methods is None:
+            methods = DEFAULT_METHODS
+        elif not isinstance(methods, dict):
+            methods = dict.fromkeys(methods)
+
+        self.ttl = ttl
+        self.max_size = max_size
+        self.methods = {m: (None if models is None else frozenset(models))
+                        for m, models in methods.items()}
+        self.method_ttl = dict(method_ttl or {})
+
+        self._lock = threading.RLock()
+        self._data = collections.OrderedDict()  # key -> (expire, result)
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+
+    def is_cacheable(self, model, method):
+        """ Check if results of *method* of *model* have to be cached
+
+            :rtype: bool
+        """
+        if method not in self.methods:
+            return False
+        models = self.methods[method]
+        return models is None or model in models
+
+    def get_key(self, client, model, method, args, kwargs):
+        """ Compute key of call. Arguments with None value are ignored,
+            because they are not sent to server.
+
+            :return: hashable key of call, or None if arguments
+                     are not hashable
+        """
+        kwargs = {k: v for k, v in kwargs.items() if v is not None}
+        key = (client.get_url(), model, method, freeze(args), freeze(kwargs))
+        try:
+            hash(key)
+        except TypeError:
+            return None
+        return key
+
+    def call(self, client, model, method, args, kwargs, func):
+        """ Return cached result of call, or call *func* and cache result
+
+            :param Client client: client call is made by
+            :param str model: name of model
+            :param str method: name of method
+            :param tuple args: positional arguments of call
+            :param dict kwargs: keyword arguments of call
+            :param callable func: function without arguments, that
+                                  makes RPC call
+            :return: result of call (copy of cached value)
+        """
+        key = self.get_key(client, model, method, args, kwargs)
+        if key is None:
+            return func()
+
+        found, result = self._get(key)
+        if found:
+            return result
+
+        result = func()
+        self._set(key, result, self.method_ttl.get(method, self.ttl))
+        return result
+
+    def _get(self, key, count=True):
+        """ Get copy of cached value for *key*
+
+            :param bool count: update hit/miss counters
+            :return: tuple (found, value)
+        """
+        with self._lock:
+            cached = self._data.get(key, None)
+            if cached is not None and cached[0] > time.time():
+                # mark as recently used
+                self._data[key] = self._data.pop(key)
+                if count:
+                    self._hits += 1
+                return True, copy.deepcopy(cached[1])
+            if count:
+                self._misses += 1
+        return False, None
+
+    def _set(self, key, value, ttl):
+        """ Store copy of *value* for *ttl* seconds
+        """
+        with self._lock:
+            self._data.pop(key, None)
+            self._data[key] = (time.time() + ttl, copy.deepcopy(value))
+            self._shrink()
+
+    def _shrink(self):
+        """ Remove least recently used results, if size limit exceeded.
+            Have to be called with lock acquired
+        """
+        if self.max_size is None:
+            return
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+            self._evictions += 1
+
+    def invalidate(self, model=None, method=None, client=None):
+        """ Remove cached results
+
+            :param str model: remove only results of this model
+            :param str method: remove only results of this method
+            :param Client client: remove only results of calls
+                                  made by this client (same URL)
+            :return: number of removed results
+            :rtype: int
+        """
+        url = None if client is None else client.get_url()
+        with self._lock:
+            keys = [k for k in self._data
+                    if (model is None or k[1] == model) and
+                    (method is None or k[2] == method) and
+                    (url is None or k[0] == url)]
+            for key in keys:
+                del self._data[key]
+            self._invalidations += len(keys)
+        return len(keys)
+
+    def clear(self):
+        """ Remove all cached results
+        """
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        """ Statistics of cache usage
+
+            :return: dictionary with keys: 'entries', 'hits', 'misses',
+                     'evictions' (results removed because of size limit),
+                     'invalidations' (results removed by *invalidate*)
+            :rtype: dict
+        """
+        with self._lock:
+            return {
+                'entries': len(self._data),
+                'hits': self._hits,
+                'misses': self._misses,
+                'evictions': self._evictions,
+                'invalidations': self._invalidations,
+            }
+
+    def __len__(self):
+        return len(self._data)
+
+    def __repr__(self):
+        return "<ResultCache: %(entries)s entries, %(hits)s hits>" % (
+            self.stats())
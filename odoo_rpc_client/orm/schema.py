@@ -0,0 +1,450 @@
+""" This module contains compiled schema of objects (models) and persistent
+(on-disk) cache for database schema
+(results of *fields_get* and list of registered models)
+
+Compiled schema is available as ``Object.schema``:
+
+.. code:: python
+
+    >>> field = cl['res.partner'].schema['country_id']
+    >>> field.type, field.relation
+    ('many2one', 'res.country')
+
+Persistent schema cache usage:
+
+.. code:: python
+
+    from odoo_rpc_client import Client
+    from odoo_rpc_client.orm.schema import SchemaCache
+
+    cl = Client('localhost', 'my_db', 'admin', 'admin')
+    cl.schema_cache = SchemaCache('~/.cache/odoo_rpc_client/schema.db')
+
+    # or enable it for all clients
+    Client.schema_cache = SchemaCache('~/.cache/odoo_rpc_client/schema.db')
+
+Cached data is bound to client URL (protocol, user, host, port, dbname)
+and to schema fingerprint of database (look at
+``Client.schema_fingerprint``), so when modules are installed or updated on
+server, cached data is ignored and replaced on next access.
+
+Cache is stored in SQLite database, thus it can be safely shared between
+multiple processes.
+
+In-memory schema registry could be used to share schema between
+clients (for example clients of different users) connected to same
+database in single process:
+
+.. code:: python
+
+    from odoo_rpc_client.orm.schema import SchemaRegistry
+
+    Client.schema_registry = SchemaRegistry(max_size=64 * 1024 * 1024)
+"""
+import os
+import sys
+import json
+import time
+import sqlite3
+import threading
+import collections
+
+import six
+
+__all__ = ('FieldSchema', 'ObjectSchema', 'SchemaCache', 'SchemaRegistry')
+
+
+def _deep_sizeof(obj, seen=None):
+    """ Approximate size (in bytes) of object and all objects it refers to.
+
+        Only containers and slotted objects are traversed.
+    """
+    if seen is None:
+        seen = set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(_deep_sizeof(k, seen) + _deep_sizeof(v, seen)
+                    for k, v in six.iteritems(obj))
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(_deep_sizeof(i, seen) for i in obj)
+    else:
+        for slot in getattr(type(obj), '__slots__', ()):
+            size += _deep_sizeof(getattr(obj, slot, None), seen)
+    return size
+
+
+class FieldSchema(object):
+    """ Compiled information about single field of model
+
+        :param str name: name of field
+        :param dict info: information about field, as returned by *fields_get*
+
+        Has following attributes:
+
+        - *name* - name of field
+        - *type* - type of field ('char', 'many2one', etc)
+        - *relation* - name of related model or False
+        - *heavy* - True for fields, that are expensive to transfer (binary)
+        - *computed* - True for function (computed) and not stored fields
+        - *simple* - True if field could be fetched fast enough
+          (neither binary, nor function field)
+        - *info* - raw information about field (as returned by *fields_get*)
+    """
+    __slots__ = ('name', 'type', 'relation', 'heavy',
+                 'computed', 'simple', 'info')
+
+    def __init__(self, name, info):
+        self.name = name
+        self.type = info['type']
+        self.relation = info.get('relation', False)
+        self.heavy = self.type == 'binary'
+        self.computed = (bool(info.get('function', False)) or
+                         info.get('store', True) is False)
+        self.simple = not self.heavy and not info.get('function', False)
+        self.info = info
+
+    def __repr__(self):
+        return "<FieldSchema: %s (%s)>" % (self.name, self.type)
+
+
+class ObjectSchema(object):
+    """ Compiled schema of model.
+
+        Contains *FieldSchema* for each field of model, and precomputed
+        list of simple fields. Does not depend on client, thus could be
+        shared between clients connected to same database.
+
+        :param str name: name of model
+        :param dict columns_info: result of *fields_get* for this model
+    """
+    __slots__ = ('name', 'fields', 'simple_fields')
+
+    def __init__(self, name, columns_info):
+        self.name = name
+        self.fields = {fname: FieldSchema(fname, finfo)
+                       for fname, finfo in six.iteritems(columns_info)}
+        self.simple_fields = tuple(
+            fname for fname, field in six.iteritems(self.fields)
+            if field.simple)
+
+    def get(self, name, default=None):
+        """ Return schema of field *name* or *default*
+
+            :rtype: FieldSchema
+        """
+        return self.fields.get(name, default)
+
+    def __getitem__(self, name):
+        return self.fields[name]
+
+    def __contains__(self, name):
+        return name in self.fields
+
+    def __iter__(self):
+        return iter(self.fields)
+
+    def __len__(self):
+        return len(self.fields)
+
+    def __repr__(self):
+        return "<ObjectSchema: %s>" % self.name
+
+
+class SchemaCache(object):
+    """ Persistent schema cache stored in SQLite database
+
+        :param str path: path to SQLite database file.
+                         Parent directories are created if needed.
+        :param float timeout: how long to wait (in seconds) for lock
+                              held by other process. Default: 30
+    """
+
+    def __init__(self, path, timeout=30):
+        self._path = os.path.abspath(os.path.expanduser(path))
+        self._timeout = timeout
+        self._initialized = False
+
+    @property
+    def path(self):
+        """ Path to SQLite database file
+        """
+        return self._path
+
+    def _connect(self):
+        """ Open new connection to database.
+
+            New connection is opened for each operation, so this cache
+            could be used from multiple threads and (forked) processes
+        """
+        if not self._initialized:
+            dirname = os.path.dirname(self._path)
+            if dirname and not os.path.isdir(dirname):
+                try:
+                    os.makedirs(dirname)
+                except OSError:
+                    # could be created by other process at same time
+                    if not os.path.isdir(dirname):
+                        raise
+
+        conn = sqlite3.connect(self._path, timeout=self._timeout)
+
+        if not self._initialized:
+            with conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS odoo_schema ("
+                    "    scope TEXT NOT NULL,"
+                    "    key TEXT NOT NULL,"
+                    "    fingerprint TEXT NOT NULL,"
+                    "    value TEXT NOT NULL,"
+                    "    PRIMARY KEY (scope, key))")
+            self._initialized = True
+        return conn
+
+    def get(self, client, key):
+        """ Get cached value for *key*
+
+            :param Client client: client to get value for
+            :param str key: key of value
+            :return: cached value or None if there is no valid value in cache
+        """
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT value FROM odoo_schema "
+                "WHERE scope = ? AND key = ? AND fingerprint = ?",
+                (client.get_url(), key, client.schema_fingerprint)).fetchone()
+        finally:
+            conn.close()
+
+        if row is None:
+            return None
+        return json.loads(row[0])
+
+    def set(self, client, key, value):
+        """ Save *value* to cache.
+
+            Also removes values of this client, that are
+            related to outdated schema fingerprints.
+
+            :param Client client: client to save value for
+            :param str key: key of value
+            :param value: json-serializable value to save
+        """
+        scope = client.get_url()
+        fingerprint = client.schema_fingerprint
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute(
+                    "DELETE FROM odoo_schema "
+                    "WHERE scope = ? AND fingerprint != ?",
+                    (scope, fingerprint))
+                conn.execute(
+                    "INSERT OR REPLACE INTO odoo_schema "
+                    "(scope, key, fingerprint, value) VALUES (?, ?, ?, ?)",
+                    (scope, key, fingerprint, json.dumps(value)))
+        finally:
+            conn.close()
+
+    def fetch(self, client, key, getter):
+        """ Get value from cache, or compute it with *getter*
+            and save it to cache
+
+            :param Client client: client to get value for
+            :param str key: key of value
+            :param callable getter: function without arguments,
+                                    that returns value to be cached
+            :return: cached or computed value
+        """
+        res = self.get(client, key)
+        if res is None:
+            res = getter()
+            self.set(client, key, res)
+        return res
+
+    def clear(self, client=None):
+        """ Remove cached data
+
+            :param Client client: if passed, then only data related to
+                                  this client will be removed
+        """
+        conn = self._connect()
+        try:
+            with conn:
+                if client is None:
+                    conn.execute("DELETE FROM odoo_schema")
+                else:
+                    conn.execute("DELETE FROM odoo_schema WHERE scope = ?",
+                                 (client.get_url(),))
+        finally:
+            conn.close()
+
+    def __repr__(self):
+        return "<SchemaCache: %s>" % self._path
+
+
+class SchemaRegistry(object):
+    """ In-memory registry of database schema, shared between clients
+
+        Schema (list of registered models, *columns_info* and compiled
+        *ObjectSchema* of models) is stored by key
+        ``(server url, dbname, schema fingerprint)``, thus clients of
+        different users connected to same database share it, while
+        uid, context and record caches stay per client.
+
+        Note, that *fields_get* result may depend on access rights of user,
+        which loaded it first.
+
+        Registry is thread-safe. Approximate memory used by registry is
+        accounted (look at *memory_usage* and *stats*).
+
+        :param int max_size: max approximate size of registry in bytes.
+                             When exceeded, least recently used schemas
+                             (of other databases or outdated fingerprints)
+                             are removed. Default: None (unlimited)
+        :param float fingerprint_ttl: time (in seconds), while schema
+                                      fingerprint computed by one client is
+                                      reused by other clients connected to
+                                      same database. Default: 60
+    """
+
+    def __init__(self, max_size=None, fingerprint_ttl=60):
+        self._max_size = max_size
+        self._fingerprint_ttl = fingerprint_ttl
+        self._lock = threading.RLock()
+
+        # key -> {'data': {name: value}, 'size': int}
+        self._entries = collections.OrderedDict()
+        self._fingerprints = {}   # (url, dbname) -> (fingerprint, time)
+        self._size = 0
+        self._hits = 0
+        self._misses = 0
+
+    def _get_fingerprint(self, client):
+        """ Return schema fingerprint for client.
+
+            Fingerprint computed by other client connected to same database
+            is reused, if it was computed less then *fingerprint_ttl*
+            seconds ago.
+        """
+        db_key = (self._get_server_url(client), client.dbname)
+        with self._lock:
+            fingerprint, ftime = self._fingerprints.get(db_key, (None, 0))
+        if (fingerprint is not None and
+                time.time() - ftime < self._fingerprint_ttl):
+            return fingerprint
+
+        fingerprint = client.schema_fingerprint
+        with self._lock:
+            self._fingerprints[db_key] = (fingerprint, time.time())
+        return fingerprint
+
+    @staticmethod
+    def _get_server_url(client):
+        return "%s://%s:%s" % (client.protocol, client.host, client.port)
+
+    def get_key(self, client):
+        """ Return registry key for client
+
+            :param Client client: client to get key for
+            :return: tuple ``(server url, dbname, fingerprint)``
+            :rtype: tuple
+        """
+        return (self._get_server_url(client),
+                client.dbname,
+                self._get_fingerprint(client))
+
+    def fetch(self, client, name, getter):
+        """ Get value from registry, or compute it with *getter*
+            and save it in registry
+
+            :param Client client: client to get value for
+            :param name: name (hashable) of value.
+            :param callable getter: function without arguments,
+                                    that returns value to be saved
+            :return: value from registry or computed value
+        """
+        key = self.get_key(client)
+        with self._lock:
+            entry = self._entries.get(key, None)
+            if entry is not None and name in entry['data']:
+                # mark entry as recently used
+                self._entries[key] = self._entries.pop(key)
+                self._hits += 1
+                return entry['data'][name]
+            self._misses += 1
+
+        # compute value outside of lock, so other threads
+        # are not blocked by RPC calls
+        value = getter()
+        size = _deep_sizeof(value)
+
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                entry = {'data': {}, 'size': 0}
+            self._entries[key] = entry
+
+            if name in entry['data']:
+                # computed by other thread at same time
+                return entry['data'][name]
+
+            entry['data'][name] = value
+            entry['size'] += size
+            self._size += size
+            self._shrink(keep=key)
+        return value
+
+    def _shrink(self, keep):
+        """ Remove least recently used entries, while registry size
+            is greater then *max_size*. Entry with key *keep* is not removed
+        """
+        if self._max_size is None:
+            return
+        for key in list(self._entries):
+            if self._size <= self._max_size:
+                break
+            if key != keep:
+                self._size -= self._entries.pop(key)['size']
+
+    def memory_usage(self):
+        """ Approximate memory (in bytes) used by data in registry
+
+            :rtype: int
+        """
+        return self._size
+
+    def stats(self):
+        """ Statistics of registry usage
+
+            :return: dictionary with keys:
+                     'entries' (number of stored schemas), 'values' (number
+                     of stored values), 'size' (approximate memory usage
+                     in bytes), 'hits', 'misses'
+            :rtype: dict
+        """
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'values': sum(len(e['data'])
+                              for e in self._entries.values()),
+                'size': self._size,
+                'hits': self._hits,
+                'misses': self._misses,
+            }
+
+    def clear(self):
+        """ Remove all data from registry
+        """
+        with self._lock:
+            self._entries.clear()
+            self._fingerprints.clear()
+            self._size = 0
+
+    def __repr__(self):
+        return "<SchemaRegistry: %s entries, %s bytes>" % (
+            len(self._entries), self._size)
@@ -1,3 +1,5 @@
+import threading
+
 from ..service.object import ObjectService
 from .object import get_object
 
@@ -14,6 +16,7 @@ class Service(ObjectService):
     def __init__(self, *args, **kwargs):
         super(Service, self).__init__(*args, **kwargs)
         self.__objects = {}   # cached objects
+        self.__lock = threading.Lock()
 
     def get_obj(self, object_name):
         """ Returns wraper around Odoo object 'object_name'
@@ -24,14 +27,20 @@ class Service(ObjectService):
             :return: instance of Object which wraps choosen object
             :rtype: Object
         """
-        if object_name in self.__objects:
-            return self.__objects[object_name]
+        obj = self.__objects.get(object_name, None)
+        if obj is not None:
+            return obj
 
-        if object_name not in self.get_registered_objects():
+        if not self.check_object(object_name):
             raise ValueError("There is no object named '%s'" % object_name)
 
-        obj = get_object(self, object_name)
-        self.__objects[object_name] = obj
+        with self.__lock:
+            # Only one Object instance have to be created for each name,
+            # even if it is requested from multiple threads at same time
+            obj = self.__objects.get(object_name, None)
+            if obj is None:
+                obj = get_object(self, object_name)
+                self.__objects[object_name] = obj
         return obj
 
     def clean_cache(self):
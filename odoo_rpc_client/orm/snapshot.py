@@ -0,0 +1,227 @@
+""" This module contains logic to save record cache to file and
+restore it later (for example on next run of batch job):
+
+.. code:: python
+
+    cache = empty_cache(cl)
+    cl['product.product'].search_records([], cache=cache).prefetch()
+    cache.save('/tmp/products.cache')
+
+    # in next run
+    cache = empty_cache(cl, snapshot='/tmp/products.cache')
+    products = cl['product.product'].search_records([], cache=cache)
+
+Data of each model (and context partition) is stored in separate
+block of file, and is restored only when cache of this model is accessed.
+On restore, *write_date* of records is checked on server (one cheap
+*search_read* per model and thousand records), and records that were
+changed or deleted after snapshot was made are not restored
+(so they will be read from server as usual).
+"""
+import six
+import struct
+import pickle
+
+from ..utils import ustr
+from .cache import context_key
+
+__all__ = ('save_cache', 'CacheSnapshot')
+
+# File signature and format version
+MAGIC = b'ODOORPCCACHE1'
+
+# Size of header length field
+HEADER_LEN = struct.Struct('>Q')
+
+# Max number of IDs in domain of write_date check
+CHECK_CHUNK_SIZE = 1000
+
+
+def _read_fields(obj, ids, fields, chunk_size=CHECK_CHUNK_SIZE):
+    """ Read current values of *fields* of records
+
+        :param Object obj: object (model) to read data of
+        :param list ids: list of IDs of records
+        :param list fields: names of fields to read
+        :return: dictionary {id: data} (deleted records are absent)
+        :rtype: dict
+    """
+    res = {}
+    context = {'active_test': False}
+    for i in range(0, len(ids), chunk_size):
+        domain = [('id', 'in', list(ids[i:i + chunk_size]))]
+        if obj.client.capabilities.has_search_read:
+            data = obj.service.execute(obj.name, 'search_read',
+                                       domain=domain, fields=fields,
+                                       context=context)
+        else:
+            found = obj.service.execute(obj.name, 'search', domain,
+                                        context=context)
+            data = obj.service.execute(obj.name, 'read', found,
+                                       fields, context=context)
+        res.update((r['id'], r) for r in data)
+    return res
+
+
+def _read_write_dates(obj, ids, chunk_size=CHECK_CHUNK_SIZE):
+    """ Read current *write_date* of records
+
+        :param Object obj: object (model) to read write dates of
+        :param list ids: list of IDs of records
+        :return: dictionary {id: write_date} (deleted records are absent)
+        :rtype: dict
+    """
+    return {rid: data['write_date'] for rid, data in six.iteritems(
+        _read_fields(obj, ids, ['write_date'], chunk_size=chunk_size))}
+
+
+def save_cache(cache, path, models=None):
+    """ Save data of record cache to file
+
+        Records with staged (not flushed) changes are not saved.
+        Cached fields of records are read from server again together with
+        *write_date* (by single call per set of fields and thousand
+        records), so saved values are consistent with it, and snapshot
+        could be checked for staleness on restore.
+        Records of models without *write_date* field are not saved.
+
+        :param Cache cache: cache to save
+        :param str path: path to file to save cache to
+        :param list models: names of models to save.
+                            If not passed, all models are saved
+        :return: number of saved records
+        :rtype: int
+    """
+    blocks = []
+    count = 0
+    for lcache in cache.get_object_caches(models):
+        pkey = (lcache._object.name, context_key(lcache.context))
+        with lcache._lock:
+            records = {rid: dict(data) for rid, data in six.iteritems(lcache)
+                       if rid not in lcache.dirty and len(data) > 1}
+        if not records:
+            continue
+        schema = lcache._object.schema
+        if 'write_date' not in schema:
+            # snapshot could not be checked for staleness on restore
+            continue
+
+        # Cached values could be read before record was changed on
+        # server, even if write_date was read after that, so all of them
+        # are read again together with write_date, to be consistent
+        groups = {}
+        for rid, data in six.iteritems(records):
+            fields = frozenset(f for f in data
+                               if f in schema and f != 'write_date')
+            groups.setdefault(fields, []).append(rid)
+        for fields, ids in six.iteritems(groups):
+            current = _read_fields(lcache._object, ids,
+                                   list(fields) + ['write_date'])
+            for rid in ids:
+                if rid in current:
+                    records[rid] = dict(current[rid], id=rid)
+                else:
+                    del records[rid]   # deleted on server
+
+        blocks.append((pkey, pickle.dumps(records, pickle.HIGHEST_PROTOCOL)))
+        count += len(records)
+
+    index = {}
+    offset = 0
+    for pkey, block in blocks:
+        index[pkey] = (offset, len(block))
+        offset += len(block)
+
+    header = pickle.dumps({'url': cache.client.get_url(), 'index': index},
+                          pickle.HIGHEST_PROTOCOL)
+    with open(path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(HEADER_LEN.pack(len(header)))
+        f.write(header)
+        for __, block in blocks:
+            f.write(block)
+    return count
+
+
+class CacheSnapshot(object):
+    """ Cache data saved by *save_cache*, restored lazily per model
+
+        :param str path: path to snapshot file
+        :param Client client: client snapshot is loaded for
+        :param bool check_stale: check *write_date* of records on server
+                                 before restoring them. Default: True
+        :raises ValueError: if file is not cache snapshot, or it was made
+                            for other database or user
+    """
+
+    def __init__(self, path, client, check_stale=True):
+        self.path = path
+        self.check_stale = check_stale
+        with open(path, 'rb') as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError("%s is not cache snapshot" % path)
+            size = HEADER_LEN.unpack(f.read(HEADER_LEN.size))[0]
+            header = pickle.loads(f.read(size))
+            self._data_offset = f.tell()
+
+        if header['url'] != client.get_url():
+            raise ValueError(
+                ustr("Cache snapshot %s was made for %s, not for %s") % (
+                    path, header['url'], client.get_url()))
+        self._index = header['index']
+
+    @property
+    def models(self):
+        """ Names of models, which data is stored in snapshot
+        """
+        return sorted(set(pkey[0] for pkey in self._index))
+
+    def __len__(self):
+        """ Number of model partitions not restored yet
+        """
+        return len(self._index)
+
+    def load(self, name, ckey=()):
+        """ Load data of model partition from file.
+            Each partition could be loaded only once.
+
+            :param str name: name of model
+            :param tuple ckey: context key of partition (see *context_key*)
+            :return: dictionary {id: record data} or None,
+                     if there is no data for this partition
+            :rtype: dict
+        """
+        location = self._index.pop((name, ckey), None)
+        if location is None:
+            return None
+        offset, size = location
+        with open(self.path, 'rb') as f:
+            f.seek(self._data_offset + offset)
+            return pickle.loads(f.read(size))
+
+    def restore(self, lcache, ckey=()):
+        """ Restore data of model partition into object cache.
+            Records changed or deleted on server since snapshot was made
+            are skipped (if *check_stale* is enabled)
+
+            :param ObjectCache lcache: object cache to restore data to
+            :param tuple ckey: context key of partition
+            :return: number of restored records
+            :rtype: int
+        """
+        records = self.load(lcache._object.name, ckey)
+        if not records:
+            return 0
+
+        if self.check_stale:
+            current = _read_write_dates(lcache._object, list(records))
+            records = {rid: data for rid, data in six.iteritems(records)
+                       if current.get(rid, None) == data['write_date']}
+
+        with lcache._lock:
+            for rid, data in six.iteritems(records):
+                if rid in lcache:
+                    # keep values, that were read after cache creation
+                    data.update(lcache[rid])
+                lcache[rid] = data
+        return len(records)
@@ -0,0 +1,756 @@
+""" This plugin allows to replicate chosen models (and fields) into local
+SQLite database, keep it in sync incrementally, and run read-only
+queries (*search*, *search_count*, *read*, *search_read*) against
+this local copy, thus heavy reporting scripts do not load server:
+
+.. code:: python
+
+    import odoo_rpc_client.plugins.mirror  # register plugin
+
+    mirror = cl.plugins.mirror.open('/tmp/mydb-mirror.db')
+    mirror.add_model('res.partner', ['name', 'email', 'country_id',
+                                     'customer', 'active'])
+    mirror.sync()   # full sync on first run, incremental on next runs
+
+    partners = mirror['res.partner']
+    partners.search_read([('country_id', '=', 21),
+                          ('name', 'ilike', 'agrolait')],
+                         ['name', 'email'], order='name', limit=10)
+
+Synchronization is incremental: on each *sync* only records changed
+since previous sync are read (see ``Object.changes``). Deleted records
+are detected by checking existence of mirrored IDs on server, which is
+done not more often than *delete_check_interval* seconds.
+
+Odoo domains are translated to SQL. Supported operators are:
+``=``, ``!=``, ``<>``, ``<``, ``>``, ``<=``, ``>=``, ``=?``, ``in``,
+``not in``, ``like``, ``not like``, ``ilike``, ``not ilike``, ``=like``,
+``=ilike``, combined with ``&``, ``|`` and ``!``.
+Dotted paths (``partner_id.name``) and hierarchy operators are not
+supported. Many2one fields could be compared with ID or with display name.
+Note, that SQLite compares case-insensitively only ASCII letters.
+"""
+import os
+import re
+import json
+import time
+import sqlite3
+
+import six
+
+from ..plugin import Plugin
+
+__all__ = ('Mirror', 'MirrorObject', 'domain_to_sql', 'normalize_domain')
+
+
+# SQLite column types for Odoo field types (TEXT for not listed ones)
+COLUMN_TYPES = {
+    'integer': 'INTEGER',
+    'many2one': 'INTEGER',
+    'boolean': 'INTEGER',
+    'float': 'REAL',
+    'monetary': 'REAL',
+}
+
+X2MANY_TYPES = ('one2many', 'many2many')
+
+RE_NAME = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+
+TRUE_LEAF = (1, '=', 1)
+FALSE_LEAF = (0, '=', 1)
+
+
+def _quote(name):
+    """ Quote SQL identifier
+    """
+    if not RE_NAME.match(name):
+        raise ValueError("Unsupported name: %r" % name)
+    return '"%s"' % name
+
+
+def _table(model):
+    """ Name of table for model
+    """
+    return _quote('m_' + model.replace('.', '_'))
+
+
+def _name_column(field):
+    """ Name of column, that contains display name of many2one field
+    """
+    return _quote(field + '__name')
+
+
+def normalize_domain(domain):
+    """ Add implicit '&' operators to domain, so each operator
+        has explicit operands (same as Odoo does)
+
+        :param list domain: Odoo domain
+        :return: normalized domain in prefix notation
+        :rtype: list
+    """
+    if not domain:
+        return [TRUE_LEAF]
+    result = []
+    expected = 1
+    for token in domain:
+        if expected == 0:
+            result[0:0] = ['&']
+            expected = 1
+        if isinstance(token, (list, tuple)):
+            expected -= 1
+        else:
+            expected += 0 if token == '!' else 1
+        result.append(token)
+    return result
+
+
+def _leaf_to_sql(leaf, fields):
+    """ Translate single domain leaf to SQL
+
+        :return: tuple (sql, params)
+    """
+    if tuple(leaf) == TRUE_LEAF:
+        return '1=1', []
+    if tuple(leaf) == FALSE_LEAF:
+        return '0=1', []
+
+    field, op, value = leaf
+    op = op.lower()
+    if op == '<>':
+        op = '!='
+    if op == '=?':
+        if value is None or value is False:
+            return '1=1', []
+        op = '='
+
+    if field == 'id':
+        ftype = 'integer'
+    elif field in fields:
+        ftype = fields[field]
+    else:
+        raise ValueError("Field %r is not mirrored" % field)
+    if ftype in X2MANY_TYPES:
+        raise ValueError("Search on x2many field %r is not supported "
+                         "by mirror" % field)
+
+    col = _quote(field)
+    str_values = value if isinstance(value, (list, tuple)) else [value]
+    if ftype == 'many2one' and str_values and all(
+            isinstance(v, six.string_types) for v in str_values):
+        # compare with display name of related record
+        col, ftype = _name_column(field), 'char'
+
+    if ftype == 'boolean':
+        def conv(v):
+            return 1 if v else None
+    else:
+        def conv(v):
+            return None if v is False else v
+
+    if op in ('=', '!='):
+        value = conv(value)
+        if value is None:
+            return ('%s IS NULL' if op == '=' else '%s IS NOT NULL') % col, []
+        if op == '=':
+            return '%s = ?' % col, [value]
+        return '(%s != ? OR %s IS NULL)' % (col, col), [value]
+
+    if op in ('in', 'not in'):
+        values = [conv(v) for v in str_values]
+        has_null = None in values
+        values = [v for v in values if v is not None]
+        marks = ', '.join('?' * len(values))
+        if op == 'in':
+            parts = ['%s IN (%s)' % (col, marks)] if values else []
+            if has_null:
+                parts.append('%s IS NULL' % col)
+            if not parts:
+                return '0=1', []
+            return '(%s)' % ' OR '.join(parts), values
+        if not values:
+            return ('%s IS NOT NULL' % col if has_null else '1=1'), []
+        if has_null:
+            return ('(%s IS NOT NULL AND %s NOT IN (%s))' % (col, col, marks),
+                    values)
+        return ('(%s IS NULL OR %s NOT IN (%s))' % (col, col, marks),
+                values)
+
+    if op in ('<', '>', '<=', '>='):
+        return '%s %s ?' % (col, op), [conv(value)]
+
+    if op in ('like', 'not like'):
+        if op == 'like':
+            return 'instr(%s, ?) > 0' % col, [ustr_value(value)]
+        return ('(%s IS NULL OR instr(%s, ?) = 0)' % (col, col),
+                [ustr_value(value)])
+
+    if op in ('ilike', 'not ilike'):
+        pattern = '%%%s%%' % (ustr_value(value).replace('\\', '\\\\')
+                                               .replace('%', '\\%')
+                                               .replace('_', '\\_'))
+        if op == 'ilike':
+            return "%s LIKE ? ESCAPE '\\'" % col, [pattern]
+        return ("(%s IS NULL OR %s NOT LIKE ? ESCAPE '\\')" % (col, col),
+                [pattern])
+
+    if op == '=like':
+        # SQLite LIKE is case-insensitive, so GLOB is used
+        return '%s GLOB ?' % col, [_like_to_glob(ustr_value(value))]
+    if op == '=ilike':
+        return "%s LIKE ? ESCAPE '\\'" % col, [ustr_value(value)]
+
+    raise ValueError("Operator %r is not supported by mirror" % op)
+
+
+def _like_to_glob(pattern):
+    """ Translate pattern of SQL *LIKE* (with backslash as escape
+        character) to pattern of SQLite *GLOB*
+    """
+    res = []
+    chars = iter(pattern)
+    for char in chars:
+        if char == '\\':
+            char = next(chars, '\\')
+            res.append('[%s]' % char if char in '*?[' else char)
+        elif char == '%':
+            res.append('*')
+        elif char == '_':
+            res.append('?')
+        elif char in '*?[':
+            res.append('[%s]' % char)
+        else:
+            res.append(char)
+    return u''.join(res)
+
+
+def ustr_value(value):
+    """ Convert value of *like* operators to text
+    """
+    if value is None or value is False:
+        return u''
+    return six.text_type(value)
+
+
+def domain_to_sql(domain, fields):
+    """ Translate Odoo domain to SQL condition
+
+        :param list domain: Odoo domain
+        :param dict fields: mapping {field name: field type} of fields
+                            available in table
+        :return: tuple (sql, params), where *sql* is condition
+                 with ``?`` placeholders for *params*
+        :rtype: tuple
+        :raises ValueError: if domain contains unsupported fields
+                            or operators
+    """
+    stack = []
+    for token in reversed(normalize_domain(domain)):
+        arity = 1 if token == '!' else 2
+        if token in ('!', '&', '|') and len(stack) < arity:
+            raise ValueError("Bad domain: %r (operator %r has not enough "
+                             "operands)" % (domain, token))
+        if token == '!':
+            sql, params = stack.pop()
+            # NULL is treated as false (as in Odoo), while NOT NULL
+            # is NULL in SQL
+            stack.append(('(NOT COALESCE(%s, 0))' % sql, params))
+        elif token in ('&', '|'):
+            sql1, params1 = stack.pop()
+            sql2, params2 = stack.pop()
+            sql_op = ' AND ' if token == '&' else ' OR '
+            stack.append(('(%s%s%s)' % (sql1, sql_op, sql2),
+                          params1 + params2))
+        elif isinstance(token, (list, tuple)) and len(token) == 3:
+            stack.append(_leaf_to_sql(token, fields))
+        else:
+            raise ValueError("Bad domain item: %r" % (token,))
+
+    if len(stack) != 1:
+        raise ValueError("Bad domain: %r" % (domain,))
+    return stack[0]
+
+
+def _domain_fields(domain):
+    """ Names of fields used in domain
+    """
+    return set(t[0] for t in domain
+               if isinstance(t, (list, tuple)) and len(t) == 3)
+
+
+class MirrorObject(object):
+    """ Read-only object (model) backed by local mirror.
+
+        Provides subset of ``odoo_rpc_client.orm.object.Object`` interface:
+        *search*, *search_count*, *read* and *search_read* methods,
+        that are executed against local SQLite database.
+
+        Not intended to be instantiated directly,
+        use ``mirror[model_name]`` instead.
+
+        :param Mirror mirror: mirror plugin instance
+        :param str name: name of model
+    """
+
+    def __init__(self, mirror, name):
+        self._mirror = mirror
+        self._name = name
+
+    @property
+    def name(self):
+        """ Name of model
+        """
+        return self._name
+
+    @property
+    def fields(self):
+        """ Mapping {field name: field type} of mirrored fields
+        """
+        return self._mirror.get_fields(self._name)
+
+    def _where(self, domain, context):
+        """ Build WHERE clause for domain, applying *active_test*
+            like Odoo does
+        """
+        domain = list(domain or [])
+        fields = self.fields
+        if ('active' in fields and 'active' not in _domain_fields(domain) and
+                (context or {}).get('active_test', True)):
+            domain = [('active', '=', True)] + domain
+        return domain_to_sql(domain, fields)
+
+    def _order(self, order):
+        """ Build ORDER BY clause
+        """
+        if not order:
+            return '"id"'
+        fields = self.fields
+        res = []
+        for part in order.split(','):
+            spec = part.strip().split()
+            fname = spec[0]
+            direction = spec[1].upper() if len(spec) > 1 else 'ASC'
+            if direction not in ('ASC', 'DESC') or len(spec) > 2:
+                raise ValueError("Bad order: %r" % order)
+            if fname != 'id' and fname not in fields:
+                raise ValueError("Field %r is not mirrored" % fname)
+            col = (_name_column(fname) if fields.get(fname) == 'many2one'
+                   else _quote(fname))
+            res.append('%s %s' % (col, direction))
+        return ', '.join(res)
+
+    def search(self, domain=None, offset=0, limit=None, order=None,
+               count=False, context=None):
+        """ Search records in mirror
+
+            :param list domain: Odoo domain
+            :param int offset: number of records to skip
+            :param int limit: max number of records to return
+            :param str order: order specification (``'name desc, id'``)
+            :param bool count: if True, return number of records found
+            :param dict context: context (only *active_test* is used)
+            :return: list of IDs of records found
+            :rtype: list
+        """
+        if count:
+            return self.search_count(domain, context=context)
+        where, params = self._where(domain, context)
+        sql = 'SELECT "id" FROM %s WHERE %s ORDER BY %s' % (
+            _table(self._name), where, self._order(order))
+        if limit or offset:
+            sql += ' LIMIT ? OFFSET ?'
+            params = params + [limit or -1, offset or 0]
+        return [row[0] for row in self._mirror.query(sql, params)]
+
+    def search_count(self, domain=None, context=None):
+        """ Count records in mirror, matching domain
+
+            :rtype: int
+        """
+        where, params = self._where(domain, context)
+        sql = 'SELECT COUNT(*) FROM %s WHERE %s' % (_table(self._name), where)
+        return self._mirror.query(sql, params)[0][0]
+
+    def _select(self, fields, where, params, suffix=''):
+        """ Select rows and convert them to Odoo *read* format
+        """
+        all_fields = self.fields
+        if not fields:
+            fields = list(all_fields)
+        for fname in fields:
+            if fname != 'id' and fname not in all_fields:
+                raise ValueError("Field %r is not mirrored" % fname)
+        fields = [f for f in fields if f != 'id']
+
+        columns = ['"id"']
+        for fname in fields:
+            columns.append(_quote(fname))
+            if all_fields[fname] == 'many2one':
+                columns.append(_name_column(fname))
+
+        sql = 'SELECT %s FROM %s WHERE %s%s' % (
+            ', '.join(columns), _table(self._name), where, suffix)
+
+        res = []
+        for row in self._mirror.query(sql, params):
+            data = {'id': row[0]}
+            i = 1
+            for fname in fields:
+                ftype, value = all_fields[fname], row[i]
+                i += 1
+                if ftype == 'many2one':
+                    data[fname] = [value, row[i]] if value else False
+                    i += 1
+                elif ftype in X2MANY_TYPES:
+                    data[fname] = json.loads(value) if value else []
+                elif ftype == 'boolean':
+                    data[fname] = bool(value)
+                else:
+                    data[fname] = False if value is None else value
+            res.append(data)
+        return res
+
+    def read(self, ids, fields=None, context=None):
+        """ Read records from mirror
+
+            :param list ids: ID or list of IDs of records to read
+            :param list fields: names of fields to read.
+                                If not passed, all mirrored fields are read
+            :return: list of dictionaries in same order as *ids*
+                     (missing records are skipped), or single dictionary
+                     if *ids* is integer
+        """
+        single = isinstance(ids, six.integer_types)
+        id_list = [ids] if single else list(ids)
+        rows = {}
+        for i in range(0, len(id_list), 500):
+            chunk = id_list[i:i + 500]
+            where = '"id" IN (%s)' % ', '.join('?' * len(chunk))
+            for row in self._select(fields, where, chunk):
+                rows[row['id']] = row
+        res = [rows[rid] for rid in id_list if rid in rows]
+        if single:
+            return res[0] if res else False
+        return res
+
+    def search_read(self, domain=None, fields=None, offset=0, limit=None,
+                    order=None, context=None):
+        """ Search and read records from mirror
+
+            :return: list of dictionaries with data of records found
+            :rtype: list
+        """
+        where, params = self._where(domain, context)
+        suffix = ' ORDER BY %s' % self._order(order)
+        if limit or offset:
+            suffix += ' LIMIT ? OFFSET ?'
+            params = params + [limit or -1, offset or 0]
+        return self._select(fields, where, params, suffix)
+
+    def __str__(self):
+        return u"MirrorObject ('%s')" % self._name
+
+    __repr__ = __str__
+
+
+class Mirror(Plugin):
+    """ Local SQLite mirror of chosen models.
+        (look at module documentation for example)
+
+        Plugin have to be opened with *open* method before usage.
+    """
+
+    class Meta:
+        name = 'mirror'
+
+    #: Min time (in seconds) between checks for deleted records
+    delete_check_interval = 3600
+
+    def __init__(self, *args, **kwargs):
+        super(Mirror, self).__init__(*args, **kwargs)
+        self._path = None
+        self._timeout = 30
+
+    @property
+    def path(self):
+        """ Path to SQLite database of mirror, or None if not opened
+        """
+        return self._path
+
+    def open(self, path, timeout=30):
+        """ Open (create if needed) mirror database
+
+            :param str path: path to SQLite database file
+            :param float timeout: how long to wait (in seconds) for lock
+                                  held by other process. Default: 30
+            :return: self
+            :rtype: Mirror
+            :raises ValueError: if database is mirror of other Odoo database
+        """
+        self._path = os.path.abspath(os.path.expanduser(path))
+        self._timeout = timeout
+        database = '%s:%s/%s' % (self.client.host, self.client.port,
+                                 self.client.dbname)
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS odoo_mirror_info ("
+                    "    key TEXT PRIMARY KEY,"
+                    "    value TEXT NOT NULL)")
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS odoo_mirror_models ("
+                    "    model TEXT PRIMARY KEY,"
+                    "    fields TEXT NOT NULL,"
+                    "    cursor TEXT,"
+                    "    deletes_checked REAL NOT NULL DEFAULT 0)")
+                conn.execute(
+                    "INSERT OR IGNORE INTO odoo_mirror_info (key, value) "
+                    "VALUES ('database', ?)", (database,))
+                row = conn.execute(
+                    "SELECT value FROM odoo_mirror_info "
+                    "WHERE key = 'database'").fetchone()
+        finally:
+            conn.close()
+
+        if row[0] != database:
+            self._path = None
+            raise ValueError("%s is mirror of other database (%s)"
+                             "" % (path, row[0]))
+        return self
+
+    def _connect(self):
+        """ Open new connection to mirror database.
+
+            New connection is opened for each operation, so mirror
+            could be used from multiple threads and processes
+        """
+        if self._path is None:
+            raise ValueError("Mirror is not opened. Call *open* first")
+        return sqlite3.connect(self._path, timeout=self._timeout)
+
+    def query(self, sql, params=()):
+        """ Execute SQL query on mirror database
+
+            :param str sql: SQL query
+            :param list params: query parameters
+            :return: list of rows
+            :rtype: list
+        """
+        conn = self._connect()
+        try:
+            return conn.execute(sql, params).fetchall()
+        finally:
+            conn.close()
+
+    def _get_spec(self, conn, model):
+        """ Return tuple (fields, cursor, deletes_checked) of model
+        """
+        row = conn.execute(
+            "SELECT fields, cursor, deletes_checked FROM odoo_mirror_models "
+            "WHERE model = ?", (model,)).fetchone()
+        if row is None:
+            raise KeyError("Model %s is not mirrored" % model)
+        return json.loads(row[0]), row[1], row[2]
+
+    @property
+    def models(self):
+        """ Names of mirrored models
+        """
+        return [row[0] for row in self.query(
+            "SELECT model FROM odoo_mirror_models ORDER BY model")]
+
+    def get_fields(self, model):
+        """ Mapping {field name: field type} of mirrored fields of model
+
+            :rtype: dict
+            :raises KeyError: if model is not mirrored
+        """
+        conn = self._connect()
+        try:
+            return self._get_spec(conn, model)[0]
+        finally:
+            conn.close()
+
+    def add_model(self, model, fields=None):
+        """ Add model to mirror. Data will be replicated on next *sync*.
+
+            If model is already mirrored with other set of fields,
+            its local data is removed and will be fully replicated
+            on next *sync*.
+
+            :param str model: name of model
+            :param list fields: names of fields to mirror. If not passed,
+                                all stored non-binary fields, except x2many
+                                ones, are mirrored
+            :return: MirrorObject for this model
+            :rtype: MirrorObject
+            :raises ValueError: if field does not exist
+        """
+        schema = self.client[model].schema
+        if fields is None:
+            fields = [fname for fname in schema.simple_fields
+                      if not schema[fname].computed and
+                      schema[fname].type not in X2MANY_TYPES]
+        spec = {}
+        for fname in fields:
+            if fname == 'id':
+                continue
+            if fname not in schema:
+                raise ValueError("There is no field %r in model %s"
+                                 "" % (fname, model))
+            _quote(fname)
+            spec[fname] = schema[fname].type
+        spec['write_date'] = 'datetime'
+
+        conn = self._connect()
+        try:
+            try:
+                old_spec = self._get_spec(conn, model)[0]
+            except KeyError:
+                old_spec = None
+            if old_spec == spec:
+                return self[model]
+
+            columns = ['"id" INTEGER PRIMARY KEY']
+            for fname, ftype in sorted(spec.items()):
+                columns.append('%s %s' % (_quote(fname),
+                                          COLUMN_TYPES.get(ftype, 'TEXT')))
+                if ftype == 'many2one':
+                    columns.append('%s TEXT' % _name_column(fname))
+            with conn:
+                conn.execute('DROP TABLE IF EXISTS %s' % _table(model))
+                conn.execute('CREATE TABLE %s (%s)' % (
+                    _table(model), ', '.join(columns)))
+                conn.execute(
+                    "INSERT OR REPLACE INTO odoo_mirror_models "
+                    "(model, fields, cursor, deletes_checked) "
+                    "VALUES (?, ?, NULL, 0)", (model, json.dumps(spec)))
+        finally:
+            conn.close()
+        return self[model]
+
+    def remove_model(self, model):
+        """ Remove model and its data from mirror
+
+            :param str model: name of model
+        """
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute('DROP TABLE IF EXISTS %s' % _table(model))
+                conn.execute("DELETE FROM odoo_mirror_models WHERE model = ?",
+                             (model,))
+        finally:
+            conn.close()
+
+    def _store(self, conn, model, spec, rows):
+        """ Insert or update rows read from server
+        """
+        fields = sorted(spec)
+        columns = ['"id"']
+        for fname in fields:
+            columns.append(_quote(fname))
+            if spec[fname] == 'many2one':
+                columns.append(_name_column(fname))
+        sql = 'INSERT OR REPLACE INTO %s (%s) VALUES (%s)' % (
+            _table(model), ', '.join(columns), ', '.join('?' * len(columns)))
+
+        values = []
+        for row in rows:
+            data = [row['id']]
+            for fname in fields:
+                ftype, value = spec[fname], row.get(fname, False)
+                if ftype == 'many2one':
+                    if isinstance(value, (list, tuple)):
+                        data.extend(value[:2])
+                    else:
+                        data.extend((value or None, None))
+                elif ftype in X2MANY_TYPES:
+                    data.append(json.dumps(value or []))
+                elif ftype == 'boolean':
+                    data.append(1 if value else None)
+                else:
+                    data.append(None if value is False else value)
+            values.append(data)
+        conn.executemany(sql, values)
+
+    def _remove(self, conn, model, ids):
+        """ Remove records from local table
+        """
+        for i in range(0, len(ids), 500):
+            chunk = ids[i:i + 500]
+            conn.execute('DELETE FROM %s WHERE "id" IN (%s)' % (
+                _table(model), ', '.join('?' * len(chunk))), chunk)
+
+    def sync(self, models=None, batch_size=500, check_deletes=None):
+        """ Synchronize mirror with server
+
+            :param list models: names of models to synchronize.
+                                If not passed, all mirrored models
+                                are synchronized
+            :param int batch_size: max number of records read by single
+                                   RPC call. Default: 500
+            :param bool check_deletes: check for deleted records.
+                                       If not passed, check is done if
+                                       previous one was more than
+                                       *delete_check_interval* seconds ago
+            :return: dictionary {model: {'updated': <number of records
+                     inserted or updated>, 'deleted': <number of records
+                     removed>}}
+            :rtype: dict
+        """
+        if models is None:
+            models = self.models
+        elif isinstance(models, six.string_types):
+            models = [models]
+
+        res = {}
+        conn = self._connect()
+        try:
+            for model in models:
+                spec, cursor, checked = self._get_spec(conn, model)
+                now = time.time()
+                known_ids = None
+                if check_deletes or (
+                        check_deletes is None and
+                        now - checked >= self.delete_check_interval):
+                    known_ids = [row[0] for row in conn.execute(
+                        'SELECT "id" FROM %s ORDER BY "id"' % _table(model))]
+
+                feed = self.client[model].changes(
+                    since=json.loads(cursor) if cursor else None,
+                    fields=sorted(spec), batch_size=batch_size,
+                    known_ids=known_ids)
+                for rows in feed.iter_pages():
+                    with conn:
+                        self._store(conn, model, spec, rows)
+                        conn.execute(
+                            "UPDATE odoo_mirror_models SET cursor = ? "
+                            "WHERE model = ?",
+                            (json.dumps(feed.cursor), model))
+
+                if feed.deleted is not None:
+                    with conn:
+                        self._remove(conn, model, feed.deleted)
+                        conn.execute(
+                            "UPDATE odoo_mirror_models "
+                            "SET deletes_checked = ? WHERE model = ?",
+                            (now, model))
+                res[model] = {'updated': feed.count,
+                              'deleted': len(feed.deleted or [])}
+        finally:
+            conn.close()
+        return res
+
+    def get_object(self, model):
+        """ Return mirror-backed object for model
+
+            :param str model: name of model
+            :rtype: MirrorObject
+            :raises KeyError: if model is not mirrored
+        """
+        self.get_fields(model)   # check that model is mirrored
+        return MirrorObject(self, model)
+
+    def __getitem__(self, model):
+        return self.get_object(model)
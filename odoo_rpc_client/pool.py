@@ -0,0 +1,333 @@
+""" This module contains *ClientPool* class, that allows to reuse
+logged in clients in services, that work with many users and databases.
+
+Example:
+
+.. code:: python
+
+    from odoo_rpc_client.pool import ClientPool
+
+    pool = ClientPool(max_size=32, idle_timeout=600)
+
+    # checkout client and return it to pool on exit from *with* block
+    with pool.client('localhost', 'my_db', 'user', 'password') as cl:
+        cl['res.partner'].search_records([])
+
+    # or
+    cl = pool.checkout('localhost', 'my_db', 'user', 'password')
+    try:
+        cl['res.partner'].search_records([])
+    finally:
+        pool.checkin(cl)
+"""
+import time
+import threading
+import contextlib
+
+from .client import Client
+from .connection import get_connector
+from .exceptions import ClientPoolError
+from .utils import freeze
+
+__all__ = ('ClientPool',)
+
+
+def default_health_check(client):
+    """ Default health check for pooled clients.
+
+        Calls cheap authenticated method on server, thus checks both,
+        that server is available and that credentials are still valid.
+
+        :param Client client: client to check
+        :return: True if client is healthy
+        :rtype: bool
+    """
+    return bool(client.execute('res.users', 'search',
+                               [('id', '=', client.uid)]))
+
+
+class PoolEntry(object):
+    """ Client managed by pool. For internal use only
+    """
+    __slots__ = ('key', 'pwd', 'client', 'last_used', 'last_checked')
+
+    def __init__(self, key, pwd, client):
+        self.key = key
+        self.pwd = pwd
+        self.client = client
+        self.last_used = self.last_checked = time.time()
+
+
+class ClientPool(object):
+    """ Pool of logged in clients, keyed by client URL
+        (protocol, user, host, port, dbname)
+
+        - Clients connected to same server share single connector
+        - Login (uid) is done once per pool key and reused by all clients
+          created for this key, while password is the same.
+          Use *discard* to drop client with invalid login
+        - Clients not used for *idle_timeout* seconds are removed from pool
+        - Idle clients are checked by *health_check* function before
+          checkout, if they were not checked for *health_check_interval*
+          seconds. Unhealthy clients are removed from pool
+
+        :param int max_size: max number of clients managed by pool
+                             (idle and checked out). When limit reached,
+                             least recently used idle client of other key is
+                             removed, or *checkout* waits for checkin of some
+                             client. Default: 32
+        :param float idle_timeout: time in seconds after which idle client
+                                   is removed from pool. Default: 600
+        :param callable health_check: function, that receives client
+                                      and returns True if client is healthy.
+                                      Pass None to disable health checks.
+                                      Default: *default_health_check*
+        :param float health_check_interval: min time in seconds between
+                                            health checks of same client.
+                                            Default: 60
+        :param float timeout: default time to wait in *checkout* for
+                              free slot. None means wait forever
+    """
+
+    def __init__(self, max_size=32, idle_timeout=600,
+                 health_check=default_health_check,
+                 health_check_interval=60, timeout=None):
+        self._max_size = max_size
+        self._idle_timeout = idle_timeout
+        self._health_check = health_check
+        self._health_check_interval = health_check_interval
+        self._timeout = timeout
+
+        self._cond = threading.Condition()
+        self._idle = []          # list of PoolEntry, least recently used first
+        self._busy = {}          # id(client) -> PoolEntry
+        self._connectors = {}    # server key -> connector
+        self._uids = {}          # key -> (pwd, uid)
+
+        self._hits = 0
+        self._misses = 0
+
+    @property
+    def size(self):
+        """ Number of clients managed by pool (idle and checked out)
+        """
+        return len(self._idle) + len(self._busy)
+
+    def _get_connector(self, protocol, host, port, extra_args):
+        """ Return connector shared by all clients of this server
+        """
+        skey = (protocol, host, port, freeze(extra_args))
+        with self._cond:
+            connector = self._connectors.get(skey, None)
+            if connector is None:
+                connector = get_connector(protocol)(host, port,
+                                                    dict(extra_args))
+                self._connectors[skey] = connector
+        return connector
+
+    def _create_client(self, key, host, dbname, user, pwd, port, protocol,
+                       extra_args):
+        """ Create new client, sharing connector and cached login
+        """
+        client = Client(host, dbname=dbname, user=user, pwd=pwd, port=port,
+                        protocol=protocol, **extra_args)
+        client._connection = self._get_connector(protocol, host, port,
+                                                 extra_args)
+        cached_pwd, uid = self._uids.get(key, (None, None))
+        if uid is not None and cached_pwd == pwd:
+            client._uid = uid
+        return client
+
+    def _remove_expired(self):
+        """ Remove clients, that were idle for more then *idle_timeout*.
+            Have to be called with lock acquired
+        """
+        if self._idle_timeout is None:
+            return
+        deadline = time.time() - self._idle_timeout
+        self._idle = [e for e in self._idle if e.last_used >= deadline]
+
+    def _is_healthy(self, entry):
+        """ Check health of idle client if needed
+        """
+        if self._health_check is None:
+            return True
+        if time.time() - entry.last_checked < self._health_check_interval:
+            return True
+        try:
+            healthy = self._health_check(entry.client)
+        except Exception:
+            healthy = False
+        entry.last_checked = time.time()
+        return healthy
+
+    def _take_idle(self, key, pwd):
+        """ Find idle client for *key* (most recently used one).
+            Have to be called with lock acquired.
+        """
+        for i in range(len(self._idle) - 1, -1, -1):
+            entry = self._idle[i]
+            if entry.key == key and entry.pwd == pwd:
+                return self._idle.pop(i)
+        return None
+
+    def checkout(self, host, dbname=None, user=None, pwd=None, port=8069,
+                 protocol='xml-rpc', timeout=None, **extra_args):
+        """ Get client from pool, or create new one.
+
+            Arguments are same as for ``Client`` constructor.
+            Returned client is logged in.
+            It have to be returned to pool with *checkin* method.
+
+            :param float timeout: time to wait for free slot, when pool
+                                  is full. If not passed, pool's default
+                                  timeout used
+            :return: logged in client
+            :rtype: odoo_rpc_client.client.Client
+            :raises ClientPoolError: if there is no free slot in pool
+                                     after *timeout* seconds
+            :raises LoginException: if wrong login or password
+        """
+        key = Client.to_url(None, protocol=protocol, user=user, host=host,
+                            port=port, dbname=dbname)
+        timeout = self._timeout if timeout is None else timeout
+        deadline = None if timeout is None else time.time() + timeout
+
+        with self._cond:
+            while True:
+                self._remove_expired()
+
+                entry = self._take_idle(key, pwd)
+                if entry is not None:
+                    self._busy[id(entry.client)] = entry
+                    break
+
+                if self.size < self._max_size:
+                    entry = None
+                    break
+
+                if self._idle:
+                    # free slot for new client, removing least
+                    # recently used idle client
+                    self._idle.pop(0)
+                    continue
+
+                wait = None if deadline is None else deadline - time.time()
+                if wait is not None and wait <= 0:
+                    raise ClientPoolError(
+                        "No free clients in pool (max_size=%s)"
+                        "" % self._max_size)
+                self._cond.wait(wait)
+
+            if entry is None:
+                # reserve slot for client being created
+                entry = PoolEntry(key, pwd, None)
+                self._busy[id(entry)] = entry
+                self._misses += 1
+
+        if entry.client is not None:
+            if self._is_healthy(entry):
+                with self._cond:
+                    self._hits += 1
+                return entry.client
+
+            # unhealthy client. create new one instead of it,
+            # logging in again
+            with self._cond:
+                del self._busy[id(entry.client)]
+                self._uids.pop(key, None)
+                entry = PoolEntry(key, pwd, None)
+                self._busy[id(entry)] = entry
+                self._misses += 1
+
+        try:
+            client = self._create_client(key, host, dbname, user, pwd, port,
+                                         protocol, extra_args)
+            uid = client.uid   # login if needed
+        except Exception:
+            with self._cond:
+                del self._busy[id(entry)]
+                self._cond.notify()
+            raise
+
+        with self._cond:
+            del self._busy[id(entry)]
+            entry.client = client
+            self._busy[id(client)] = entry
+            self._uids[key] = (pwd, uid)
+        return client
+
+    def checkin(self, client):
+        """ Return client to pool
+
+            :param Client client: client got by *checkout*
+            :raises ClientPoolError: if client is not managed by this pool
+        """
+        with self._cond:
+            entry = self._busy.pop(id(client), None)
+            if entry is None:
+                raise ClientPoolError("Client %s is not checked out "
+                                      "from this pool" % client)
+            entry.last_used = time.time()
+            self._idle.append(entry)
+            self._remove_expired()
+            self._cond.notify()
+
+    def discard(self, client):
+        """ Remove checked out client from pool (for example,
+            if it is in broken state). Cached login for client's key
+            is removed too.
+
+            :param Client client: client got by *checkout*
+        """
+        with self._cond:
+            entry = self._busy.pop(id(client), None)
+            if entry is not None:
+                self._uids.pop(entry.key, None)
+            self._cond.notify()
+
+    @contextlib.contextmanager
+    def client(self, *args, **kwargs):
+        """ Context manager, that checkouts client and returns it to pool
+            on exit. Arguments are same as for *checkout* method.
+
+            Example::
+
+                >>> with pool.client('localhost', 'db', 'user', 'pwd') as cl:
+                ...     cl['res.partner'].search([])
+        """
+        client = self.checkout(*args, **kwargs)
+        try:
+            yield client
+        finally:
+            self.checkin(client)
+
+    def clear(self):
+        """ Remove all idle clients, cached logins and connectors from pool.
+            Checked out clients are still could be returned to pool.
+        """
+        with self._cond:
+            self._idle = []
+            self._uids.clear()
+            self._connectors.clear()
+            self._cond.notify_all()
+
+    def stats(self):
+        """ Statistics of pool usage
+
+            :return: dictionary with keys: 'size', 'idle', 'busy',
+                     'hits' (checkouts served by idle clients),
+                     'misses' (checkouts, that created new client)
+            :rtype: dict
+        """
+        with self._cond:
+            return {
+                'size': self.size,
+                'idle': len(self._idle),
+                'busy': len(self._busy),
+                'hits': self._hits,
+                'misses': self._misses,
+            }
+
+    def __repr__(self):
+        return "<ClientPool: %s/%s clients>" % (self.size, self._max_size)
@@ -1,6 +1,5 @@
-from pkg_resources import parse_version
-
 from ..service.service import ServiceBase
+from ..utils import freeze
 
 
 class ObjectService(ServiceBase):
@@ -15,6 +14,7 @@ class ObjectService(ServiceBase):
     def __init__(self, *args, **kwargs):
         super(ObjectService, self).__init__(*args, **kwargs)
         self._registered_objects = None
+        self._registered_object_names = None   # set for fast lookups
 
     def execute(self, obj, method, *args, **kwargs):
         """First arguments should be 'object' and 'method' and next
@@ -26,6 +26,23 @@ class ObjectService(ServiceBase):
             kwargs = kwargs.copy()
             del kwargs['context']
 
+        singleflight = self.client.singleflight
+        if singleflight is not None and method in singleflight.methods:
+            key = (self.client.get_url(), obj, method,
+                   freeze(args), freeze(kwargs))
+            try:
+                hash(key)
+            except TypeError:
+                pass   # unhashable arguments, so call cannot be merged
+            else:
+                return singleflight.do(
+                    key, lambda: self._execute(obj, method, args, kwargs))
+
+        return self._execute(obj, method, args, kwargs)
+
+    def _execute(self, obj, method, args, kwargs):
+        """ Send call to server
+        """
         result = self._service.execute_kw(self.client.dbname,
                                           self.client.uid,
                                           self.client._pwd,
@@ -54,7 +71,7 @@ class ObjectService(ServiceBase):
         """ Implementation of get registered models (objects)
             Could be overridden by extensions
         """
-        if self.client.server_version > parse_version('8.0'):
+        if self.client.capabilities.has_search_read:
             read = self.execute('ir.model', 'search_read',
                                 domain=[], fields=['model'])
         else:
@@ -64,14 +81,78 @@ class ObjectService(ServiceBase):
 
     def get_registered_objects(self):
         """ Returns list of registered objects in database
+
+            If client has schema registry (``Client.schema_registry``)
+            or persistent schema cache (``Client.schema_cache``) enabled,
+            then result is taken from them.
         """
         if self._registered_objects is not None:
             return self._registered_objects
-        self._registered_objects = self._get_registered_objects()
+
+        registry = self.client.schema_registry
+        if registry is not None:
+            self._registered_objects = registry.fetch(
+                self.client, 'models', self._load_registered_objects)
+        else:
+            self._registered_objects = self._load_registered_objects()
+        self._registered_object_names = set(self._registered_objects)
         return self._registered_objects
 
+    def _load_registered_objects(self):
+        """ Load list of registered objects from persistent schema cache
+            (if enabled) or from server
+        """
+        schema_cache = self.client.schema_cache
+        if schema_cache is not None:
+            return schema_cache.fetch(
+                self.client, 'models', self._get_registered_objects)
+        return self._get_registered_objects()
+
+    def _check_object_single(self, object_name):
+        """ Check if object (model) with specified name exists in database,
+            without reading list of all registered objects
+        """
+        domain = [('model', '=', object_name)]
+        if self.client.capabilities.has_search_count:
+            return bool(self.execute('ir.model', 'search_count', domain))
+        return bool(self.execute('ir.model', 'search', domain, count=True))
+
+    def check_object(self, object_name):
+        """ Check if object (model) with specified name exists in database
+
+            Check is done according to *Client.model_validation* mode:
+
+            - 'full': list of all registered objects is read
+              (once) and used for check
+            - 'single': only specified object is checked via
+              *search_count* on ``ir.model``
+            - 'none': no check is done. All names are considered valid.
+              Errors for wrong names will be raised on first RPC call.
+
+            If list of registered objects is already loaded, it is used
+            in any mode.
+
+            :param str object_name: name of object to check
+            :return: True if object exists
+            :rtype: bool
+            :raises ValueError: on unsupported validation mode
+        """
+        if self._registered_object_names is not None:
+            return object_name in self._registered_object_names
+
+        mode = self.client.model_validation
+        if mode == 'full':
+            self.get_registered_objects()
+            return object_name in self._registered_object_names
+        elif mode == 'single':
+            return self._check_object_single(object_name)
+        elif mode == 'none':
+            return True
+        raise ValueError("Unsupported model validation mode: %r" % mode)
+
     def clean_cache(self):
         """ Cleans service cache, to fill them with fresh data
             on next call of related methods
         """
         self._registered_objects = None
+        self._registered_object_names = None
@@ -1,4 +1,5 @@
 import six
+import threading
 from extend_me import (ExtensibleByHashType,
                        Extensible)
 
@@ -32,6 +33,7 @@ class ServiceManager(Extensible, DirMixIn):
     def __init__(self, client):
         self._client = client
         self.__services = {}
+        self.__lock = threading.Lock()
 
     def __dir__(self):
         res = set(super(ServiceManager, self).__dir__())
@@ -61,10 +63,13 @@ class ServiceManager(Extensible, DirMixIn):
         """
         service = self.__services.get(name, None)
         if service is None:
-            cls = get_service_class(name)
-            srv = self._client.connection.get_service(name)
-            service = cls(srv, self.client, name)
-            self.__services[name] = service
+            with self.__lock:
+                service = self.__services.get(name, None)
+                if service is None:
+                    cls = get_service_class(name)
+                    srv = self._client.connection.get_service(name)
+                    service = cls(srv, self.client, name)
+                    self.__services[name] = service
         return service
 
     def __getattr__(self, name):
@@ -100,7 +105,7 @@ class ServiceManager(Extensible, DirMixIn):
             usualy this should be called on module update,
             when list of available objects or reports changed
         """
-        for service in self.__services.values():
+        for service in list(self.__services.values()):
             service.clean_cache()
 
     def __str__(self):
@@ -153,15 +158,27 @@ class ServiceBase(six.with_metaclass(ServiceType, object)):
         :param service: instance of original service class.
                         must support folowing syntax
                         ``service.service_method(args)``
-                        to call remote methods
+                        to call remote methods.
+                        (kept for backward compatibility. Real proxy is
+                        fetched from client's connection, thus each thread
+                        uses its own one)
         :param client: instance of Client, this service is binded to
     """
 
     def __init__(self, service, client, name):
         self._client = client
-        self._service = service
         self._name = name
 
+    @property
+    def _service(self):
+        """ Proxy to original service.
+
+            Fetched from client's connection on each access,
+            thus each thread will use its own proxy
+            (look at ``ConnectorBase.get_service``)
+        """
+        return self._client.connection.get_service(self._name)
+
     @property
     def client(self):
         """ Related Client instance
@@ -0,0 +1,145 @@
+""" This module contains *SingleFlight* class, that deduplicates
+concurrent identical calls of idempotent server methods.
+
+When enabled, if few threads call same method of same model with same
+arguments at same time, only first call is sent to server, and other
+threads wait for its result:
+
+.. code:: python
+
+    from odoo_rpc_client.service.singleflight import SingleFlight
+
+    cl.singleflight = SingleFlight()
+    ...
+    cl.singleflight.stats()  # {'calls': 120, 'merged': 85, 'in_flight': 0}
+"""
+import copy
+import threading
+
+__all__ = ('SingleFlight',)
+
+
+#: Methods, that do not change data on server, thus their concurrent
+#: identical calls could be merged
+IDEMPOTENT_METHODS = frozenset((
+    'fields_get',
+    'fields_view_get',
+    'default_get',
+    'name_get',
+    'name_search',
+    'read',
+    'read_group',
+    'search',
+    'search_read',
+    'search_count',
+    'exists',
+    'check_access_rights',
+    'context_get',
+))
+
+
+class InFlightCall(object):
+    """ Call, that is currently executed. For internal use only
+    """
+    __slots__ = ('event', 'result', 'error', 'followers')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+        self.followers = 0
+
+
+class SingleFlight(object):
+    """ Deduplicates concurrent identical calls.
+
+        Could be shared between clients: calls are keyed by client URL
+        (server, database and user), so different users never share
+        results.
+
+        :param methods: names of methods, which calls could be merged.
+                        Default: *IDEMPOTENT_METHODS*
+        :type methods: iterable of str
+    """
+
+    def __init__(self, methods=None):
+        self.methods = frozenset(IDEMPOTENT_METHODS if methods is None
+                                 else methods)
+        self._lock = threading.Lock()
+        self._calls = {}   # key -> InFlightCall
+        self._total = 0
+        self._merged = 0
+
+    def do(self, key, func):
+        """ Call *func* if there is no in-flight call with same *key*,
+            or wait for result of in-flight call.
+
+            If other callers waited for result, then each caller
+            (including one, that executed call) receives deep copy
+            of result, so it could be modified safely.
+            Errors are raised in all callers.
+
+            :param key: hashable key of call
+            :param callable func: function without arguments to call
+            :return: result of *func*
+        """
+        with self._lock:
+            self._total += 1
+            call = self._calls.get(key, None)
+            if call is None:
+                call = self._calls[key] = InFlightCall()
+                leader = True
+            else:
+                self._merged += 1
+                call.followers += 1
+                leader = False
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return copy.deepcopy(call.result)
+
+        try:
+            result = func()
+        except Exception as exc:
+            call.error = exc
+            raise
+        else:
+            call.result = result
+        finally:
+            with self._lock:
+                del self._calls[key]
+                followers = call.followers
+            call.event.set()
+
+        # followers copy result after event is set, so caller have to
+        # receive its own copy, to not modify result while it is copied
+        return copy.deepcopy(result) if followers else result
+
+    def stats(self):
+        """ Statistics of deduplication
+
+            :return: dictionary with keys: 'calls' (number of calls passed
+                     through), 'merged' (number of calls, that reused
+                     result of other call), 'in_flight' (number of calls
+                     being executed now)
+            :rtype: dict
+        """
+        with self._lock:
+            return {
+                'calls': self._total,
+                'merged': self._merged,
+                'in_flight': len(self._calls),
+            }
+
+    def reset_stats(self):
+        """ Reset counters
+        """
+        with self._lock:
+            self._total = 0
+            self._merged = 0
+
+    def __repr__(self):
+        return "<SingleFlight: %(calls)s calls, %(merged)s merged>" % (
+            self.stats())
@@ -1,5 +1,7 @@
 from .test_connection import *      # noqa
 from .test_client import *          # noqa
+from .test_pool import *            # noqa
+from .test_concurrency import *     # noqa
 from .test_orm import *             # noqa
 from .test_plugins import *         # noqa
 from .test_utils import *           # noqa
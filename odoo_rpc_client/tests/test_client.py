@@ -1,12 +1,22 @@
+import os
+import six
+import pickle
+import shutil
+import tempfile
 import unittest
 import pkg_resources
 
-from . import BaseTestCase
+from . import (BaseTestCase,
+               mock)
 from ..client import Client
 from ..orm.object import Object
 from ..orm.record import Record
+from ..orm.result_cache import ResultCache
+from ..orm.schema import (SchemaCache,
+                          SchemaRegistry)
 from ..service.service import ServiceManager
 from ..plugin import Plugin
+from ..capabilities import Capabilities
 
 VERSION_CLASSES = (pkg_resources.SetuptoolsLegacyVersion,
                    pkg_resources.SetuptoolsVersion)
@@ -55,6 +65,19 @@ class Test_10_Client(BaseTestCase):
         self.assertEqual(self.client.server_version,
                          self.client.database_version)
 
+    def test_129_capabilities(self):
+        caps = self.client.capabilities
+        self.assertIsInstance(caps, Capabilities)
+        self.assertIs(caps, self.client.capabilities)
+        self.assertEqual(caps.server_version, self.client.server_version)
+        self.assertEqual(caps.has_multi_create,
+                         self.client.server_version >=
+                         pkg_resources.parse_version('12.0'))
+
+        # Capabilities are negotiated again after clean_caches
+        self.client.clean_caches()
+        self.assertIsNot(caps, self.client.capabilities)
+
     def test_130_get_obj(self):
         self.assertIn('res.partner', self.client.registered_objects)
         obj = self.client.get_obj('res.partner')
@@ -73,6 +96,30 @@ class Test_10_Client(BaseTestCase):
         with self.assertRaises(KeyError):
             self.client['bad.object.name']
 
+    def test_143_get_obj_validation_single(self):
+        self.client.model_validation = 'single'
+        obj = self.client.get_obj('res.partner')
+        self.assertIsInstance(obj, Object)
+
+        # list of all registered objects was not read
+        self.assertIsNone(self.client.services.object._registered_objects)
+
+        with self.assertRaises(ValueError):
+            self.client.get_obj('bad.object.name')
+
+    def test_144_get_obj_validation_none(self):
+        self.client.model_validation = 'none'
+        obj = self.client.get_obj('bad.object.name')
+        self.assertIsInstance(obj, Object)
+
+        # error is raised on first RPC call
+        with self.assertRaises(Exception):
+            obj.search([])
+
+        self.client.model_validation = 'unknown'
+        with self.assertRaises(ValueError):
+            self.client.get_obj('res.partner')
+
     def test_150_to_url(self):
         url_tmpl = "%(protocol)s://%(user)s@%(host)s:%(port)s/%(dbname)s"
         cl_url = url_tmpl % self.env
@@ -253,3 +300,151 @@ class Test_10_Client(BaseTestCase):
     def test_222_ref_no_module_spec(self):
         with self.assertRaises(ValueError):
             self.client.ref('main_partner')  # no module specified
+
+    def test_230_schema_fingerprint(self):
+        fingerprint = self.client.schema_fingerprint
+        self.assertIsInstance(fingerprint, six.string_types)
+        self.assertEqual(fingerprint, self.client.schema_fingerprint)
+
+        self.client.clean_caches()
+        self.assertEqual(fingerprint, self.client.schema_fingerprint)
+
+    def test_231_schema_cache(self):
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        schema_cache = SchemaCache(os.path.join(tmp_dir, 'schema.db'))
+
+        self.client.schema_cache = schema_cache
+        columns_info = self.client['res.partner'].columns_info
+        registered_objects = self.client.registered_objects
+        self.assertEqual(schema_cache.get(self.client, 'fields:res.partner'),
+                         columns_info)
+        self.assertEqual(schema_cache.get(self.client, 'models'),
+                         registered_objects)
+
+        # Clients created by *connect* use same schema cache
+        cl = self.client.connect(pwd=self.env.password)
+        self.assertIs(cl.schema_cache, schema_cache)
+        self.assertEqual(cl['res.partner'].columns_info, columns_info)
+
+        # Data is ignored if schema fingerprint changed
+        cl._schema_fingerprint = 'changed'
+        self.assertIsNone(schema_cache.get(cl, 'fields:res.partner'))
+
+        schema_cache.clear(self.client)
+        self.assertIsNone(schema_cache.get(self.client, 'models'))
+
+    def test_233_schema_registry(self):
+        registry = SchemaRegistry()
+        self.client.schema_registry = registry
+        obj = self.client['res.partner']
+        obj.schema
+
+        cl = self.client.connect(pwd=self.env.password)
+        self.assertIs(cl.schema_registry, registry)
+        self.assertEqual(cl.uid, self.client.uid)
+
+        # Schema is shared between clients, but objects are not
+        self.assertIsNot(cl['res.partner'], obj)
+        self.assertIs(cl['res.partner'].columns_info, obj.columns_info)
+        self.assertIs(cl['res.partner'].schema, obj.schema)
+
+        stats = registry.stats()
+        self.assertEqual(stats['entries'], 1)
+        self.assertEqual(stats['values'], 3)  # models, fields, schema
+        self.assertGreater(stats['hits'], 0)
+        self.assertGreater(registry.memory_usage(), 0)
+        self.assertEqual(registry.memory_usage(), stats['size'])
+
+        registry.clear()
+        self.assertEqual(registry.memory_usage(), 0)
+        self.assertEqual(registry.stats()['entries'], 0)
+
+    def test_232_preload_schema(self):
+        models = ['res.partner', 'res.country', 'res.users']
+        objects = self.client.preload_schema(models)
+        self.assertEqual([o.name for o in objects], models)
+        for obj in objects:
+            self.assertIsInstance(obj, Object)
+            self.assertIsNotNone(obj._columns_info)
+            self.assertIn('name', obj.columns_info)
+
+        # preload single model (no threads used)
+        objects = self.client.preload_schema(['res.company'], workers=1)
+        self.assertIsNotNone(objects[0]._columns_info)
+
+    def test_234_result_cache(self):
+        cache = self.client.result_cache = ResultCache(ttl=60, max_size=10)
+        self.assertEqual(self.client.cache_stats(),
+                         {'result_cache': cache.stats()})
+
+        ctx = self.client['res.users'].context_get()
+        with mock.patch.object(self.client.services['object'], '_execute',
+                               side_effect=AssertionError("RPC call")):
+            # cached results are returned without RPC calls
+            self.assertEqual(self.client['res.users'].context_get(), ctx)
+            self.assertEqual(self.client.user_context, ctx)
+
+            # each caller receives own copy of result
+            self.client['res.users'].context_get()['test'] = 1
+            self.assertNotIn('test', self.client['res.users'].context_get())
+        self.assertGreaterEqual(cache.stats()['hits'], 3)
+        self.assertEqual(cache.stats()['misses'], 1)
+
+        # methods not in allow-list are not cached
+        self.assertFalse(cache.is_cacheable('res.partner', 'search'))
+        self.assertFalse(cache.is_cacheable('res.partner', 'context_get'))
+        self.client['res.partner'].search([], limit=1)
+        self.assertEqual(len(cache), 1)
+
+        # explicit invalidation
+        self.assertEqual(cache.invalidate('res.users', 'context_get'), 1)
+        self.assertEqual(len(cache), 0)
+
+        # write to model invalidates its cached results
+        obj = self.client['res.partner']
+        obj.default_get(['name'])
+        self.assertEqual(len(cache), 1)
+        obj.write([], {})
+        self.assertEqual(len(cache), 0)
+
+    def test_235_result_cache_ttl_and_size(self):
+        cache = self.client.result_cache = ResultCache(
+            ttl=60, max_size=2, methods={'fields_get': ['res.partner',
+                                                        'res.users',
+                                                        'res.country']},
+            method_ttl={'fields_get': -1})
+        self.client['res.partner'].fields_get(['name'])
+        self.client['res.partner'].fields_get(['name'])
+        # negative ttl: results expire immediately
+        self.assertEqual(cache.stats()['hits'], 0)
+
+        cache.method_ttl = {}
+        for model in ('res.partner', 'res.users', 'res.country'):
+            self.client[model].fields_get(['name'])
+        self.assertEqual(len(cache), 2)
+        self.assertGreater(cache.stats()['evictions'], 0)
+
+    def test_240_pickle(self):
+        data = pickle.dumps(self.client)
+        self.assertIs(pickle.loads(data), self.client)
+
+        # password is not pickled by default
+        self.assertIsNone(self.client.__reduce__()[1][1])
+
+        # so if there is no such client in process, client could not
+        # be unpickled
+        from .. import client as client_module
+        from ..exceptions import ClientException
+        with mock.patch.object(client_module, '_clients', {}):
+            with self.assertRaises(ClientException):
+                pickle.loads(data)
+
+        # unless password pickling is explicitly enabled
+        self.client.pickle_password = True
+        data = pickle.dumps(self.client)
+        with mock.patch.object(client_module, '_clients', {}):
+            cl = pickle.loads(data)
+        self.assertIsNot(cl, self.client)
+        self.assertEqual(cl.get_url(), self.client.get_url())
+        self.assertEqual(cl.uid, self.client.uid)
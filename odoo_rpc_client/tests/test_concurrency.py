@@ -0,0 +1,239 @@
+import threading
+
+from . import (BaseTestCase,
+               mock)
+from ..client import Client
+from ..orm.cache import empty_cache
+from ..orm.coalesce import ReadCoalescer
+from ..service.singleflight import SingleFlight
+
+
+class Test_17_Concurrency(BaseTestCase):
+    """ Stress tests for objects shared between threads
+    """
+
+    threads = 8
+
+    def setUp(self):
+        super(self.__class__, self).setUp()
+        self.client = Client(self.env.host,
+                             dbname=self.env.dbname,
+                             user=self.env.user,
+                             pwd=self.env.password,
+                             protocol=self.env.protocol,
+                             port=self.env.port)
+
+    def run_threads(self, func, *args):
+        """ Run *func* in multiple threads at same time.
+            Returns list of results. Reraises first exception
+        """
+        barrier = threading.Event()
+        results = [None] * self.threads
+        errors = []
+
+        def worker(index):
+            barrier.wait()
+            try:
+                results[index] = func(index, *args)
+            except Exception as exc:
+                errors.append(exc)
+
+        threads = [threading.Thread(target=worker, args=(i,))
+                   for i in range(self.threads)]
+        for thread in threads:
+            thread.start()
+        barrier.set()
+        for thread in threads:
+            thread.join()
+
+        if errors:
+            raise errors[0]
+        return results
+
+    def test_uid(self):
+        uids = self.run_threads(lambda i: self.client.uid)
+        self.assertEqual(len(set(uids)), 1)
+        self.assertIsNotNone(uids[0])
+
+    def test_capabilities(self):
+        caps = self.run_threads(lambda i: self.client.capabilities)
+        self.assertTrue(all(c is caps[0] for c in caps))
+
+    def test_get_obj(self):
+        objs = self.run_threads(lambda i: self.client['res.partner'])
+        self.assertTrue(all(o is objs[0] for o in objs))
+
+    def test_services(self):
+        services = self.run_threads(lambda i: self.client.services.object)
+        self.assertTrue(all(s is services[0] for s in services))
+
+    def test_shared_cache(self):
+        cache = empty_cache(self.client, thread_safe=True)
+        self.assertTrue(cache.thread_safe)
+        partners = self.client['res.partner'].search_records(
+            [], limit=40, cache=cache)
+
+        def read_names(index):
+            res = []
+            for partner in partners[index::2]:
+                res.append((partner.id, partner.name))
+                if partner.parent_id:
+                    res.append((partner.parent_id.id,
+                                partner.parent_id.name))
+            partners._lcache.get_ids_to_read('name', 'email')
+            return res
+
+        for result in self.run_threads(read_names):
+            for rid, name in result:
+                self.assertEqual(
+                    name,
+                    self.client['res.partner'].read(rid, ['name'])['name'])
+
+        self.assertEqual(len(partners._lcache.get_ids_to_read('name')), 0)
+
+    def test_shared_cache_update_keys(self):
+        lcache = empty_cache(self.client, thread_safe=True)['res.partner']
+
+        def update_keys(index):
+            for i in range(500):
+                lcache.update_keys([index * 1000 + i])
+                lcache[index * 1000 + i]['name'] = 'name %s' % i
+                lcache.get_ids_to_read('name')
+
+        self.run_threads(update_keys)
+        self.assertEqual(len(lcache), self.threads * 500)
+        self.assertFalse(lcache.get_ids_to_read('name'))
+
+    def test_singleflight_merge(self):
+        singleflight = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def slow_call():
+            calls.append(1)
+            started.set()
+            release.wait()
+            return {'value': [1, 2, 3]}
+
+        def lead():
+            # modify result right after call, while followers copy it
+            result = singleflight.do('key', slow_call)
+            result['value'].append(4)
+            leader_results.append(result)
+
+        leader_results = []
+        leader = threading.Thread(target=lead)
+        leader.start()
+        started.wait()
+
+        def releaser():
+            # release leader only when all followers have joined
+            # in-flight call (they are counted as merged inside *do*)
+            while singleflight.stats()['merged'] < self.threads:
+                threading.Event().wait(0.001)
+            release.set()
+
+        releaser_thread = threading.Thread(target=releaser)
+        releaser_thread.start()
+
+        results = self.run_threads(
+            lambda index: singleflight.do('key', slow_call))
+        leader.join()
+        releaser_thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(singleflight.stats(), {'calls': self.threads + 1,
+                                                'merged': self.threads,
+                                                'in_flight': 0})
+        # followers and leader receive own copies of result
+        for result in results:
+            self.assertEqual(result, {'value': [1, 2, 3]})
+        self.assertEqual(leader_results, [{'value': [1, 2, 3, 4]}])
+        self.assertEqual(len(set(id(r) for r in results)), self.threads)
+
+        # result of call without followers is not copied
+        result = {'value': 1}
+        self.assertIs(singleflight.do('key', lambda: result), result)
+
+    def test_singleflight_error(self):
+        singleflight = SingleFlight()
+
+        def fail():
+            raise ValueError("fail")
+
+        with self.assertRaises(ValueError):
+            singleflight.do('key', fail)
+        self.assertEqual(singleflight.stats()['in_flight'], 0)
+
+    def test_singleflight_client(self):
+        self.client.singleflight = SingleFlight()
+        obj = self.client['res.partner']
+        ids = obj.search([], limit=10)
+
+        results = self.run_threads(lambda i: obj.read(ids, ['name']))
+        for result in results:
+            self.assertEqual(result, results[0])
+
+        stats = self.client.singleflight.stats()
+        self.assertGreaterEqual(stats['calls'], self.threads)
+        self.assertEqual(stats['in_flight'], 0)
+
+        # non-idempotent methods are not merged
+        calls = stats['calls']
+        obj.write([], {})
+        self.assertEqual(self.client.singleflight.stats()['calls'], calls)
+
+    def test_read_coalescer(self):
+        obj = self.client['res.partner']
+        ids = obj.search([], limit=self.threads * 2)
+        expected = obj.read(ids, ['name', 'email'])
+
+        coalescer = self.client.read_coalescer = ReadCoalescer(window=0.2)
+
+        def read(index):
+            fields = ['name'] if index % 2 else ['email']
+            return obj.read(ids[index::2], fields)
+
+        for index, result in enumerate(self.run_threads(read)):
+            fields = ['name'] if index % 2 else ['email']
+            self.assertEqual(
+                result,
+                [{'id': row['id'], fields[0]: row[fields[0]]}
+                 for row in expected[index::2]])
+
+        stats = coalescer.stats()
+        self.assertEqual(stats['reads'], self.threads)
+        self.assertLess(stats['calls'], self.threads)
+
+        # single id read returns dict
+        self.assertEqual(obj.read(ids[0], ['name']),
+                         {'id': ids[0], 'name': expected[0]['name']})
+
+    def test_read_coalescer_max_ids(self):
+        obj = self.client['res.partner']
+        ids = obj.search([], limit=self.threads)
+        coalescer = self.client.read_coalescer = ReadCoalescer(window=1,
+                                                               max_ids=1)
+        self.run_threads(lambda i: obj.read([ids[i]], ['name']))
+
+        # each batch is full after first read, so no waiting for window
+        self.assertEqual(coalescer.stats()['calls'], self.threads)
+
+    def test_read_coalescer_fallback(self):
+        obj = self.client['res.partner']
+        ids = obj.search([], limit=self.threads)
+        coalescer = self.client.read_coalescer = ReadCoalescer(window=0.2)
+
+        send = coalescer._send
+
+        def fail_merged(obj, ids, fields, context):
+            if len(ids) > 1:
+                raise ValueError("Merged read failed")
+            return send(obj, ids, fields, context)
+
+        with mock.patch.object(coalescer, '_send', side_effect=fail_merged):
+            results = self.run_threads(lambda i: obj.read([ids[i]], ['name']))
+
+        self.assertEqual([r[0]['id'] for r in results], ids)
+        self.assertGreater(coalescer.stats()['fallbacks'], 0)
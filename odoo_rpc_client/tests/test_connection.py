@@ -1,4 +1,8 @@
-from . import BaseTestCase
+import os
+import threading
+
+from . import (BaseTestCase,
+               mock)
 from ..client import Client
 from ..exceptions import (LoginException,
                           ConnectorError)
@@ -114,3 +118,25 @@ class Test_00_Connection(BaseTestCase):
                                self.env.password)
         with self.assertRaises(ConnectorError):
             cl.services['unexistent_service_42'].call_unexistent_method_78()
+
+    def test_20_service_proxy_per_thread(self):
+        connection = self.client.connection
+        proxy = connection.get_service('db')
+        self.assertIs(connection.get_service('db'), proxy)
+
+        res = []
+        thread = threading.Thread(
+            target=lambda: res.append(connection.get_service('db')))
+        thread.start()
+        thread.join()
+        self.assertIsNot(res[0], proxy)
+
+    def test_21_service_proxy_after_fork(self):
+        connection = self.client.connection
+        proxy = connection.get_service('db')
+
+        # emulate fork: proxies of parent process must not be reused
+        with mock.patch('os.getpid', return_value=os.getpid() + 1):
+            child_proxy = connection.get_service('db')
+            self.assertIsNot(child_proxy, proxy)
+            self.assertIs(connection.get_service('db'), child_proxy)
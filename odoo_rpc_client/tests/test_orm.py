@@ -1,9 +1,14 @@
+import os
 import six
+import pickle
+import shutil
+import tempfile
 import numbers
 import collections
 
 from . import (BaseTestCase,
                mock)
+from .. import client as client_module
 from ..client import Client
 from ..orm.record import (Record,
                           RecordList,
@@ -12,7 +17,14 @@ from ..orm.cache import (empty_cache,
                          ObjectCache,
                          Cache)
 from ..orm.object import Object
-from ..exceptions import ConnectorError
+from ..orm import parallel
+from ..orm.parallel import ParallelResult
+from ..orm.prefetch import PrefetchProfiles
+from ..orm.query_cache import QueryCache
+from ..orm.schema import (ObjectSchema,
+                          FieldSchema)
+from ..exceptions import (ConnectorError,
+                          WriteBatchError)
 
 
 class Test_20_Object(BaseTestCase):
@@ -216,6 +228,174 @@ class Test_20_Object(BaseTestCase):
         john.unlink()
         self.assertFalse(john.exists())
 
+    def test_schema(self):
+        schema = self.object.schema
+        self.assertIsInstance(schema, ObjectSchema)
+        self.assertIs(schema, self.object.schema)
+        self.assertItemsEqual(list(schema), list(self.object.columns_info))
+
+        field = schema['country_id']
+        self.assertIsInstance(field, FieldSchema)
+        self.assertEqual(field.type, 'many2one')
+        self.assertEqual(field.relation, 'res.country')
+        self.assertFalse(field.heavy)
+        self.assertFalse(schema['name'].relation)
+        self.assertIsNone(schema.get('unexisting_field_42'))
+
+        self.assertItemsEqual(self.object.simple_fields,
+                              schema.simple_fields)
+        self.assertIn('name', self.object.simple_fields)
+        for fname in self.object.simple_fields:
+            self.assertNotEqual(schema[fname].type, 'binary')
+
+    def test_create_records(self):
+        partners = self.object.create_records(
+            [{'name': 'Multi Partner %d' % i} for i in range(5)],
+            chunk_size=2)
+
+        self.assertIsInstance(partners, RecordList)
+        self.assertEqual(partners.length, 5)
+        self.assertEqual(partners.mapped('name'),
+                         ['Multi Partner %d' % i for i in range(5)])
+
+        # all records share single cache
+        for partner in partners:
+            self.assertIs(partner._cache, partners._cache)
+
+        partners.unlink()
+
+    def test_query_cache(self):
+        cache = self.client.query_cache = QueryCache(ttl=60)
+        domain = [('id', '>', 0)]
+        ids = self.object.search(domain, limit=5)
+        count = self.object.search_count(domain)
+
+        execute = self.client.services['object']._execute
+        with mock.patch.object(self.client.services['object'], '_execute',
+                               side_effect=execute) as rpc:
+            # same queries (with different, but equal args) are not
+            # sent to server
+            self.assertEqual(self.object.search(domain, limit=5), ids)
+            self.assertEqual(self.object.search(domain, 0, 5), ids)
+            self.assertEqual(self.object.search(domain, limit=5, offset=0,
+                                                context=None), ids)
+            self.assertEqual(self.object.search_count(domain), count)
+            self.assertEqual(
+                self.object.search_records(domain, limit=5).ids, ids)
+            self.assertFalse([c for c in rpc.call_args_list
+                              if c[0][1] in ('search', 'search_count')])
+
+            # cached lists could not be changed by callers
+            self.object.search(domain, limit=5).append(-1)
+            self.assertEqual(self.object.search(domain, limit=5), ids)
+
+            # other query is sent to server
+            self.object.search(domain, limit=4)
+            self.assertEqual(rpc.call_count, 1)
+        self.assertEqual(cache.stats()['misses'], 3)
+
+        # changes made by client invalidate queries of model
+        self.object.write([], {})
+        self.assertEqual(len(cache), 0)
+
+        # as well as calls of other methods, that could change data
+        self.object.search(domain, limit=5)
+        self.object.name_get(ids)
+        self.assertEqual(len(cache), 1)
+        new_id = self.object.copy(ids[0])
+        self.assertEqual(len(cache), 0)
+        self.object.unlink([new_id])
+
+    def test_query_cache_revalidate(self):
+        self.client.query_cache = cache = QueryCache(revalidate=True,
+                                                     probe_interval=0)
+        domain = [('id', '>', 0)]
+        ids = self.object.search(domain, limit=5)
+        self.assertEqual(self.object.search(domain, limit=5), ids)
+        self.assertEqual(cache.stats()['hits'], 1)
+        self.assertEqual(cache.stats()['probes'], 2)
+
+        with mock.patch.object(cache, '_probe', return_value='2100-01-01'):
+            self.assertEqual(self.object.search(domain, limit=5), ids)
+        self.assertEqual(cache.stats()['stale'], 1)
+        self.assertEqual(cache.stats()['hits'], 1)
+
+    def test_changes(self):
+        all_ids = self.object.search([], context={'active_test': False})
+
+        feed = self.object.changes(fields=['name'], batch_size=3)
+        ids = [data['id'] for data in feed]
+        self.assertEqual(len(ids), len(set(ids)))
+        self.assertItemsEqual(ids, all_ids)
+        self.assertEqual(feed.count, len(ids))
+        self.assertIsNone(feed.deleted)
+        cursor = feed.cursor
+
+        # iteration could be stopped and resumed from cursor
+        feed = self.object.changes(batch_size=3)
+        ids = [next(feed)['id'] for __ in range(4)]
+        ids += [data['id']
+                for data in self.object.changes(since=feed.cursor)]
+        self.assertItemsEqual(set(ids), all_ids)
+
+        # new records are returned, deleted ones are detected
+        new_id = self.object.create({'name': 'Changes test partner'})
+        feed = self.object.changes(since=cursor, fields=['name'])
+        self.assertIn(new_id, [data['id'] for data in feed])
+
+        self.object.unlink([new_id])
+        feed = self.object.changes(since=feed.cursor,
+                                   known_ids=[all_ids[0], new_id])
+        list(feed)
+        self.assertEqual(feed.deleted, [new_id])
+
+    def test_write_batch(self):
+        ids = [self.object.create({'name': 'Batch Partner %d' % i})
+               for i in range(3)]
+
+        with self.client.batch() as batch:
+            self.assertIs(self.client.active_batch, batch)
+            for rid in ids:
+                self.object.write([rid], {'comment': 'batch'})
+            self.object.write([ids[0]], {'name': 'Batch Partner X'})
+
+            # nothing is written yet
+            self.assertEqual(batch.size, 4)
+            self.assertEqual(
+                self.object.search_count([('id', 'in', ids),
+                                          ('comment', '=', 'batch')]),
+                0)
+
+        self.assertIsNone(self.client.active_batch)
+        self.assertEqual(
+            self.object.search_count([('id', 'in', ids),
+                                      ('comment', '=', 'batch')]),
+            3)
+        self.assertEqual(self.object.read(ids[0], ['name'])['name'],
+                         'Batch Partner X')
+
+        # on exception inside with block, writes are discarded
+        with self.assertRaises(ZeroDivisionError):
+            with self.client.batch():
+                self.object.write(ids, {'comment': 'discarded'})
+                1 / 0
+        self.assertEqual(
+            self.object.search_count([('id', 'in', ids),
+                                      ('comment', '=', 'discarded')]),
+            0)
+
+        self.object.unlink(ids)
+
+    def test_write_batch_error(self):
+        rid = self.object.create({'name': 'Batch Partner'})
+        with self.assertRaises(WriteBatchError) as err:
+            with self.client.batch():
+                self.object.write([rid], {'unexisting_field_42': 1})
+
+        self.assertEqual(len(err.exception.errors), 1)
+        self.assertEqual(err.exception.errors[0].ids, [rid])
+        self.object.unlink([rid])
+
 
 class Test_21_Record(BaseTestCase):
 
@@ -267,6 +447,19 @@ class Test_21_Record(BaseTestCase):
     def test_name_get(self):
         self.assertEqual(self.record._name, self.record.name_get()[0][1])
 
+    def test_str_no_rpc(self):
+        record = self.object.browse(1)
+        with mock.patch.object(Record, '_repr_rpc', False):
+            with mock.patch.object(self.object, 'name_get') as fake_name_get:
+                self.assertEqual(str(record), u"R(res.partner, 1)")
+                self.assertFalse(fake_name_get.called)
+
+            # if name is already in cache, it is displayed
+            record._lcache.resolve_names()
+            self.assertEqual(str(record),
+                             u"R(res.partner, 1)[%s]"
+                             u"" % (record.name_get()[0][1]))
+
     def test_record_equal(self):
         rec1 = self.record
 
@@ -405,6 +598,64 @@ class Test_21_Record(BaseTestCase):
 
         self.assertEqual(rec.get('unexisting_name', 'default'), 'default')
 
+    def test_stage_and_flush(self):
+        rec = self.object.create_record({'name': 'Staged Partner'})
+
+        rec.name = 'Staged Partner 2'
+        rec['comment'] = 'Staged comment'
+
+        # staged values are visible immediately
+        self.assertEqual(rec.name, 'Staged Partner 2')
+        self.assertEqual(rec.comment, 'Staged comment')
+        self.assertDictEqual(rec._dirty, {'name': 'Staged Partner 2',
+                                          'comment': 'Staged comment'})
+
+        # but not written yet
+        self.assertEqual(self.object.read(rec.id, ['name'])['name'],
+                         'Staged Partner')
+
+        rec.flush()
+        self.assertDictEqual(rec._dirty, {})
+        self.assertEqual(self.object.read(rec.id, ['name'])['name'],
+                         'Staged Partner 2')
+
+        # related records could be assigned
+        country = self.client['res.country'].search_records([], limit=1)[0]
+        rec.country_id = country
+        self.assertEqual(rec.country_id, country)
+        rec.flush()
+        self.assertEqual(rec.refresh().country_id, country)
+
+        with self.assertRaises(KeyError):
+            rec['unexisting_field'] = 42
+
+        # readonly fields could be staged only by item assignment
+        with self.assertRaises(AttributeError):
+            rec.write_date = '2000-01-01 00:00:00'
+        self.assertDictEqual(rec._dirty, {})
+
+        rec.unlink()
+
+    def test_stage_clear_x2many(self):
+        category = self.client['res.partner.category'].create_record(
+            {'name': 'Staged category'})
+        rec = self.object.create_record(
+            {'name': 'Staged Partner', 'category_id': [(6, 0, [category.id])]})
+        self.assertEqual(rec.category_id.ids, [category.id])
+
+        for value in (False, None, []):
+            rec.category_id = value
+            self.assertEqual(rec._dirty, {'category_id': [(6, 0, [])]})
+            self.assertEqual(len(rec.category_id), 0)
+            rec.refresh()
+
+        rec.category_id = False
+        rec.flush()
+        self.assertEqual(len(rec.refresh().category_id), 0)
+
+        rec.unlink()
+        category.unlink()
+
 
 class Test_22_RecordList(BaseTestCase):
 
@@ -888,6 +1139,169 @@ class Test_22_RecordList(BaseTestCase):
         for data in ccache.values():
             self.assertItemsEqual(list(data), ['id'])
 
+    def test_flush(self):
+        rlist = self.object.create_records(
+            [{'name': 'Staged Partner %d' % i} for i in range(3)])
+
+        for rec in rlist:
+            rec.comment = 'Staged comment'
+
+        with mock.patch.object(self.object, 'write') as fake_write:
+            rlist.flush()
+            # records with same changes written by single call
+            fake_write.assert_called_once_with(
+                rlist.ids, {'comment': 'Staged comment'}, context=None)
+
+        # write changes in batch
+        for rec in rlist:
+            rec.comment = 'Staged comment'
+        with self.client.batch():
+            rlist.flush()
+        self.assertEqual(
+            self.object.search_count([('id', 'in', rlist.ids),
+                                      ('comment', '=', 'Staged comment')]),
+            3)
+
+        rlist.unlink()
+
+    def test_auto_prefetch(self):
+        profiles = self.client.auto_prefetch = PrefetchProfiles()
+
+        # first list: fields are learned, each one is read separately
+        with mock.patch.object(self.object, 'read',
+                               side_effect=self.object.read) as fake_read:
+            for record in self.object.read_records(self.obj_ids[:3]):
+                record.name
+                record.country_id
+            self.assertEqual(fake_read.call_count, 2)
+        self.assertEqual(profiles.get_fields('res.partner'),
+                         ('country_id', 'name'))
+
+        # next list: learned fields are read by single call
+        with mock.patch.object(self.object, 'read',
+                               side_effect=self.object.read) as fake_read:
+            for record in self.object.read_records(self.obj_ids[3:6]):
+                record.name
+                record.country_id
+            fake_read.assert_called_once_with(
+                self.obj_ids[3:6], ['name', 'country_id'], context=None)
+        self.assertEqual(profiles.stats()['prefetched'], 1)
+
+        # profiles could be saved and loaded in next run
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmp_dir, 'profiles.json')
+            profiles.save(path)
+            self.assertItemsEqual(
+                PrefetchProfiles(path).get_fields('res.partner'),
+                ['country_id', 'name'])
+        finally:
+            shutil.rmtree(tmp_dir)
+
+    def test_iter_prefetch(self):
+        lcache = self.recordlist._lcache
+
+        records = []
+        for record in self.recordlist.iter_prefetch(['name'], chunk_size=2):
+            # data for current record is already in cache
+            self.assertItemsEqual(list(record._data), ['id', 'name'])
+            records.append(record)
+
+        self.assertEqual(len(records), self.recordlist.length)
+        self.assertSequenceEqual([r.id for r in records],
+                                 self.recordlist.ids)
+        self.assertFalse(lcache.get_ids_to_read('name'))
+
+    def test_iter_prefetch_break(self):
+        # stop iteration after first record. background reader must
+        # not fail, and data for next chunks may be read or not
+        for record in self.recordlist.iter_prefetch(['name'], chunk_size=1):
+            self.assertIn('name', record._data)
+            break
+
+    def test_parallel_call(self):
+        res = self.recordlist.parallel_call('read', chunk_size=2, workers=3,
+                                            args=(['name'],))
+        self.assertIsInstance(res, ParallelResult)
+        self.assertFalse(res.errors)
+        self.assertEqual(res.count, self.recordlist.length)
+        self.assertEqual(len(res.chunks), (self.recordlist.length + 1) // 2)
+        self.assertSequenceEqual(
+            [r['id'] for chunk in res.results for r in chunk],
+            self.recordlist.ids)
+        self.assertGreater(res.throughput, 0)
+
+    def test_parallel_call_process(self):
+        res = self.recordlist.parallel_call('read', chunk_size=3, workers=2,
+                                            executor='process',
+                                            args=(['name'],))
+        self.assertFalse(res.errors)
+        self.assertSequenceEqual(
+            [r['id'] for chunk in res.results for r in chunk],
+            self.recordlist.ids)
+
+    def test_parallel_process_worker_client(self):
+        # worker process creates its own client, and records sent to it
+        # are attached to this client, even if there is no client
+        # inherited from parent process (spawn start method)
+        self.addCleanup(setattr, parallel, '_worker_client', None)
+        self.addCleanup(client_module._clients.__setitem__,
+                        self.client.get_url(), self.client)
+
+        parallel._init_worker(self.client.get_init_args(),
+                              self.client._pwd)
+        worker_client = parallel._worker_client
+        self.assertIsNot(worker_client, self.client)
+
+        rlist = pickle.loads(pickle.dumps(self.recordlist))
+        self.assertIs(rlist.object.client, worker_client)
+        self.assertEqual(rlist.mapped('name'),
+                         self.recordlist.mapped('name'))
+
+    def test_parallel_call_errors(self):
+        res = self.recordlist.parallel_call('unexisting_method', chunk_size=2)
+        self.assertFalse(res.results)
+        self.assertEqual(len(res.errors), len(res.chunks))
+        self.assertItemsEqual(res.failed_ids, self.recordlist.ids)
+        for chunk in res.errors:
+            self.assertIsInstance(chunk.error, Exception)
+
+        with self.assertRaises(ValueError):
+            self.recordlist.parallel_call('read', executor='unknown')
+
+    def test_parallel_map(self):
+        res = self.recordlist.parallel_map(
+            lambda rlist: rlist.mapped('name'), chunk_size=2)
+        self.assertFalse(res.errors)
+        self.assertSequenceEqual(sum(res.results, []),
+                                 self.recordlist.mapped('name'))
+
+    def test_pickle(self):
+        rlist = self.recordlist.copy(context={'lang': 'en_US'})
+        rlist.prefetch('name')
+
+        data = pickle.dumps(rlist, pickle.HIGHEST_PROTOCOL)
+        restored = pickle.loads(data)
+        self.assertIsInstance(restored, RecordList)
+        self.assertEqual(restored.ids, rlist.ids)
+        self.assertEqual(restored.context, rlist.context)
+        self.assertEqual(restored.object.name, rlist.object.name)
+
+        # restored list is attached to existing client, but cache
+        # is not pickled
+        self.assertIs(restored.object.client, self.client)
+        self.assertIsNot(restored._cache, rlist._cache)
+        self.assertNotIn('name', restored[0]._data)
+        self.assertEqual(restored[0].name, rlist[0].name)
+
+        # payload does not depend on amount of cached data
+        self.assertLess(len(data), 512 + 8 * rlist.length)
+
+        record = pickle.loads(pickle.dumps(rlist[0]))
+        self.assertIsInstance(record, Record)
+        self.assertEqual(record.id, rlist[0].id)
+        self.assertEqual(record.context, rlist.context)
+
 
 class Test_23_Cache(BaseTestCase):
 
@@ -1097,6 +1511,156 @@ class Test_23_Cache(BaseTestCase):
 
         # TODO: add tests for many2many and one2many field types
 
+    def test_resolve_names(self):
+        obj_cache = self.cache['res.partner']
+        obj_cache.update_keys([1, 2, 3])
+
+        # name of record 2 is already known (for example from many2one value)
+        obj_cache[2]['__name_get_result'] = 'Known name'
+        self.assertItemsEqual(obj_cache.get_ids_without_name(), [1, 3])
+
+        partner_obj = self.client['res.partner']
+        with mock.patch.object(partner_obj, 'name_get',
+                               return_value=[]) as fake_name_get:
+            obj_cache.resolve_names(chunk_size=1)
+            self.assertEqual(fake_name_get.call_count, 2)
+
+        self.cache.resolve_names()
+        self.assertEqual(obj_cache[2]['__name_get_result'], 'Known name')
+        self.assertEqual(obj_cache[1]['__name_get_result'],
+                         partner_obj.name_get([1])[0][1])
+        self.assertFalse(obj_cache.get_ids_without_name())
+
+    def test_partitions(self):
+        default = self.cache['res.partner']
+        self.assertIs(self.cache.get_partition('res.partner'), default)
+        self.assertIs(self.cache.get_partition('res.partner', {'a': 5}),
+                      default)
+
+        fr_cache = self.cache.get_partition('res.partner', {'lang': 'fr_FR'})
+        self.assertIsInstance(fr_cache, ObjectCache)
+        self.assertIsNot(fr_cache, default)
+        self.assertEqual(fr_cache.context, {'lang': 'fr_FR'})
+        self.assertIs(self.cache.get_partition('res.partner',
+                                               {'lang': 'fr_FR', 'a': 5}),
+                      fr_cache)
+
+        # records read with different languages use different partitions
+        partner_obj = self.client['res.partner']
+        rec = partner_obj.search_records([], limit=1, cache=self.cache)[0]
+        rec_fr = partner_obj.read_records(rec.id, cache=self.cache,
+                                          context={'lang': 'fr_FR'})
+        self.assertIs(rec._lcache, default)
+        self.assertIs(rec_fr._lcache, fr_cache)
+
+        rec_fr.name
+        self.assertIn('name', fr_cache[rec.id])
+        self.assertNotIn('name', default[rec.id])
+
+        # derived record lists keep partition
+        rlist_fr = partner_obj.search_records([], limit=2, cache=self.cache,
+                                              context={'lang': 'fr_FR'})
+        self.assertIs(rlist_fr[0]._lcache, fr_cache)
+        self.assertIs(rlist_fr[:1]._lcache, fr_cache)
+        self.assertIs(rlist_fr.filter(lambda r: True)._lcache, fr_cache)
+
+    def test_evict(self):
+        self.cache['res.partner']
+        self.cache['res.country']
+        self.cache.get_partition('res.partner', {'lang': 'fr_FR'})
+        self.cache.get_partition('res.partner', {'active_test': False})
+        self.assertEqual(len(self.cache.get_object_caches()), 4)
+
+        self.cache.evict('res.partner', {'lang': 'fr_FR'})
+        self.assertEqual(len(self.cache.get_object_caches()), 3)
+        self.assertIn('res.partner', self.cache)
+
+        self.cache.evict('res.partner')
+        self.assertEqual(len(self.cache.get_object_caches()), 1)
+        self.assertNotIn('res.partner', self.cache)
+
+        self.cache.evict()
+        self.assertFalse(self.cache.get_object_caches())
+
+    def test_after_fork(self):
+        partners = self.client['res.partner'].search_records(
+            [], limit=2, cache=self.cache)
+        partners[0].name
+        partners[1].name = 'Staged Name'
+        self.assertEqual(self.cache.fork_policy, 'reset')
+
+        self.cache.after_fork()
+        lcache = partners._lcache
+
+        # data and staged changes removed, but ids kept
+        self.assertItemsEqual(list(lcache), partners.ids)
+        self.assertEqual(lcache[partners[0].id], {'id': partners[0].id})
+        self.assertFalse(lcache.dirty)
+
+        # schema is kept
+        self.assertIsNotNone(self.client['res.partner']._columns_info)
+
+        cache = Cache(self.client, fork_policy='keep')
+        partner = self.client['res.partner'].read_records(
+            partners[0].id, cache=cache)
+        partner.name
+        cache.after_fork()
+        self.assertIn('name', partner._data)
+
+    def test_snapshot(self):
+        tmp_dir = tempfile.mkdtemp()
+        path = os.path.join(tmp_dir, 'cache.snapshot')
+        self.addCleanup(shutil.rmtree, tmp_dir)
+
+        partners = self.client['res.partner'].search_records(
+            [], limit=5, cache=self.cache)
+        partners.prefetch('name', 'email')
+        partners[4].name = 'Staged Name'
+
+        # change record on server after it was read, but before save:
+        # it is saved with current values, not with cached ones
+        old_name = partners[1].name
+        partners.object.write([partners[1].id], {'name': 'Changed Name'})
+
+        # write_date read after change is fresh, but cached name is not
+        partners[1].write_date
+        self.assertIn('write_date', partners[1]._data)
+        self.assertEqual(partners[1].name, old_name)
+
+        self.assertEqual(self.cache.save(path, models=['res.partner']), 4)
+
+        # change one record on server after snapshot was made
+        partners.object.write([partners[0].id], {'email': 'x@example.com'})
+
+        cache = empty_cache(self.client, snapshot=path)
+        restored = self.client['res.partner'].read_records(partners.ids,
+                                                           cache=cache)
+        lcache = restored._lcache
+
+        # changed record and record with staged changes are not restored
+        self.assertEqual(lcache[partners[0].id], {'id': partners[0].id})
+        self.assertEqual(lcache[partners[4].id], {'id': partners[4].id})
+        for partner in partners[2:4]:
+            self.assertEqual(lcache[partner.id]['name'], partner.name)
+            self.assertIn('write_date', lcache[partner.id])
+        self.assertEqual(lcache[partners[1].id]['name'], 'Changed Name')
+        self.assertItemsEqual(lcache.get_ids_to_read('name'),
+                              [partners[0].id, partners[4].id])
+
+        # snapshot could be restored without staleness check
+        cache = empty_cache(self.client, snapshot=path, check_stale=False)
+        self.assertIn('name', cache['res.partner'][partners[0].id])
+
+        # snapshot is bound to database and user
+        other = Client(self.env.host, dbname=self.env.dbname,
+                       user='other_user', pwd='pwd',
+                       protocol=self.env.protocol, port=self.env.port)
+        with self.assertRaises(ValueError):
+            empty_cache(other, snapshot=path)
+
+        partners.object.write([partners[0].id], {'email': False})
+        partners.object.write([partners[1].id], {'name': old_name})
+
     def test_cache_update_context(self):
         cache = self.cache['res.partner']  # get object cache
         self.assertFalse(bool(cache.context))
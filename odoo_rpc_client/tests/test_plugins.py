@@ -3,6 +3,10 @@ from .. import Client
 from ..orm import (Record,
                    RecordList)
 
+import os
+import shutil
+import sqlite3
+import tempfile
 import unittest
 
 
@@ -243,3 +247,119 @@ class Test_26_Plugin_ExternalIDS(BaseTestCase):
 
         # Cleanup, remove created partner
         new_partner.unlink()
+
+
+class Test_27_Plugin_Mirror(BaseTestCase):
+
+    def setUp(self):
+        super(self.__class__, self).setUp()
+        self.client = Client(self.env.host,
+                             dbname=self.env.dbname,
+                             user=self.env.user,
+                             pwd=self.env.password,
+                             protocol=self.env.protocol,
+                             port=self.env.port)
+        import odoo_rpc_client.plugins.mirror  # noqa
+
+        self.tmp_dir = tempfile.mkdtemp()
+        self.mirror = self.client.plugins.mirror.open(
+            os.path.join(self.tmp_dir, 'mirror.db'))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_10_domain_to_sql(self):
+        from odoo_rpc_client.plugins.mirror import domain_to_sql
+
+        fields = {'name': 'char', 'country_id': 'many2one'}
+        sql, params = domain_to_sql([], fields)
+        self.assertEqual(sql, '1=1')
+
+        sql, params = domain_to_sql(
+            ['|', ('name', 'ilike', '50%'), ('country_id', '=', False),
+             ('id', 'in', [1, 2])], fields)
+        self.assertEqual(
+            sql, '(("name" LIKE ? ESCAPE \'\\\' OR "country_id" IS NULL) '
+                 'AND ("id" IN (?, ?)))')
+        self.assertEqual(params, ['%50\\%%', 1, 2])
+
+        # many2one compared with name
+        sql, params = domain_to_sql([('country_id', '=', 'Belgium')], fields)
+        self.assertEqual(sql, '"country_id__name" = ?')
+
+        # negation treats NULL (False) values as false, like Odoo does
+        sql, params = domain_to_sql(['!', ('name', '=', 'x')], fields)
+        self.assertEqual(sql, '(NOT COALESCE("name" = ?, 0))')
+
+        # =like is case-sensitive
+        sql, params = domain_to_sql([('name', '=like', 'A_\\%*')], fields)
+        self.assertEqual(sql, '"name" GLOB ?')
+        self.assertEqual(params, ['A?%[*]'])
+
+        with self.assertRaises(ValueError):
+            domain_to_sql([('email', '=', 'x')], fields)
+        with self.assertRaises(ValueError):
+            domain_to_sql([('name', 'child_of', 1)], fields)
+        with self.assertRaises(ValueError):
+            domain_to_sql(['&'], fields)
+
+    def test_11_domain_to_sql_query(self):
+        from odoo_rpc_client.plugins.mirror import domain_to_sql
+
+        conn = sqlite3.connect(':memory:')
+        conn.execute('CREATE TABLE t ("id" INTEGER, "active" INTEGER, '
+                     '"name" TEXT)')
+        conn.executemany('INSERT INTO t VALUES (?, ?, ?)',
+                         [(1, 1, 'x'), (2, None, 'Abc'), (3, None, None)])
+        fields = {'active': 'boolean', 'name': 'char'}
+
+        def search(domain):
+            sql, params = domain_to_sql(domain, fields)
+            return [row[0] for row in conn.execute(
+                'SELECT "id" FROM t WHERE %s ORDER BY "id"' % sql, params)]
+
+        self.assertEqual(search(['!', ('active', '=', True)]), [2, 3])
+        self.assertEqual(search(['!', ('name', '=', 'x')]), [2, 3])
+        self.assertEqual(search(['!', '|', ('name', '=', 'x'),
+                                 ('active', '=', True)]), [2, 3])
+        self.assertEqual(search([('name', '=like', 'A%')]), [2])
+        self.assertEqual(search([('name', '=like', 'a%')]), [])
+        self.assertEqual(search([('name', '=ilike', 'a%')]), [2])
+        conn.close()
+
+    def test_20_sync_and_query(self):
+        partner_obj = self.client['res.partner']
+        fields = ['name', 'country_id', 'active']
+        self.mirror.add_model('res.partner', fields)
+        self.assertEqual(self.mirror.models, ['res.partner'])
+
+        res = self.mirror.sync(batch_size=10)
+        self.assertEqual(res['res.partner']['deleted'], 0)
+
+        partners = self.mirror['res.partner']
+        self.assertEqual(partners.search_count([]),
+                         partner_obj.search_count([]))
+
+        domain = [('country_id', '!=', False)]
+        self.assertItemsEqual(partners.search(domain),
+                              partner_obj.search(domain))
+
+        ids = partner_obj.search([], limit=5)
+        self.assertEqual(partners.read(ids, fields),
+                         partner_obj.read(ids, fields))
+
+    def test_30_sync_incremental(self):
+        partner_obj = self.client['res.partner']
+        self.mirror.add_model('res.partner', ['name'])
+        self.mirror.sync()
+
+        partner_id = partner_obj.create({'name': 'Mirror test partner'})
+        self.mirror.sync()
+        self.assertEqual(
+            self.mirror['res.partner'].read(partner_id)['name'],
+            'Mirror test partner')
+
+        partner_obj.unlink([partner_id])
+        res = self.mirror.sync(check_deletes=True)
+        self.assertEqual(res['res.partner']['deleted'], 1)
+        self.assertFalse(self.mirror['res.partner'].read(partner_id))
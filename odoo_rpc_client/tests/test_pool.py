@@ -0,0 +1,124 @@
+import time
+import threading
+
+from . import (BaseTestCase,
+               mock)
+from ..client import Client
+from .. import pool as pool_module
+from ..pool import ClientPool
+from ..exceptions import (ClientPoolError,
+                          LoginException)
+
+
+class Test_15_ClientPool(BaseTestCase):
+
+    def setUp(self):
+        super(self.__class__, self).setUp()
+        self.pool = ClientPool(max_size=2, timeout=1)
+        self.args = dict(host=self.env.host,
+                         dbname=self.env.dbname,
+                         user=self.env.user,
+                         pwd=self.env.password,
+                         protocol=self.env.protocol,
+                         port=self.env.port)
+
+    def test_checkout_checkin(self):
+        client = self.pool.checkout(**self.args)
+        self.assertIsInstance(client, Client)
+        self.assertIsNotNone(client._uid)
+        self.assertEqual(self.pool.stats()['busy'], 1)
+
+        self.pool.checkin(client)
+        self.assertEqual(self.pool.stats()['idle'], 1)
+
+        # same client is reused
+        with self.pool.client(**self.args) as client2:
+            self.assertIs(client2, client)
+        self.assertEqual(self.pool.stats()['hits'], 1)
+
+        with self.assertRaises(ClientPoolError):
+            self.pool.checkin(client)
+
+    def test_shared_connector_and_login(self):
+        client1 = self.pool.checkout(**self.args)
+        client2 = self.pool.checkout(**self.args)
+        self.assertIsNot(client1, client2)
+        self.assertIs(client1.connection, client2.connection)
+        self.assertEqual(client1.uid, client2.uid)
+        self.pool.checkin(client1)
+        self.pool.checkin(client2)
+
+    def test_concurrent_cold_checkouts(self):
+        pool = ClientPool(max_size=8, timeout=5)
+        get_connector = pool_module.get_connector
+
+        def slow_get_connector(protocol):
+            # make race between threads more likely
+            time.sleep(0.01)
+            return get_connector(protocol)
+
+        clients = []
+        with mock.patch.object(pool_module, 'get_connector',
+                               side_effect=slow_get_connector):
+            threads = [threading.Thread(
+                target=lambda: clients.append(pool.checkout(**self.args)))
+                for __ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(len(clients), 8)
+        self.assertEqual(len(set(id(c.connection) for c in clients)), 1)
+        self.assertEqual(pool.stats()['misses'], 8)
+        for client in clients:
+            pool.checkin(client)
+
+    def test_max_size(self):
+        client1 = self.pool.checkout(**self.args)
+        client2 = self.pool.checkout(**self.args)
+        with self.assertRaises(ClientPoolError):
+            self.pool.checkout(timeout=0.1, **self.args)
+
+        # checkout waits for checkin
+        threading.Timer(0.2, self.pool.checkin, [client1]).start()
+        self.assertIs(self.pool.checkout(**self.args), client1)
+
+        self.pool.discard(client1)
+        self.pool.checkin(client2)
+        self.assertEqual(self.pool.size, 1)
+
+    def test_idle_timeout(self):
+        pool = ClientPool(idle_timeout=0.1)
+        client = pool.checkout(**self.args)
+        pool.checkin(client)
+        time.sleep(0.2)
+        self.assertIsNot(pool.checkout(**self.args), client)
+        self.assertEqual(pool.size, 1)
+
+    def test_health_check(self):
+        pool = ClientPool(health_check=lambda c: False,
+                          health_check_interval=0)
+        client = pool.checkout(**self.args)
+        pool.checkin(client)
+        self.assertIsNot(pool.checkout(**self.args), client)
+
+    def test_health_check_relogin(self):
+        pool = ClientPool(health_check=lambda c: False,
+                          health_check_interval=0)
+        client = pool.checkout(**self.args)
+        pool.checkin(client)
+
+        # client, that replaces unhealthy one, logs in again
+        with mock.patch.object(Client, 'connect', autospec=True,
+                               side_effect=Client.connect) as connect:
+            client2 = pool.checkout(**self.args)
+        self.assertIsNot(client2, client)
+        self.assertEqual(connect.call_count, 1)
+        self.assertEqual(client2.uid, client.uid)
+
+    def test_bad_login(self):
+        args = dict(self.args, pwd='wrong-password')
+        with self.assertRaises(LoginException):
+            self.pool.checkout(**args)
+        self.assertEqual(self.pool.size, 0)
@@ -7,6 +7,7 @@ __all__ = ('ustr',
            'DirMixIn',
            'UConverter',
            'wpartial',
+           'freeze',
            )
 
 # Check if anyfield is installed
@@ -44,6 +45,26 @@ def preprocess_args(*args, **kwargs):
     return xargs, kwargs
 
 
+def freeze(value):
+    """ Convert value to hashable form, to be used as part of cache keys
+        or to group by values.
+
+        Dictionaries converted to frozensets, lists and tuples
+        converted to tuples, sets converted to frozensets. Conversion
+        applied recursively.
+
+        :param value: value to convert
+        :return: hashable representation of value
+    """
+    if isinstance(value, dict):
+        return frozenset((k, freeze(v)) for k, v in six.iteritems(value))
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(v) for v in value)
+    if isinstance(value, (set, frozenset)):
+        return frozenset(freeze(v) for v in value)
+    return value
+
+
 def stdcall(fn):
     """ Simple decorator for server methods, that supports standard call
 